@@ -0,0 +1,59 @@
+"""
+Admin endpoints
+Query profiler reports (slowest statements with EXPLAIN plans, recent per-request query
+profiles) and maintenance jobs. Every endpoint needs the X-Admin-Token header: the reports
+expose SQL text and per-supplier waybill data, so without ADMIN_TOKEN the router is closed.
+"""
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from config import settings
+from database import get_db
+from dedupe import LOCAL_TABLES, dedupe_local
+from query_profiler import profiler
+
+SORT_FIELDS = ["total_ms", "max_ms", "avg_ms", "count"]
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin uçları kapalı: ADMIN_TOKEN tanımlanmalı (X-Admin-Token)")
+    if x_admin_token != settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Yetkisiz erişim")
+
+
+router = APIRouter(prefix="/api/admin", tags=["admin"], dependencies=[Depends(require_admin)],
+                   default_response_class=ORJSONResponse)
+
+
+@router.get("/slow-queries")
+def get_slow_queries(limit: int = Query(20, ge=1, le=200), sort_by: str = "total_ms"):
+    """En pahalı sorgular (SLOW_QUERY_MS üstü), normalize edilmiş SQL'e göre gruplanmış"""
+    if sort_by not in SORT_FIELDS:
+        raise HTTPException(status_code=400, detail=f"Geçersiz sıralama: {sort_by} (geçerli: {', '.join(SORT_FIELDS)})")
+    return {
+        "enabled": profiler.installed,
+        "threshold_ms": profiler.slow_ms,
+        "queries": profiler.top_slow_queries(limit, sort_by)
+    }
+
+@router.delete("/slow-queries")
+def reset_slow_queries():
+    profiler.reset()
+    return {"message": "Profil verileri temizlendi"}
+
+@router.get("/query-profiles")
+def get_query_profiles(limit: int = Query(20, ge=1, le=100)):
+    """Son isteklerin sorgu listesi (SQL, süre, satır sayısı)"""
+    return {"enabled": profiler.installed, "requests": profiler.recent_requests(limit)}
+
+@router.post("/dedupe/{kind}")
+def run_dedupe(kind: str, apply: bool = False, db: Session = Depends(get_db)):
+    """Mükerrer kayıtlar (tarih + irsaliye + tedarikçi); apply=false sadece rapor döner"""
+    kinds = list(LOCAL_TABLES) if kind == "all" else [kind]
+    if any(k not in LOCAL_TABLES for k in kinds):
+        raise HTTPException(status_code=400, detail=f"Geçersiz tablo: {kind} (geçerli: {', '.join(LOCAL_TABLES)}, all)")
+    return {"results": [dedupe_local(db, k, apply) for k in kinds]}
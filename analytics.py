@@ -0,0 +1,297 @@
+"""
+Analytics Queries
+SQL builders shared by the sync (/api) and async (/api/v2) analytics endpoints, so both
+push the aggregation into the database instead of loading rows into Python.
+"""
+
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import String, func, literal, literal_column, select, union_all
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+
+from database import Beton, Demir, DemirCap, Hasir, DEMIR_CAPS
+from dimensions import lookup_for, name_filter
+
+# kind -> (model, quantity column, firma column); demir's supplier is `tedarikci`
+SUMMARY_TABLES = {
+    "beton": (Beton, Beton.miktar, Beton.firma),
+    "demir": (Demir, Demir.toplam_agirlik, Demir.tedarikci),
+    "hasir": (Hasir, Hasir.agirlik, Hasir.firma),
+}
+QUANTITY_KEYS = {"beton": "beton_m3", "demir": "demir_kg", "hasir": "hasir_kg"}
+
+
+def date_conditions(column, start_date: Optional[date] = None, end_date: Optional[date] = None) -> List:
+    """Inclusive date range on a DateTime column, written as a sargable half-open range"""
+    conditions = []
+    if start_date:
+        conditions.append(column >= datetime.combine(start_date, time.min))
+    if end_date:
+        conditions.append(column < datetime.combine(end_date + timedelta(days=1), time.min))
+    return conditions
+
+
+# ============================================
+# SUMMARY
+# ============================================
+
+def summary_statement(start_date: Optional[date] = None, end_date: Optional[date] = None,
+                      firma: Optional[str] = None):
+    """Counts and sums of all three tables in one round-trip (UNION ALL of aggregates)"""
+    parts = []
+    for kind, (model, quantity, firma_column) in SUMMARY_TABLES.items():
+        conditions = date_conditions(model.tarih, start_date, end_date)
+        if firma:
+            conditions.append(name_filter(firma_column, firma))
+        parts.append(
+            select(
+                literal(kind).label("kind"),
+                func.count().label("count"),
+                func.coalesce(func.sum(quantity), 0).label("total"),
+            ).select_from(model).where(*conditions)
+        )
+    return union_all(*parts)
+
+
+def summary_response(rows) -> Dict:
+    by_kind = {row.kind: row for row in rows}
+    return {
+        "total_records": {kind: by_kind[kind].count for kind in SUMMARY_TABLES},
+        "total_quantities": {QUANTITY_KEYS[kind]: by_kind[kind].total for kind in SUMMARY_TABLES},
+    }
+
+
+# ============================================
+# GROUPING
+# ============================================
+
+def grouped_sum_statement(column, value, *where, bucket=None):
+    """Rows of ([bucket,] grp, total) per dimension value.
+
+    Lookup-backed names (firma, blok, sınıf, etap) are aggregated on their integer key and
+    only the handful of result rows are joined back to the lookup table for the name.
+    """
+    leading = [bucket] if bucket is not None else []
+    lookup = lookup_for(column)
+    if lookup is None:
+        grp = column.label("grp")
+        return select(*leading, grp, func.coalesce(func.sum(value), 0).label("total")).where(*where).group_by(*leading, grp)
+
+    id_column, table = lookup
+    totals = (
+        select(*leading, id_column.label("grp_id"), func.coalesce(func.sum(value), 0).label("total"))
+        .where(*where).group_by(*leading, id_column).subquery()
+    )
+    outer = [totals.c.bucket] if bucket is not None else []
+    return select(*outer, table.c.ad.label("grp"), totals.c.total).select_from(
+        totals.outerjoin(table, table.c.id == totals.c.grp_id)
+    )
+
+
+def grouped_sum_response(rows, default=None) -> Dict:
+    """{name: total}; rows without a name (NULL key or empty text) go under `default`"""
+    result = {}
+    for grp, total in rows:
+        key = grp if grp not in (None, "") else default
+        result[key] = result.get(key, 0) + total
+    return result
+
+
+def cap_totals_statement(*where):
+    """Per-diameter kg totals from the long demir_cap table (only non-zero entries are stored)"""
+    return select(DemirCap.cap, func.sum(DemirCap.kg)).where(*where).group_by(DemirCap.cap)
+
+
+def cap_totals_response(rows) -> Dict:
+    """{"Q8": kg, ...}: every standard diameter (zero when unused) plus any extra ones (e.g. Q24)"""
+    totals = {cap: 0 for cap in DEMIR_CAPS}
+    for cap, total in rows:
+        totals[cap] = total
+    return {f"Q{cap}": totals[cap] for cap in sorted(totals)}
+
+
+# ============================================
+# TIME SERIES
+# ============================================
+
+GRANULARITIES = ["day", "week", "month"]
+MAX_BUCKETS = 1000
+
+# material -> (model, value column, unit, {group_by: column}); "cap" reads the demir_cap table
+TIMESERIES_TABLES = {
+    "beton": (Beton, Beton.miktar, "m3", {
+        "firma": Beton.firma, "blok": Beton.blok, "sinif": Beton.beton_sinifi, "teslim": Beton.teslim_sekli,
+    }),
+    "demir": (Demir, Demir.toplam_agirlik, "kg", {
+        "tedarikci": Demir.tedarikci, "uretici": Demir.uretici, "etap": Demir.etap, "cap": DemirCap.cap,
+    }),
+    "hasir": (Hasir, Hasir.agirlik, "kg", {
+        "firma": Hasir.firma, "etap": Hasir.etap, "tip": Hasir.hasir_tipi,
+    }),
+}
+
+
+class date_bucket(FunctionElement):
+    """Start of the day/week (Monday)/month containing a timestamp, as 'YYYY-MM-DD' text"""
+    type = String()
+    inherit_cache = True
+
+    def __init__(self, column, granularity: str):
+        # Granularity travels as a literal clause so it is part of the statement cache key
+        super().__init__(column, literal_column(f"'{granularity}'"))
+
+
+def _bucket_parts(element, compiler, **kw):
+    column, granularity = list(element.clauses)
+    return compiler.process(column, **kw), granularity.name.strip("'")
+
+
+@compiles(date_bucket)
+def _date_bucket_default(element, compiler, **kw):
+    column, granularity = _bucket_parts(element, compiler, **kw)
+    return f"to_char(date_trunc('{granularity}', {column}), 'YYYY-MM-DD')"
+
+
+@compiles(date_bucket, "sqlite")
+def _date_bucket_sqlite(element, compiler, **kw):
+    column, granularity = _bucket_parts(element, compiler, **kw)
+    if granularity == "week":
+        # 'weekday 0' moves forward to Sunday (or stays), -6 days gives that week's Monday
+        return f"date({column}, 'weekday 0', '-6 days')"
+    if granularity == "month":
+        return f"strftime('%Y-%m-01', {column})"
+    return f"date({column})"
+
+
+def bucket_start(day: date, granularity: str) -> date:
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+def bucket_range(first: date, last: date, granularity: str) -> List[str]:
+    """Every bucket between two dates (inclusive) so empty periods show up as zeros"""
+    buckets, current = [], bucket_start(first, granularity)
+    while current <= last:
+        buckets.append(current.isoformat())
+        if granularity == "day":
+            current += timedelta(days=1)
+        elif granularity == "week":
+            current += timedelta(weeks=1)
+        else:
+            current = (current.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return buckets
+
+
+def bucket_count(first: date, last: date, granularity: str) -> int:
+    """len(bucket_range(...)) without building the list"""
+    first = bucket_start(first, granularity)
+    if first > last:
+        return 0
+    last = bucket_start(last, granularity)
+    if granularity == "week":
+        return (last - first).days // 7 + 1
+    if granularity == "month":
+        return (last.year - first.year) * 12 + last.month - first.month + 1
+    return (last - first).days + 1
+
+
+def timeseries_bounds_statement(material: str, group_by: Optional[str] = None):
+    """First and last record date; fills the open side of a one-sided range"""
+    model = DemirCap if group_by == "cap" else TIMESERIES_TABLES[material][0]
+    return select(func.min(model.tarih), func.max(model.tarih))
+
+
+def effective_range(bounds, start_date: Optional[date], end_date: Optional[date]) -> Tuple[date, date]:
+    """Range timeseries_response fills: missing start -> first record, missing end -> last record (or today)"""
+    first_seen, last_seen = bounds
+    first = start_date or (first_seen.date() if first_seen else end_date)
+    last = end_date or (last_seen.date() if last_seen else date.today())
+    return first, last
+
+
+def timeseries_range_error(first: date, last: date, granularity: str) -> Optional[str]:
+    if bucket_count(first, last, granularity) > MAX_BUCKETS:
+        return f"En fazla {MAX_BUCKETS} periyot istenebilir; daha geniş periyot veya dar tarih aralığı seçin"
+    return None
+
+
+def timeseries_statement(material: str, granularity: str, group_by: Optional[str] = None,
+                         start_date: Optional[date] = None, end_date: Optional[date] = None):
+    """Rows of (bucket, group, value...) aggregated in SQL; validated inputs only"""
+    model, value, _, dimensions = TIMESERIES_TABLES[material]
+    if group_by == "cap":
+        model, value = DemirCap, DemirCap.kg
+    bucket = date_bucket(model.tarih, granularity).label("bucket")
+    conditions = date_conditions(model.tarih, start_date, end_date)
+    conditions.append(model.tarih.isnot(None))
+
+    if group_by:
+        return grouped_sum_statement(dimensions[group_by], value, *conditions, bucket=bucket)
+    return select(bucket, func.coalesce(func.sum(value), 0).label("total")).where(*conditions).group_by(bucket)
+
+
+def timeseries_response(rows, material: str, granularity: str, group_by: Optional[str] = None,
+                        start_date: Optional[date] = None, end_date: Optional[date] = None) -> Dict:
+    values: Dict[str, Dict[str, float]] = {}
+    for row in rows:
+        if group_by == "cap":
+            values.setdefault(f"Q{row.grp}", {})[row.bucket] = row.total
+        else:
+            key = (row.grp if row.grp is not None else "Belirtilmemiş") if group_by else "Toplam"
+            values.setdefault(key, {})[row.bucket] = row.total
+
+    seen = sorted({b for series in values.values() for b in series})
+    first = start_date or (date.fromisoformat(seen[0]) if seen else None)
+    last = end_date or (date.fromisoformat(seen[-1]) if seen else None)
+    buckets = bucket_range(first, last, granularity) if first and last else []
+
+    series = [
+        {"key": key, "values": [series_values.get(b, 0) for b in buckets], "total": sum(series_values.values())}
+        for key, series_values in values.items()
+    ]
+    series.sort(key=lambda s: s["total"], reverse=True)
+    if group_by == "cap":
+        series = [s for s in series if s["total"]]
+
+    return {
+        "material": material,
+        "granularity": granularity,
+        "group_by": group_by,
+        "unit": TIMESERIES_TABLES[material][2],
+        "start_date": first.isoformat() if first else None,
+        "end_date": last.isoformat() if last else None,
+        "buckets": buckets,
+        "series": series,
+    }
+
+
+def validate_timeseries(material: str, granularity: str, group_by: Optional[str],
+                        start_date: Optional[date], end_date: Optional[date]) -> Optional[str]:
+    """
+    Turkish error message for invalid parameters, None when valid. A one-sided range is
+    checked by the endpoint once the open side is known (timeseries_bounds_statement).
+    """
+    if material not in TIMESERIES_TABLES:
+        return f"Geçersiz malzeme: {material} (geçerli: {', '.join(TIMESERIES_TABLES)})"
+    if granularity not in GRANULARITIES:
+        return f"Geçersiz periyot: {granularity} (geçerli: {', '.join(GRANULARITIES)})"
+    dimensions = TIMESERIES_TABLES[material][3]
+    if group_by and group_by not in dimensions:
+        return f"{material} için geçersiz gruplama: {group_by} (geçerli: {', '.join(dimensions)})"
+    if start_date and end_date:
+        if start_date > end_date:
+            return "Başlangıç tarihi bitiş tarihinden sonra olamaz"
+        return timeseries_range_error(start_date, end_date, granularity)
+    return None
+
+
+def by_date_statement(model, value, start_date: Optional[date] = None, end_date: Optional[date] = None):
+    """Daily totals for the legacy /by-date endpoints"""
+    bucket = date_bucket(model.tarih, "day").label("bucket")
+    conditions = date_conditions(model.tarih, start_date, end_date) + [model.tarih.isnot(None)]
+    return select(bucket, func.coalesce(func.sum(value), 0)).where(*conditions).group_by(bucket).order_by(bucket)
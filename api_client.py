@@ -9,6 +9,7 @@ from typing import Optional, Dict, List, Any
 import streamlit as st
 from datetime import datetime
 import io
+from health_monitor import HealthMonitor
 
 class APIClient:
     """Client for interacting with the FastAPI backend"""
@@ -34,10 +35,10 @@ class APIClient:
     # HEALTH CHECK
     # ============================================
     
-    def health_check(self) -> bool:
-        """Check if API is accessible"""
+    def health_check(self, timeout: float = 3.0) -> bool:
+        """Check if API is accessible (fails fast after `timeout` seconds)"""
         try:
-            response = self.session.get(f"{self.base_url}/health")
+            response = self.session.get(f"{self.base_url}/health", timeout=timeout)
             return response.status_code == 200
         except:
             return False
@@ -257,10 +258,37 @@ class APIClient:
             st.warning(f"Failed to fetch rebar analytics: {e}")
             return {}
     
-    def get_summary_analytics(self) -> Dict:
-        """Get summary analytics"""
+    def get_timeseries(self, material: str, granularity: str = "day", group_by: Optional[str] = None,
+                       start_date: Optional[str] = None, end_date: Optional[str] = None) -> Dict:
+        """Get day/week/month buckets (zero-filled), optionally split by a dimension"""
         try:
-            response = self.session.get(f"{self.base_url}/api/analytics/summary")
+            params = {'material': material, 'granularity': granularity}
+            if group_by:
+                params['group_by'] = group_by
+            if start_date:
+                params['start_date'] = start_date
+            if end_date:
+                params['end_date'] = end_date
+            
+            response = self.session.get(f"{self.base_url}/api/analytics/timeseries", params=params)
+            return self._handle_response(response)
+        except Exception as e:
+            st.warning(f"Failed to fetch time series: {e}")
+            return {}
+    
+    def get_summary_analytics(self, start_date: Optional[str] = None, end_date: Optional[str] = None,
+                              firma: Optional[str] = None) -> Dict:
+        """Get summary analytics (optionally for a date range / firma)"""
+        try:
+            params = {}
+            if start_date:
+                params['start_date'] = start_date
+            if end_date:
+                params['end_date'] = end_date
+            if firma:
+                params['firma'] = firma
+            
+            response = self.session.get(f"{self.base_url}/api/analytics/summary", params=params)
             return self._handle_response(response)
         except Exception as e:
             st.warning(f"Failed to fetch summary: {e}")
@@ -348,6 +376,18 @@ def get_api_client() -> APIClient:
     return APIClient()
 
 
+@st.cache_resource(on_release=lambda monitor: monitor.stop())
+def get_api_health_monitor(base_url: str = "http://localhost:8000") -> HealthMonitor:
+    """Background /health probe shared by all sessions"""
+    client = APIClient(base_url)
+    return HealthMonitor(
+        lambda: client.health_check(timeout=3.0),
+        interval=15,
+        timeout=3.0,
+        name="api-health"
+    ).start()
+
+
 
 
 
@@ -8,7 +8,8 @@ import os
 import requests
 from streamlit_lottie import st_lottie
 from streamlit_option_menu import option_menu
-from api_client import get_api_client
+from api_client import get_api_client, get_api_health_monitor
+from dataset_registry import DatasetRegistry, edit_session_frame, session_frame
 
 # ============================================
 # PAGE CONFIGURATION
@@ -300,45 +301,61 @@ def convert_df_to_excel(df):
         df.to_excel(writer, index=False, sheet_name='Veri')
     return output.getvalue()
 
-def load_data_from_api():
-    """Load data from API backend"""
+def empty_frames():
+    return {
+        'beton': pd.DataFrame(columns=[
+            'TARİH', 'FİRMA', 'İRSALİYE NO', 'BETON SINIFI', 
+            'TESLİM ŞEKLİ', 'MİKTAR (m3)', 'BLOK', 'AÇIKLAMA'
+        ]),
+        'demir': pd.DataFrame(columns=['TARİH', 'ETAP', 'İRSALİYE NO', 'TEDARİKÇİ', 'ÜRETİCİ']
+                              + [f"Q{i}" for i in [8, 10, 12, 14, 16, 18, 20, 22, 25, 28, 32]]
+                              + ['TOPLAM AĞIRLIK (kg)']),
+        'hasir': pd.DataFrame(columns=[
+            'TARİH', 'FİRMA', 'İRSALİYE NO', 'ETAP', 
+            'HASIR TİPİ', 'EBATLAR', 'ADET', 'AĞIRLIK (kg)', 'KULLANIM YERİ'
+        ]),
+    }
+
+def load_datasets():
+    """Load data (API first, fallback to local); runs once per process, not per session"""
     api_client = get_api_client()
+    frames = empty_frames()
     
-    # Check if API is available
-    if not api_client.health_check():
+    # Check if API is available (cached background probe; only the very first
+    # load waits, and never longer than the probe timeout)
+    health = get_api_health_monitor().wait_for_first_check()
+    if not health['ok']:
         st.warning("⚠️ Backend API is not available. Using local data mode.")
-        load_initial_data_local()
-        return
+        load_initial_data_local(frames)
+        return frames, False
     
     try:
         # Load Beton data
-        if st.session_state.beton_df.empty:
-            beton_data = api_client.get_all_beton()
-            if beton_data and not isinstance(beton_data, dict):
-                st.session_state.beton_df = api_client.api_to_dataframe(beton_data, "beton")
+        beton_data = api_client.get_all_beton()
+        if beton_data and not isinstance(beton_data, dict):
+            frames['beton'] = api_client.api_to_dataframe(beton_data, "beton")
         
         # Load Demir data
-        if st.session_state.demir_df.empty:
-            demir_data = api_client.get_all_demir()
-            if demir_data and not isinstance(demir_data, dict):
-                st.session_state.demir_df = api_client.api_to_dataframe(demir_data, "demir")
+        demir_data = api_client.get_all_demir()
+        if demir_data and not isinstance(demir_data, dict):
+            frames['demir'] = api_client.api_to_dataframe(demir_data, "demir")
         
         # Load Hasir data
-        if st.session_state.hasir_df.empty:
-            hasir_data = api_client.get_all_hasir()
-            if hasir_data and not isinstance(hasir_data, dict):
-                st.session_state.hasir_df = api_client.api_to_dataframe(hasir_data, "hasir")
+        hasir_data = api_client.get_all_hasir()
+        if hasir_data and not isinstance(hasir_data, dict):
+            frames['hasir'] = api_client.api_to_dataframe(hasir_data, "hasir")
         
-        # Mark that we're using API mode
-        st.session_state.api_mode = True
+        # API mode
+        return frames, True
         
     except Exception as e:
         st.error(f"Failed to load data from API: {e}")
-        load_initial_data_local()
+        load_initial_data_local(frames)
+        return frames, False
 
-def load_initial_data_local():
+def load_initial_data_local(frames):
     # Sadece veri boşsa yükleme yap (Mükerrer yüklemeyi önlemek için)
-    if st.session_state.beton_df.empty:
+    if frames['beton'].empty:
         file_path = r"C:\Users\emreb\Desktop\BETON-997.xlsx"
         if os.path.exists(file_path):
             try:
@@ -384,14 +401,14 @@ def load_initial_data_local():
                 df.loc[irsa_nums > 14000, 'FİRMA'] = 'ALBAYRAK BETON'
                 df.loc[irsa_nums <= 14000, 'FİRMA'] = 'ÖZYURT BETON'
 
-                # Session state'e aktar
-                st.session_state.beton_df = df
+                # Paylaşılan veri setine aktar
+                frames['beton'] = df
                 
             except Exception as e:
                 st.error(f"Beton verisi yüklenirken hata oluştu: {e}")
 
     # --- DEMİR VERİSİ YÜKLEME ---
-    if st.session_state.demir_df.empty:
+    if frames['demir'].empty:
         file_path_demir = r"C:\Users\emreb\Desktop\Demir_997.xlsx"
         if os.path.exists(file_path_demir):
             try:
@@ -458,13 +475,13 @@ def load_initial_data_local():
                          new_data.append(item)
                 
                 if new_data:
-                    st.session_state.demir_df = pd.DataFrame(new_data)
+                    frames['demir'] = pd.DataFrame(new_data)
                     
             except Exception as e:
                 st.error(f"Demir verisi yüklenirken hata oluştu: {e}")
 
     # --- HASIR VERİSİ YÜKLEME ---
-    if st.session_state.hasir_df.empty:
+    if frames['hasir'].empty:
         file_path_hasir = r"C:\Users\emreb\Desktop\Hasır_997.xlsx"
         if os.path.exists(file_path_hasir):
             try:
@@ -528,7 +545,7 @@ def load_initial_data_local():
                         new_hasir.append(item)
                         
                 if new_hasir:
-                    st.session_state.hasir_df = pd.DataFrame(new_hasir)
+                    frames['hasir'] = pd.DataFrame(new_hasir)
 
             except Exception as e:
                 st.error(f"Hasır verisi yüklenirken hata oluştu: {e}")
@@ -556,33 +573,29 @@ def get_plotly_theme():
     }
 
 # ============================================
-# SESSION STATE INITIALIZATION
+# SHARED DATASET
 # ============================================
-if 'beton_df' not in st.session_state:
-    st.session_state.beton_df = pd.DataFrame(columns=[
-        'TARİH', 'FİRMA', 'İRSALİYE NO', 'BETON SINIFI', 
-        'TESLİM ŞEKLİ', 'MİKTAR (m3)', 'BLOK', 'AÇIKLAMA'
-    ])
+DATASET_TTL = 600  # seconds; picks up records written by other API clients
 
-if 'demir_df' not in st.session_state:
-    cols = ['TARİH', 'ETAP', 'İRSALİYE NO', 'TEDARİKÇİ', 'ÜRETİCİ']
-    caplar = [f"Q{i}" for i in [8, 10, 12, 14, 16, 18, 20, 22, 25, 28, 32]]
-    cols.extend(caplar)
-    cols.append('TOPLAM AĞIRLIK (kg)')
-    st.session_state.demir_df = pd.DataFrame(columns=cols)
+@st.cache_resource
+def get_dataset_registry():
+    """One read-only copy of the data for all sessions (see dataset_registry.py)"""
+    return DatasetRegistry(load_datasets, ttl=DATASET_TTL)
 
-if 'hasir_df' not in st.session_state:
-    st.session_state.hasir_df = pd.DataFrame(columns=[
-        'TARİH', 'FİRMA', 'İRSALİYE NO', 'ETAP', 
-        'HASIR TİPİ', 'EBATLAR', 'ADET', 'AĞIRLIK (kg)', 'KULLANIM YERİ'
-    ])
+# Load initial data once per process (try API first, fallback to local)
+registry = get_dataset_registry()
+dataset = registry.current()
 
-# Initialize API mode flag
-if 'api_mode' not in st.session_state:
-    st.session_state.api_mode = False
+# Loaded during an API outage: switch back to the API once the health monitor sees it up
+# (at most once per successful probe, so a failing fetch doesn't reload on every rerun)
+health = get_api_health_monitor().status()
+if not dataset.api_mode and health['ok'] and health['checked_at'] > dataset.loaded_at:
+    registry.reload(dataset.version)
+    dataset = registry.current()
 
-# Load initial data (try API first, fallback to local)
-load_data_from_api()
+def get_df(name):
+    """Shared frame, or this session's own copy after a local-mode edit"""
+    return session_frame(registry, st.session_state, name)
 
 # Inject CSS
 inject_custom_css()
@@ -628,14 +641,18 @@ with st.sidebar:
     st.markdown("---")
     
     # API Status Indicator
-    if st.session_state.api_mode:
+    if dataset.api_mode:
         st.success("🟢 **API Connected**\nBackend Active")
     else:
         st.warning("🟡 **Local Mode**\nAPI Offline")
     
+    if st.button("🔄 Verileri Yenile", help="Paylaşılan veriyi API'den / dosyalardan yeniden yükle"):
+        registry.reload(dataset.version)
+        st.rerun()
+    
     st.markdown("---")
     st.markdown("### 📊 Quick Stats")
-    st.metric("Total Records", len(st.session_state.beton_df) + len(st.session_state.demir_df) + len(st.session_state.hasir_df))
+    st.metric("Total Records", len(get_df('beton')) + len(get_df('demir')) + len(get_df('hasir')))
     st.markdown("---")
     st.info("🚀 **Enterprise Edition**\nPowered by Advanced Analytics")
 
@@ -649,19 +666,19 @@ if menu == "Dashboard":
     # KPI Cards - Bento Grid Style
     col1, col2, col3, col4 = st.columns(4)
     
-    toplam_beton = st.session_state.beton_df['MİKTAR (m3)'].sum()
-    toplam_demir = st.session_state.demir_df['TOPLAM AĞIRLIK (kg)'].sum()
-    toplam_hasir = st.session_state.hasir_df['AĞIRLIK (kg)'].sum()
-    total_deliveries = len(st.session_state.beton_df)
+    toplam_beton = get_df('beton')['MİKTAR (m3)'].sum()
+    toplam_demir = get_df('demir')['TOPLAM AĞIRLIK (kg)'].sum()
+    toplam_hasir = get_df('hasir')['AĞIRLIK (kg)'].sum()
+    total_deliveries = len(get_df('beton'))
     
     with col1:
         st.metric("🏗️ Total Concrete", f"{toplam_beton:.1f} m³", delta=f"{total_deliveries} deliveries")
     
     with col2:
-        st.metric("⚙️ Total Rebar", f"{toplam_demir/1000:.1f} tons", delta=f"{len(st.session_state.demir_df)} shipments")
+        st.metric("⚙️ Total Rebar", f"{toplam_demir/1000:.1f} tons", delta=f"{len(get_df('demir'))} shipments")
     
     with col3:
-        st.metric("🕸️ Steel Mesh", f"{toplam_hasir/1000:.1f} tons", delta=f"{len(st.session_state.hasir_df)} orders")
+        st.metric("🕸️ Steel Mesh", f"{toplam_hasir/1000:.1f} tons", delta=f"{len(get_df('hasir'))} orders")
     
     with col4:
         total_value = toplam_beton * 1000 + toplam_demir * 15 + toplam_hasir * 18  # Estimated
@@ -670,7 +687,7 @@ if menu == "Dashboard":
     st.markdown("---")
     
     # Charts Grid
-    if not st.session_state.beton_df.empty:
+    if not get_df('beton').empty:
         st.markdown("### 🏢 Concrete Distribution Analysis")
         
         c1, c2 = st.columns(2)
@@ -678,7 +695,7 @@ if menu == "Dashboard":
         with c1:
             # Concrete by Class
             fig_class = px.pie(
-                st.session_state.beton_df, 
+                get_df('beton'), 
                 names='BETON SINIFI', 
                 values='MİKTAR (m3)', 
                 title='Concrete by Class',
@@ -690,7 +707,7 @@ if menu == "Dashboard":
         
         with c2:
             # Concrete by Company
-            firma_grp = st.session_state.beton_df.groupby('FİRMA')['MİKTAR (m3)'].sum().reset_index()
+            firma_grp = get_df('beton').groupby('FİRMA')['MİKTAR (m3)'].sum().reset_index()
             fig_firma = px.bar(
                 firma_grp,
                 x='FİRMA',
@@ -705,7 +722,7 @@ if menu == "Dashboard":
         
         # Block Analysis
         st.markdown("### 🏗️ Concrete Distribution by Block")
-        blok_grp = st.session_state.beton_df.groupby('BLOK')['MİKTAR (m3)'].sum().reset_index()
+        blok_grp = get_df('beton').groupby('BLOK')['MİKTAR (m3)'].sum().reset_index()
         blok_grp = blok_grp.sort_values(by='MİKTAR (m3)', ascending=False)
         
         fig_blok = px.bar(
@@ -720,11 +737,11 @@ if menu == "Dashboard":
         fig_blok.update_layout(**get_plotly_theme()['layout'], height=400)
         st.plotly_chart(fig_blok, use_container_width=True)
     
-    if not st.session_state.demir_df.empty:
+    if not get_df('demir').empty:
         st.markdown("---")
         st.markdown("### ⚙️ Rebar (Iron) Analytics")
         
-        df_demir_analiz = st.session_state.demir_df.copy()
+        df_demir_analiz = get_df('demir').copy()
         q_cols = [c for c in df_demir_analiz.columns if c.startswith('Q') and c[1:].isdigit()]
         
         c1, c2 = st.columns(2)
@@ -759,11 +776,11 @@ if menu == "Dashboard":
                 fig_tedarik.update_layout(**get_plotly_theme()['layout'])
                 st.plotly_chart(fig_tedarik, use_container_width=True)
     
-    if not st.session_state.hasir_df.empty:
+    if not get_df('hasir').empty:
         st.markdown("---")
         st.markdown("### 🕸️ Steel Mesh Analytics")
         
-        df_hasir_analiz = st.session_state.hasir_df.copy()
+        df_hasir_analiz = get_df('hasir').copy()
         
         c1, c2 = st.columns(2)
         
@@ -811,14 +828,14 @@ elif menu == "Beton":
                 with open(temp_path, 'wb') as f:
                     f.write(uploaded_file.getvalue())
                 
-                if st.session_state.api_mode:
+                if dataset.api_mode:
                     api_client = get_api_client()
                     result = api_client.import_beton_excel(temp_path)
                     if 'error' not in result:
                         st.success(f"✅ Imported {result.get('count', 0)} records!")
                         # Refresh data
                         beton_data = api_client.get_all_beton()
-                        st.session_state.beton_df = api_client.api_to_dataframe(beton_data, "beton")
+                        registry.publish('beton', api_client.api_to_dataframe(beton_data, "beton"))
                     else:
                         st.error(f"Import failed: {result.get('error')}")
                 else:
@@ -849,7 +866,7 @@ elif menu == "Beton":
             submitted = st.form_submit_button("💾 Save Record")
             
             if submitted:
-                if st.session_state.api_mode:
+                if dataset.api_mode:
                     # Use API
                     api_client = get_api_client()
                     data = {
@@ -867,7 +884,7 @@ elif menu == "Beton":
                         st.success("✅ Concrete record added successfully!")
                         # Refresh data from API
                         beton_data = api_client.get_all_beton()
-                        st.session_state.beton_df = api_client.api_to_dataframe(beton_data, "beton")
+                        registry.publish('beton', api_client.api_to_dataframe(beton_data, "beton"))
                         st.rerun()
                     else:
                         st.error(f"Failed to save: {result.get('error')}")
@@ -878,16 +895,17 @@ elif menu == "Beton":
                         'BETON SINIFI': beton_sinifi, 'TESLİM ŞEKLİ': teslim,
                         'MİKTAR (m3)': miktar, 'BLOK': blok, 'AÇIKLAMA': aciklama
                     }
-                    st.session_state.beton_df = pd.concat([st.session_state.beton_df, pd.DataFrame([new_row])], ignore_index=True)
+                    edit_session_frame(registry, st.session_state, 'beton',
+                                       lambda df: pd.concat([df, pd.DataFrame([new_row])], ignore_index=True))
                     st.success("✅ Concrete record added successfully!")
                     st.rerun()
     
     st.markdown("### 📋 Delivery Records")
-    st.dataframe(st.session_state.beton_df, use_container_width=True, height=400)
+    st.dataframe(get_df('beton'), use_container_width=True, height=400)
     
     st.download_button(
         label="📥 Download as Excel",
-        data=convert_df_to_excel(st.session_state.beton_df),
+        data=convert_df_to_excel(get_df('beton')),
         file_name='Concrete_Records.xlsx',
         mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
     )
@@ -907,13 +925,13 @@ elif menu == "Demir":
                 with open(temp_path, 'wb') as f:
                     f.write(uploaded_file.getvalue())
                 
-                if st.session_state.api_mode:
+                if dataset.api_mode:
                     api_client = get_api_client()
                     result = api_client.import_demir_excel(temp_path)
                     if 'error' not in result:
                         st.success(f"✅ Imported {result.get('count', 0)} records!")
                         demir_data = api_client.get_all_demir()
-                        st.session_state.demir_df = api_client.api_to_dataframe(demir_data, "demir")
+                        registry.publish('demir', api_client.api_to_dataframe(demir_data, "demir"))
                     else:
                         st.error(f"Import failed: {result.get('error')}")
                 else:
@@ -949,7 +967,7 @@ elif menu == "Demir":
             if submitted:
                 toplam_kg = sum(kg_values.values())
                 
-                if st.session_state.api_mode:
+                if dataset.api_mode:
                     # Use API
                     api_client = get_api_client()
                     data = {
@@ -969,7 +987,7 @@ elif menu == "Demir":
                         st.success(f"✅ Total {toplam_kg} kg rebar recorded!")
                         # Refresh data from API
                         demir_data = api_client.get_all_demir()
-                        st.session_state.demir_df = api_client.api_to_dataframe(demir_data, "demir")
+                        registry.publish('demir', api_client.api_to_dataframe(demir_data, "demir"))
                         st.rerun()
                     else:
                         st.error(f"Failed to save: {result.get('error')}")
@@ -982,29 +1000,30 @@ elif menu == "Demir":
                     }
                     new_row.update(kg_values)
                     
-                    st.session_state.demir_df = pd.concat([st.session_state.demir_df, pd.DataFrame([new_row])], ignore_index=True)
+                    edit_session_frame(registry, st.session_state, 'demir',
+                                       lambda df: pd.concat([df, pd.DataFrame([new_row])], ignore_index=True))
                     st.success(f"✅ Total {toplam_kg} kg rebar recorded!")
                     st.rerun()
 
     st.markdown("### 📋 Delivery Records")
-    st.dataframe(st.session_state.demir_df, use_container_width=True, height=400)
+    st.dataframe(get_df('demir'), use_container_width=True, height=400)
     
     st.download_button(
         label="📥 Download as Excel",
-        data=convert_df_to_excel(st.session_state.demir_df),
+        data=convert_df_to_excel(get_df('demir')),
         file_name='Rebar_Records.xlsx',
         mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
     )
     
     # Analytics
-    if not st.session_state.demir_df.empty:
+    if not get_df('demir').empty:
         st.markdown("---")
         st.markdown("### 📊 Rebar Analytics")
         
         tab1, tab2 = st.tabs(["📏 Diameter Analysis", "📈 Supplier & Timeline"])
         
         with tab1:
-            df_demir_analiz = st.session_state.demir_df.copy()
+            df_demir_analiz = get_df('demir').copy()
             q_cols = [c for c in df_demir_analiz.columns if c.startswith('Q') and c[1:].isdigit()]
             
             if q_cols:
@@ -1069,13 +1088,13 @@ elif menu == "Hasır":
                 with open(temp_path, 'wb') as f:
                     f.write(uploaded_file.getvalue())
                 
-                if st.session_state.api_mode:
+                if dataset.api_mode:
                     api_client = get_api_client()
                     result = api_client.import_hasir_excel(temp_path)
                     if 'error' not in result:
                         st.success(f"✅ Imported {result.get('count', 0)} records!")
                         hasir_data = api_client.get_all_hasir()
-                        st.session_state.hasir_df = api_client.api_to_dataframe(hasir_data, "hasir")
+                        registry.publish('hasir', api_client.api_to_dataframe(hasir_data, "hasir"))
                     else:
                         st.error(f"Import failed: {result.get('error')}")
                 else:
@@ -1105,7 +1124,7 @@ elif menu == "Hasır":
             submitted = st.form_submit_button("💾 Save Record")
             
             if submitted:
-                if st.session_state.api_mode:
+                if dataset.api_mode:
                     # Use API
                     api_client = get_api_client()
                     data = {
@@ -1124,7 +1143,7 @@ elif menu == "Hasır":
                         st.success("✅ Mesh record added successfully!")
                         # Refresh data from API
                         hasir_data = api_client.get_all_hasir()
-                        st.session_state.hasir_df = api_client.api_to_dataframe(hasir_data, "hasir")
+                        registry.publish('hasir', api_client.api_to_dataframe(hasir_data, "hasir"))
                         st.rerun()
                     else:
                         st.error(f"Failed to save: {result.get('error')}")
@@ -1135,16 +1154,17 @@ elif menu == "Hasır":
                         'ETAP': "General", 'HASIR TİPİ': tip, 'EBATLAR': ebat,
                         'ADET': adet, 'AĞIRLIK (kg)': agirlik, 'KULLANIM YERİ': yer
                     }
-                    st.session_state.hasir_df = pd.concat([st.session_state.hasir_df, pd.DataFrame([new_row])], ignore_index=True)
+                    edit_session_frame(registry, st.session_state, 'hasir',
+                                       lambda df: pd.concat([df, pd.DataFrame([new_row])], ignore_index=True))
                     st.success("✅ Mesh record added successfully!")
                     st.rerun()
 
     st.markdown("### 📋 Delivery Records")
-    st.dataframe(st.session_state.hasir_df, use_container_width=True, height=400)
+    st.dataframe(get_df('hasir'), use_container_width=True, height=400)
     
     st.download_button(
         label="📥 Download as Excel",
-        data=convert_df_to_excel(st.session_state.hasir_df),
+        data=convert_df_to_excel(get_df('hasir')),
         file_name='Mesh_Records.xlsx',
         mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
     )
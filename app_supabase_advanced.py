@@ -7,6 +7,7 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime, date
 from db_manager_rest import get_db_manager_rest
+from health_monitor import HealthMonitor
 import plotly.express as px
 import plotly.graph_objects as go
 
@@ -41,6 +42,11 @@ st.markdown("""
 def init_db():
     return get_db_manager_rest()
 
+@st.cache_resource(on_release=lambda monitor: monitor.stop())
+def get_db_health_monitor(_db):
+    """Background connection check shared by all sessions"""
+    return HealthMonitor(_db.test_connection, interval=30, timeout=5, name="supabase-health").start()
+
 # Cache data functions for performance
 @st.cache_data(ttl=600)  # Cache for 10 minutes
 def get_cached_concrete_summary():
@@ -82,16 +88,20 @@ st.sidebar.title("🏗️ Şantiye 997")
 # Add refresh button to sidebar
 if st.sidebar.button("🔄 Verileri Yenile", help="Önbelleği temizle ve verileri yenile"):
     st.cache_data.clear()
+    get_db_health_monitor(db).request_check()
     st.sidebar.success("Önbellek temizlendi!")
     st.rerun()
 
 st.sidebar.markdown("---")
 
-# Check connection
-if db.test_connection():
-    st.sidebar.success("✅ Veritabanı Bağlı")
+# Check connection (cached result of the background probe)
+health = get_db_health_monitor(db).status()
+if health['ok'] is None:
+    st.sidebar.info("⏳ Bağlantı kontrol ediliyor...")
+elif health['ok']:
+    st.sidebar.success(f"✅ Veritabanı Bağlı ({health['latency_ms']:.0f} ms)")
 else:
-    st.sidebar.error("❌ Bağlantı Hatası")
+    st.sidebar.error(f"❌ Bağlantı Hatası: {health['error']}")
 
 page = st.sidebar.radio(
     "Navigasyon",
@@ -0,0 +1,283 @@
+"""
+Async API (v2)
+Same CRUD, analytics and import endpoints as main.py, served by async handlers
+on AsyncSession so a request doesn't hold a threadpool slot while waiting on the database.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import select, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from datetime import date
+
+from database import Beton, Demir, Hasir
+from database_async import get_async_db
+from serializers import list_select, rows_response
+from analytics import (
+    summary_statement, summary_response, by_date_statement, grouped_sum_statement, grouped_sum_response,
+    timeseries_statement, timeseries_response, validate_timeseries, cap_totals_statement, cap_totals_response,
+    timeseries_bounds_statement, effective_range, timeseries_range_error
+)
+from metrics import import_timer
+from importers import apply_beton_firma_rule, parse_beton_excel, parse_demir_excel, parse_hasir_excel
+from lookup_api import (
+    MODEL_MATERIAL, WAYBILL_TABLES, add_all_or_409, is_waybill_conflict, reimport_or_409, waybill_conflict, waybill_matches
+)
+from schemas import (
+    BetonCreate, BetonResponse, DemirCreate, DemirResponse,
+    HasirCreate, HasirResponse
+)
+
+router = APIRouter(prefix="/api/v2", tags=["async"], default_response_class=ORJSONResponse)
+
+
+async def _get_or_404(db: AsyncSession, model, record_id: int, detail: str):
+    record = await db.get(model, record_id)
+    if not record:
+        raise HTTPException(status_code=404, detail=detail)
+    return record
+
+
+async def _commit_or_409(db: AsyncSession, obj):
+    """Async counterpart of lookup_api.commit_or_409"""
+    material = MODEL_MATERIAL[type(obj)]
+    irsaliye_no, firma = obj.irsaliye_no, getattr(obj, WAYBILL_TABLES[material][1].key)
+    db.add(obj)
+    try:
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        if not is_waybill_conflict(e):
+            raise
+        matches = await db.run_sync(lambda session: waybill_matches(session.connection(), irsaliye_no, firma, material))
+        raise waybill_conflict(irsaliye_no, matches)
+    await db.refresh(obj)
+    return obj
+
+
+async def _grouped_sum(db: AsyncSession, column, value, *where, default=None) -> dict:
+    return grouped_sum_response(await db.execute(grouped_sum_statement(column, value, *where)), default)
+
+
+# ========== BETON ENDPOINTS ==========
+
+@router.post("/beton/", response_model=BetonResponse)
+async def create_beton(beton: BetonCreate, db: AsyncSession = Depends(get_async_db)):
+    db_beton = apply_beton_firma_rule(Beton(**beton.dict()))
+    return await _commit_or_409(db, db_beton)
+
+@router.get("/beton/", response_model=List[BetonResponse])
+async def get_all_beton(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_async_db)):
+    return rows_response(await db.execute(list_select(Beton, BetonResponse).offset(skip).limit(limit)))
+
+@router.get("/beton/{beton_id}", response_model=BetonResponse)
+async def get_beton(beton_id: int, db: AsyncSession = Depends(get_async_db)):
+    return await _get_or_404(db, Beton, beton_id, "Beton kaydı bulunamadı")
+
+@router.put("/beton/{beton_id}", response_model=BetonResponse)
+async def update_beton(beton_id: int, beton: BetonCreate, db: AsyncSession = Depends(get_async_db)):
+    db_beton = await _get_or_404(db, Beton, beton_id, "Beton kaydı bulunamadı")
+    for key, value in beton.dict().items():
+        setattr(db_beton, key, value)
+    apply_beton_firma_rule(db_beton)
+    return await _commit_or_409(db, db_beton)
+
+@router.delete("/beton/{beton_id}")
+async def delete_beton(beton_id: int, db: AsyncSession = Depends(get_async_db)):
+    beton = await _get_or_404(db, Beton, beton_id, "Beton kaydı bulunamadı")
+    await db.delete(beton)
+    await db.commit()
+    return {"message": "Kayıt silindi"}
+
+# ========== DEMİR ENDPOINTS ==========
+
+@router.post("/demir/", response_model=DemirResponse)
+async def create_demir(demir: DemirCreate, db: AsyncSession = Depends(get_async_db)):
+    db_demir = Demir(**demir.dict())
+    return await _commit_or_409(db, db_demir)
+
+@router.get("/demir/", response_model=List[DemirResponse])
+async def get_all_demir(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_async_db)):
+    return rows_response(await db.execute(list_select(Demir, DemirResponse).offset(skip).limit(limit)))
+
+@router.get("/demir/{demir_id}", response_model=DemirResponse)
+async def get_demir(demir_id: int, db: AsyncSession = Depends(get_async_db)):
+    return await _get_or_404(db, Demir, demir_id, "Demir kaydı bulunamadı")
+
+@router.put("/demir/{demir_id}", response_model=DemirResponse)
+async def update_demir(demir_id: int, demir: DemirCreate, db: AsyncSession = Depends(get_async_db)):
+    db_demir = await _get_or_404(db, Demir, demir_id, "Demir kaydı bulunamadı")
+    for key, value in demir.dict().items():
+        setattr(db_demir, key, value)
+    return await _commit_or_409(db, db_demir)
+
+@router.delete("/demir/{demir_id}")
+async def delete_demir(demir_id: int, db: AsyncSession = Depends(get_async_db)):
+    demir = await _get_or_404(db, Demir, demir_id, "Demir kaydı bulunamadı")
+    await db.delete(demir)
+    await db.commit()
+    return {"message": "Kayıt silindi"}
+
+# ========== HASIR ENDPOINTS ==========
+
+@router.post("/hasir/", response_model=HasirResponse)
+async def create_hasir(hasir: HasirCreate, db: AsyncSession = Depends(get_async_db)):
+    db_hasir = Hasir(**hasir.dict())
+    return await _commit_or_409(db, db_hasir)
+
+@router.get("/hasir/", response_model=List[HasirResponse])
+async def get_all_hasir(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_async_db)):
+    return rows_response(await db.execute(list_select(Hasir, HasirResponse).offset(skip).limit(limit)))
+
+@router.get("/hasir/{hasir_id}", response_model=HasirResponse)
+async def get_hasir(hasir_id: int, db: AsyncSession = Depends(get_async_db)):
+    return await _get_or_404(db, Hasir, hasir_id, "Hasır kaydı bulunamadı")
+
+@router.put("/hasir/{hasir_id}", response_model=HasirResponse)
+async def update_hasir(hasir_id: int, hasir: HasirCreate, db: AsyncSession = Depends(get_async_db)):
+    db_hasir = await _get_or_404(db, Hasir, hasir_id, "Hasır kaydı bulunamadı")
+    for key, value in hasir.dict().items():
+        setattr(db_hasir, key, value)
+    return await _commit_or_409(db, db_hasir)
+
+@router.delete("/hasir/{hasir_id}")
+async def delete_hasir(hasir_id: int, db: AsyncSession = Depends(get_async_db)):
+    hasir = await _get_or_404(db, Hasir, hasir_id, "Hasır kaydı bulunamadı")
+    await db.delete(hasir)
+    await db.commit()
+    return {"message": "Kayıt silindi"}
+
+# ========== ANALYTICS ENDPOINTS ==========
+# Aggregation runs in the database instead of loading every row into Python.
+
+@router.get("/analytics/dashboard")
+async def get_dashboard_stats(db: AsyncSession = Depends(get_async_db)):
+    # Beton Analytics
+    toplam_beton = (await db.execute(select(func.coalesce(func.sum(Beton.miktar), 0)))).scalar()
+    beton_analytics = {
+        "toplam_miktar": toplam_beton,
+        "firma_dagilimi": await _grouped_sum(db, Beton.firma, Beton.miktar, default="Belirtilmemiş"),
+        "sinif_dagilimi": await _grouped_sum(db, Beton.beton_sinifi, Beton.miktar, default="Belirtilmemiş"),
+        "blok_dagilimi": await _grouped_sum(db, Beton.blok, Beton.miktar, default="Bilinmiyor")
+    }
+
+    # Demir Analytics
+    toplam_demir = (await db.execute(select(func.coalesce(func.sum(Demir.toplam_agirlik), 0)))).scalar()
+    demir_analytics = {
+        "toplam_agirlik": toplam_demir,
+        "cap_dagilimi": cap_totals_response(await db.execute(cap_totals_statement())),
+        "tedarikci_dagilimi": await _grouped_sum(db, Demir.tedarikci, Demir.toplam_agirlik, Demir.tedarikci_id.is_not(None))
+    }
+
+    # Hasir Analytics
+    toplam_hasir = (await db.execute(select(func.coalesce(func.sum(Hasir.agirlik), 0)))).scalar()
+    hasir_analytics = {
+        "toplam_agirlik": toplam_hasir,
+        "firma_dagilimi": await _grouped_sum(db, Hasir.firma, Hasir.agirlik, default="Belirtilmemiş"),
+        "tip_dagilimi": await _grouped_sum(
+            db, Hasir.hasir_tipi, Hasir.agirlik, Hasir.hasir_tipi.is_not(None), Hasir.hasir_tipi != ""
+        )
+    }
+
+    return {
+        "toplam_beton": toplam_beton,
+        "toplam_demir": toplam_demir,
+        "toplam_hasir": toplam_hasir,
+        "beton_analytics": beton_analytics,
+        "demir_analytics": demir_analytics,
+        "hasir_analytics": hasir_analytics
+    }
+
+@router.get("/analytics/beton/by-date")
+async def get_beton_by_date(start_date: Optional[date] = None, end_date: Optional[date] = None,
+                            db: AsyncSession = Depends(get_async_db)):
+    """Tarihe göre beton dökümü"""
+    rows = await db.execute(by_date_statement(Beton, Beton.miktar, start_date, end_date))
+    return {"data": {bucket: total for bucket, total in rows}}
+
+@router.get("/analytics/demir/by-date")
+async def get_demir_by_date(start_date: Optional[date] = None, end_date: Optional[date] = None,
+                            db: AsyncSession = Depends(get_async_db)):
+    """Tarihe göre demir girişi"""
+    rows = await db.execute(by_date_statement(Demir, Demir.toplam_agirlik, start_date, end_date))
+    return {"data": {bucket: total for bucket, total in rows}}
+
+@router.get("/analytics/timeseries")
+async def get_timeseries(material: str, granularity: str = "day", group_by: Optional[str] = None,
+                         start_date: Optional[date] = None, end_date: Optional[date] = None,
+                         db: AsyncSession = Depends(get_async_db)):
+    """Gün/hafta/ay periyotlu zaman serisi; boş periyotlar 0 ile doldurulur"""
+    error = validate_timeseries(material, granularity, group_by, start_date, end_date)
+    if not error and (start_date is None) != (end_date is None):
+        bounds = (await db.execute(timeseries_bounds_statement(material, group_by))).one()
+        error = timeseries_range_error(*effective_range(bounds, start_date, end_date), granularity)
+    if error:
+        raise HTTPException(status_code=400, detail=error)
+    rows = await db.execute(timeseries_statement(material, granularity, group_by, start_date, end_date))
+    return timeseries_response(rows, material, granularity, group_by, start_date, end_date)
+
+@router.get("/analytics/summary")
+async def get_summary_stats(start_date: Optional[date] = None, end_date: Optional[date] = None,
+                            firma: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
+    """Özet istatistikler (tek sorgu; opsiyonel tarih aralığı ve firma/tedarikçi filtresi)"""
+    return summary_response(await db.execute(summary_statement(start_date, end_date, firma)))
+
+# ========== EXCEL IMPORT ENDPOINTS ==========
+# Parsing is CPU-bound pandas work, so it runs in the threadpool; only the insert is awaited.
+
+@router.post("/import/beton")
+async def import_beton_excel(file: UploadFile = File(...), replace: bool = False, db: AsyncSession = Depends(get_async_db)):
+    try:
+        with import_timer("beton") as imported:
+            contents = await file.read()
+            records = await run_in_threadpool(parse_beton_excel, contents)
+            if replace:
+                result = await db.run_sync(reimport_or_409, "beton", records)
+                imported.rows = len(records)
+                return {"message": f"{result['replaced']} eski beton kaydı {len(records)} yeni kayıtla değiştirildi", **result}
+            await db.run_sync(add_all_or_409, records)
+            imported.rows = len(records)
+        return {"message": f"{len(records)} beton kaydı başarıyla eklendi"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Excel import hatası: {str(e)}")
+
+@router.post("/import/demir")
+async def import_demir_excel(file: UploadFile = File(...), replace: bool = False, db: AsyncSession = Depends(get_async_db)):
+    try:
+        with import_timer("demir") as imported:
+            contents = await file.read()
+            records = await run_in_threadpool(parse_demir_excel, contents)
+            if replace:
+                result = await db.run_sync(reimport_or_409, "demir", records)
+                imported.rows = len(records)
+                return {"message": f"{result['replaced']} eski demir kaydı {len(records)} yeni kayıtla değiştirildi", **result}
+            await db.run_sync(add_all_or_409, records)
+            imported.rows = len(records)
+        return {"message": f"{len(records)} demir kaydı başarıyla eklendi"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Excel import hatası: {str(e)}")
+
+@router.post("/import/hasir")
+async def import_hasir_excel(file: UploadFile = File(...), replace: bool = False, db: AsyncSession = Depends(get_async_db)):
+    try:
+        with import_timer("hasir") as imported:
+            contents = await file.read()
+            records = await run_in_threadpool(parse_hasir_excel, contents)
+            if replace:
+                result = await db.run_sync(reimport_or_409, "hasir", records)
+                imported.rows = len(records)
+                return {"message": f"{result['replaced']} eski hasır kaydı {len(records)} yeni kayıtla değiştirildi", **result}
+            await db.run_sync(add_all_or_409, records)
+            imported.rows = len(records)
+        return {"message": f"{len(records)} hasır kaydı başarıyla eklendi"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Excel import hatası: {str(e)}")
@@ -0,0 +1,102 @@
+"""
+Serialization Benchmark - list response paths
+Measures the cost of turning N beton rows into a JSON body: FastAPI's default path
+(response_model validation + json.dumps) vs plain rows + orjson, plus gzip/brotli cost.
+
+Kullanım:
+    python bench_serialization.py --rows 10000 --repeat 5
+"""
+
+import argparse
+import gzip
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from typing import List, Tuple
+
+import orjson
+from pydantic import TypeAdapter
+
+from config import settings
+from database import Beton
+from schemas import BetonResponse
+from serializers import response_columns
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def make_rows(count: int) -> Tuple[List[str], List[tuple]]:
+    start = datetime(2025, 1, 1, 8, 0, 0)
+    columns = [c.name for c in response_columns(Beton, BetonResponse)]
+    rows = []
+    for i in range(count):
+        values = {
+            "id": i + 1,
+            "created_at": start + timedelta(minutes=i),
+            "tarih": start + timedelta(hours=i),
+            "firma": random.choice(["ÖZYURT BETON", "ALBAYRAK BETON"]),
+            "irsaliye_no": str(10000 + i),
+            "beton_sinifi": random.choice(["C25", "C30", "C35"]),
+            "teslim_sekli": random.choice(["POMPALI", "MİKSERLİ"]),
+            "miktar": round(random.uniform(1, 20), 1),
+            "blok": random.choice(["A1", "B2", "GK1"]),
+            "aciklama": "benchmark",
+        }
+        rows.append(tuple(values[c] for c in columns))
+    return columns, rows
+
+
+def fastapi_default(columns, rows) -> bytes:
+    """ORM objects -> response_model validation -> JSON mode dump -> json.dumps (JSONResponse)"""
+    objects = [Beton(**dict(zip(columns, row))) for row in rows]
+    adapter = TypeAdapter(List[BetonResponse])
+    content = adapter.dump_python(adapter.validate_python(objects, from_attributes=True), mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def fast_path(columns, rows) -> bytes:
+    """Column rows -> dicts -> orjson (serializers.rows_response)"""
+    return orjson.dumps([dict(zip(columns, row)) for row in rows])
+
+
+def timed(fn, repeat: int):
+    """Best wall time in ms and the output size in bytes"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        output = fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000, len(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List response serialization benchmark")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    columns, rows = make_rows(args.rows)
+    body = fast_path(columns, rows)
+    per_10k = 10000 / args.rows
+
+    results = [
+        ("FastAPI varsayılan", *timed(lambda: fastapi_default(columns, rows), args.repeat)),
+        ("orjson (hızlı yol)", *timed(lambda: fast_path(columns, rows), args.repeat)),
+    ]
+    for level in sorted({settings.COMPRESSION_GZIP_LEVEL, 9}):
+        results.append((f"gzip (seviye {level})", *timed(lambda: gzip.compress(body, level), args.repeat)))
+    if brotli:
+        results.append(("brotli (kalite 4)", *timed(lambda: brotli.compress(body, quality=4), args.repeat)))
+
+    print(f"📦 {args.rows} satır, en iyi {args.repeat} deneme (ms / 10k satır)")
+    print(f"{'yol':<22}{'ms':>10}{'boyut KB':>12}")
+    for name, ms, size in results:
+        print(f"{name:<22}{ms * per_10k:>10.1f}{size / 1024:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
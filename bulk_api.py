@@ -0,0 +1,189 @@
+"""
+Bulk CRUD endpoints
+Create, patch and delete many beton/demir/hasir records in one request.
+Each call runs in a single transaction with executemany and returns a result per item.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Body
+from fastapi.responses import ORJSONResponse
+from pydantic import ValidationError
+from sqlalchemy import select, insert, update, delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from typing import Any, Callable, Dict, List, Optional
+
+from config import settings
+from database import get_db, Beton, Demir, Hasir
+from dimensions import name_filter, resolve_rows
+from importers import resolve_beton_firma
+from lookup_api import conflicting_items, is_waybill_conflict
+from schemas import (
+    BetonCreate, DemirCreate, HasirCreate,
+    BetonBulkUpdate, DemirBulkUpdate, HasirBulkUpdate, BulkDeleteRequest
+)
+
+router = APIRouter(prefix="/api", tags=["bulk"], default_response_class=ORJSONResponse)
+
+
+def _validate_items(items: List[Dict[str, Any]], schema, exclude_unset: bool = False) -> List[Dict]:
+    """Validate every item; reject the whole batch with per-item errors if any is invalid"""
+    if not items:
+        raise HTTPException(status_code=400, detail="Boş liste gönderildi")
+    if len(items) > settings.BULK_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Tek istekte en fazla {settings.BULK_MAX_ITEMS} kayıt gönderilebilir")
+
+    rows, errors = [], []
+    for index, item in enumerate(items):
+        try:
+            rows.append(schema(**item).dict(exclude_unset=exclude_unset))
+        except (ValidationError, TypeError) as e:
+            details = e.errors() if isinstance(e, ValidationError) else [{"msg": str(e)}]
+            errors.append({"index": index, "status": "invalid",
+                           "errors": [{"loc": list(d.get("loc", [])), "msg": d["msg"]} for d in details]})
+    if errors:
+        raise HTTPException(status_code=422, detail={"message": "Hatalı kayıtlar var, hiçbir değişiklik yapılmadı", "results": errors})
+    return rows
+
+
+def _bulk_create(db: Session, model, rows: List[Dict]) -> Dict:
+    """INSERT ... RETURNING id as one batched executemany, ids mapped back to input order"""
+    try:
+        resolve_rows(db.connection(), model, rows)
+        # insertmanyvalues returns the ids in input order (RETURNING order alone isn't guaranteed)
+        statement = insert(model).returning(model.id, sort_by_parameter_order=True)
+        ids = db.execute(statement, rows).scalars().all()
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        if not is_waybill_conflict(e):
+            raise HTTPException(status_code=400, detail=f"Toplu ekleme hatası: {str(e)}")
+        raise HTTPException(status_code=409, detail={
+            "message": "Kayıtlı irsaliyeler var, hiçbir kayıt eklenmedi",
+            "results": conflicting_items(db.connection(), model, rows)
+        })
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=f"Toplu ekleme hatası: {str(e)}")
+
+    return {
+        "success": True,
+        "created": len(ids),
+        "results": [{"index": i, "id": record_id, "status": "created"} for i, record_id in enumerate(ids)]
+    }
+
+
+def _bulk_update(db: Session, model, rows: List[Dict], prepare: Optional[Callable[[Dict], Dict]] = None) -> Dict:
+    """Bulk UPDATE by primary key (executemany per distinct column set); unknown ids are reported"""
+    requested = [row["id"] for row in rows]
+    existing = set(db.execute(select(model.id).where(model.id.in_(requested))).scalars())
+
+    to_update = [prepare(row) if prepare else row for row in rows if row["id"] in existing]
+    try:
+        if to_update:
+            db.execute(update(model), resolve_rows(db.connection(), model, to_update))
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        status = 409 if is_waybill_conflict(e) else 400
+        raise HTTPException(status_code=status, detail=f"Toplu güncelleme hatası: {str(e.orig)}")
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=f"Toplu güncelleme hatası: {str(e)}")
+
+    results = [
+        {"index": i, "id": record_id, "status": "updated" if record_id in existing else "not_found"}
+        for i, record_id in enumerate(requested)
+    ]
+    return {"success": True, "updated": len(to_update), "not_found": len(rows) - len(to_update), "results": results}
+
+
+def _bulk_delete(db: Session, model, request: BulkDeleteRequest, firma_column) -> Dict:
+    """DELETE by id list (per-item results) or by date/firma filter (count)"""
+    conditions = []
+    if request.tarih_baslangic:
+        conditions.append(model.tarih >= request.tarih_baslangic)
+    if request.tarih_bitis:
+        conditions.append(model.tarih <= request.tarih_bitis)
+    if request.firma:
+        conditions.append(name_filter(firma_column, request.firma))
+
+    if not request.ids and not conditions:
+        raise HTTPException(status_code=400, detail="En az bir silme kriteri (ids, tarih veya firma) gerekli")
+
+    try:
+        if request.ids:
+            if len(request.ids) > settings.BULK_MAX_ITEMS:
+                raise HTTPException(status_code=413, detail=f"Tek istekte en fazla {settings.BULK_MAX_ITEMS} kayıt silinebilir")
+            existing = set(db.execute(
+                select(model.id).where(model.id.in_(request.ids), *conditions)
+            ).scalars())
+            if existing:
+                db.execute(delete(model).where(model.id.in_(existing)))
+            db.commit()
+            results = [
+                {"index": i, "id": record_id, "status": "deleted" if record_id in existing else "not_found"}
+                for i, record_id in enumerate(request.ids)
+            ]
+            return {"success": True, "deleted": len(existing), "results": results}
+
+        deleted = db.execute(delete(model).where(*conditions)).rowcount
+        db.commit()
+        return {"success": True, "deleted": deleted, "results": []}
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=f"Toplu silme hatası: {str(e)}")
+
+
+def _beton_firma(row: Dict) -> Dict:
+    """İrsaliye numarasına göre firma (tekil endpoint'lerle aynı kural)"""
+    if "irsaliye_no" in row:
+        firma = resolve_beton_firma(row["irsaliye_no"])
+        if firma:
+            row["firma"] = firma
+    return row
+
+
+# ========== BETON ==========
+
+@router.post("/beton/bulk")
+def bulk_create_beton(items: List[Dict[str, Any]] = Body(...), db: Session = Depends(get_db)):
+    rows = [_beton_firma(row) for row in _validate_items(items, BetonCreate)]
+    return _bulk_create(db, Beton, rows)
+
+@router.patch("/beton/bulk")
+def bulk_update_beton(items: List[Dict[str, Any]] = Body(...), db: Session = Depends(get_db)):
+    return _bulk_update(db, Beton, _validate_items(items, BetonBulkUpdate, exclude_unset=True), prepare=_beton_firma)
+
+@router.delete("/beton/bulk")
+def bulk_delete_beton(request: BulkDeleteRequest, db: Session = Depends(get_db)):
+    return _bulk_delete(db, Beton, request, Beton.firma)
+
+# ========== DEMİR ==========
+
+@router.post("/demir/bulk")
+def bulk_create_demir(items: List[Dict[str, Any]] = Body(...), db: Session = Depends(get_db)):
+    return _bulk_create(db, Demir, _validate_items(items, DemirCreate))
+
+@router.patch("/demir/bulk")
+def bulk_update_demir(items: List[Dict[str, Any]] = Body(...), db: Session = Depends(get_db)):
+    return _bulk_update(db, Demir, _validate_items(items, DemirBulkUpdate, exclude_unset=True))
+
+@router.delete("/demir/bulk")
+def bulk_delete_demir(request: BulkDeleteRequest, db: Session = Depends(get_db)):
+    return _bulk_delete(db, Demir, request, Demir.tedarikci)
+
+# ========== HASIR ==========
+
+@router.post("/hasir/bulk")
+def bulk_create_hasir(items: List[Dict[str, Any]] = Body(...), db: Session = Depends(get_db)):
+    return _bulk_create(db, Hasir, _validate_items(items, HasirCreate))
+
+@router.patch("/hasir/bulk")
+def bulk_update_hasir(items: List[Dict[str, Any]] = Body(...), db: Session = Depends(get_db)):
+    return _bulk_update(db, Hasir, _validate_items(items, HasirBulkUpdate, exclude_unset=True))
+
+@router.delete("/hasir/bulk")
+def bulk_delete_hasir(request: BulkDeleteRequest, db: Session = Depends(get_db)):
+    return _bulk_delete(db, Hasir, request, Hasir.firma)
@@ -4,6 +4,16 @@ from typing import Optional
 class Settings:
     # Database
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./santiye_997.db")
+    DATABASE_READ_URL: Optional[str] = os.getenv("DATABASE_READ_URL")  # Postgres okuma replikası (opsiyonel)
+    
+    # Connection Pool (PostgreSQL)
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "10"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # saniye
+    DB_POOL_TIMEOUT: int = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+    
+    # SQLite: tek yazıcı bağlantı + bu kadar okuyucu bağlantı (WAL)
+    SQLITE_READER_POOL_SIZE: int = int(os.getenv("SQLITE_READER_POOL_SIZE", "8"))
     
     # API
     API_TITLE: str = "Şantiye Malzeme Yönetim API"
@@ -22,6 +32,31 @@ class Settings:
     DEFAULT_PAGE_SIZE: int = 100
     MAX_PAGE_SIZE: int = 1000
     
+    # Rate limiting (token bucket): dakikalık limit, route prefix'ine göre özel limitler
+    RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "false").lower() == "true"
+    RATE_LIMIT_PER_MINUTE: int = int(os.getenv("RATE_LIMIT_PER_MINUTE", "100"))
+    RATE_LIMIT_BURST: Optional[int] = int(os.getenv("RATE_LIMIT_BURST")) if os.getenv("RATE_LIMIT_BURST") else None
+    RATE_LIMIT_ROUTES: dict = {"/api/import/": 10, "/api/v2/import/": 10}
+    RATE_LIMIT_MAX_CLIENTS: int = int(os.getenv("RATE_LIMIT_MAX_CLIENTS", "10000"))
+    RATE_LIMIT_BACKEND: str = os.getenv("RATE_LIMIT_BACKEND", "memory")  # "sqlite": tüm worker'lar ortak limit
+    RATE_LIMIT_SQLITE_PATH: str = os.getenv("RATE_LIMIT_SQLITE_PATH", "./rate_limit.db")
+    
+    # Query profiler: istek başına sorgu listesi + yavaş sorgu logu (EXPLAIN ile)
+    QUERY_PROFILING: bool = os.getenv("QUERY_PROFILING", "false").lower() == "true"
+    SLOW_QUERY_MS: float = float(os.getenv("SLOW_QUERY_MS", "100"))
+    ADMIN_TOKEN: Optional[str] = os.getenv("ADMIN_TOKEN")  # /api/admin için X-Admin-Token (tanımsızsa admin uçları kapalı)
+    
+    # Bulk endpoints
+    BULK_MAX_ITEMS: int = 1000
+    
+    # Response cache (ETag / 304) - veri versiyonu değişene kadar geçerli
+    CACHED_PATH_PREFIXES: list = ["/api/analytics/", "/api/v2/analytics/"]
+    RESPONSE_CACHE_MAX_ENTRIES: int = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "256"))
+    
+    # Compression (gzip / brotli): bu boyutun altındaki yanıtlar sıkıştırılmaz
+    COMPRESSION_MIN_SIZE: int = int(os.getenv("COMPRESSION_MIN_SIZE", "1000"))
+    COMPRESSION_GZIP_LEVEL: int = int(os.getenv("COMPRESSION_GZIP_LEVEL", "5"))  # 9: ~%10 daha küçük, birkaç kat yavaş
+    
     # File Upload
     MAX_UPLOAD_SIZE: int = 10 * 1024 * 1024  # 10MB
     ALLOWED_EXTENSIONS: list = [".xlsx", ".xls"]
@@ -0,0 +1,142 @@
+"""
+Dashboard Aggregates
+Builds every chart series used by the Streamlit dashboards in one pass.
+Pages only read these small frames instead of grouping the full logs on each rerun.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict
+
+DIAMETERS = [8, 10, 12, 14, 16, 18, 20, 22, 25, 28, 32]
+
+
+def _year_month(dates: pd.Series) -> pd.Series:
+    """Format dates as 'YYYY-MM' labels (same output as to_period('M').astype(str))"""
+    return pd.to_datetime(dates).dt.strftime('%Y-%m')
+
+
+def _sum_by(values: pd.Series, keys: pd.Series, key_name: str, value_name: str) -> pd.DataFrame:
+    """Sum values per key and return a two-column frame"""
+    grouped = values.groupby(keys, observed=True, sort=True).sum()
+    return grouped.rename_axis(key_name).reset_index(name=value_name)
+
+
+def _box_stats(values: pd.Series, keys: pd.Series) -> pd.DataFrame:
+    """Precompute box plot statistics (Tukey fences) per key"""
+    rows = []
+    for key, group in values.groupby(keys, observed=True, sort=True):
+        if group.empty:
+            continue
+        q1, median, q3 = group.quantile([0.25, 0.5, 0.75]).tolist()
+        iqr = q3 - q1
+        rows.append({
+            'key': key,
+            'q1': q1,
+            'median': median,
+            'q3': q3,
+            'lowerfence': group[group >= q1 - 1.5 * iqr].min(),
+            'upperfence': group[group <= q3 + 1.5 * iqr].max(),
+        })
+    return pd.DataFrame(rows, columns=['key', 'q1', 'median', 'q3', 'lowerfence', 'upperfence'])
+
+
+def _histogram(values: pd.Series, bins: int = 50) -> pd.DataFrame:
+    """Bin values once so the page can draw a bar chart instead of a raw histogram"""
+    counts, edges = np.histogram(values.dropna().to_numpy(dtype=float), bins=bins)
+    return pd.DataFrame({
+        'bin_start': edges[:-1],
+        'bin_end': edges[1:],
+        'bin_mid': (edges[:-1] + edges[1:]) / 2,
+        'count': counts,
+    })
+
+
+# ============================================
+# CONCRETE
+# ============================================
+
+def build_concrete_aggregates(df: pd.DataFrame) -> Dict:
+    """Compute all concrete dashboard series. Never mutates the input frame."""
+    if df is None or df.empty:
+        return {}
+
+    dates = pd.to_datetime(df['date'])
+    qty = df['quantity_m3'].astype(float)
+    months = _year_month(dates)
+
+    monthly = qty.groupby(months).agg(['sum', 'count']).reset_index()
+    monthly.columns = ['Ay', 'Toplam m³', 'Teslimat Sayısı']
+
+    class_dist = _sum_by(qty, df['concrete_class'], 'concrete_class', 'quantity_m3')
+    method_dist = _sum_by(qty, df['delivery_method'], 'delivery_method', 'quantity_m3')
+    block_dist = _sum_by(qty, df['location_block'], 'location_block', 'quantity_m3')
+    daily = _sum_by(qty, dates.dt.normalize(), 'date', 'quantity_m3')
+
+    return {
+        'monthly': monthly,
+        'class_dist': class_dist,
+        'top_classes': class_dist.nlargest(10, 'quantity_m3').reset_index(drop=True),
+        'delivery_method': method_dist,
+        'top_blocks': block_dist.nlargest(10, 'quantity_m3').reset_index(drop=True),
+        'busiest_days': daily.nlargest(10, 'quantity_m3').reset_index(drop=True),
+        'quantity_hist': _histogram(qty),
+        'quantity_box': _box_stats(qty, df['concrete_class']),
+        'quantity_stats': {
+            'mean': qty.mean(),
+            'median': qty.median(),
+            'std': qty.std(),
+            'min': qty.min(),
+            'max': qty.max(),
+        },
+    }
+
+
+# ============================================
+# REBAR
+# ============================================
+
+def build_rebar_aggregates(df: pd.DataFrame) -> Dict:
+    """Compute all rebar dashboard series. Never mutates the input frame."""
+    if df is None or df.empty:
+        return {}
+
+    weight = df['total_weight_kg'].astype(float)
+    monthly = _sum_by(weight, _year_month(df['date']), 'year_month', 'total_weight_kg')
+
+    result = {'monthly': monthly}
+
+    if 'supplier' in df.columns:
+        result['supplier_dist'] = _sum_by(weight, df['supplier'], 'supplier', 'total_weight_kg')
+
+    diameter_cols = [f'q{d}_kg' for d in DIAMETERS if f'q{d}_kg' in df.columns]
+    if diameter_cols:
+        totals = df[diameter_cols].astype(float).sum()  # float32 columns are summed in float64
+        result['diameter_totals'] = pd.DataFrame({
+            'Çap': [f"Ø{c.split('_')[0][1:]}" for c in diameter_cols],
+            'Ağırlık': totals.to_numpy(dtype=float),
+        })
+
+    return result
+
+
+# ============================================
+# MESH
+# ============================================
+
+def build_mesh_aggregates(df: pd.DataFrame) -> Dict:
+    """Compute all mesh dashboard series. Never mutates the input frame."""
+    if df is None or df.empty:
+        return {}
+
+    weight = df['weight_kg'].astype(float)
+    result = {
+        'monthly': _sum_by(weight, _year_month(df['date']), 'year_month', 'weight_kg'),
+    }
+
+    if 'mesh_type' in df.columns:
+        result['type_dist'] = _sum_by(weight, df['mesh_type'], 'mesh_type', 'weight_kg')
+    if 'supplier' in df.columns:
+        result['supplier_dist'] = _sum_by(weight, df['supplier'], 'supplier', 'weight_kg')
+
+    return result
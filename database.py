@@ -1,9 +1,49 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, ForeignKey, Text
+from sqlalchemy import create_engine, event, inspect, insert, select, exists, literal, literal_column, and_, Column, Integer, String, Float, DateTime, ForeignKey, Text, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.pool import StaticPool
 from datetime import datetime
+import logging
+
+from config import settings
 
 Base = declarative_base()
+logger = logging.getLogger("database")
+
+# ============================================
+# LOOKUP (dimension) TABLES
+# ============================================
+# Repeated names are stored once; fact rows carry the integer key. `anahtar` is the
+# Turkish-I folded match key, `ad` the display name (see dimensions.py).
+
+class Firma(Base):
+    __tablename__ = "firmalar"
+
+    id = Column(Integer, primary_key=True)
+    ad = Column(String(100), nullable=False)
+    anahtar = Column(String(100), nullable=False, unique=True)
+
+class Blok(Base):
+    __tablename__ = "bloklar"
+
+    id = Column(Integer, primary_key=True)
+    ad = Column(String(100), nullable=False)
+    anahtar = Column(String(100), nullable=False, unique=True)
+
+class BetonSinifi(Base):
+    __tablename__ = "beton_siniflari"
+
+    id = Column(Integer, primary_key=True)
+    ad = Column(String(50), nullable=False)
+    anahtar = Column(String(50), nullable=False, unique=True)
+
+class Etap(Base):
+    __tablename__ = "etaplar"
+
+    id = Column(Integer, primary_key=True)
+    ad = Column(String(50), nullable=False)
+    anahtar = Column(String(50), nullable=False, unique=True)
 
 # Beton (Concrete) Model
 class Beton(Base):
@@ -11,14 +51,20 @@ class Beton(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     tarih = Column(DateTime, default=datetime.now)
-    firma = Column(String(100))
+    firma = Column(String(100), info={"lookup_id": "firma_id"})
     irsaliye_no = Column(String(50))
-    beton_sinifi = Column(String(50))
+    beton_sinifi = Column(String(50), info={"lookup_id": "sinif_id"})
     teslim_sekli = Column(String(50))
     miktar = Column(Float)  # m3
-    blok = Column(String(100))
+    blok = Column(String(100), info={"lookup_id": "blok_id"})
     aciklama = Column(Text)
     created_at = Column(DateTime, default=datetime.now)
+    firma_id = Column(Integer, ForeignKey("firmalar.id"))
+    blok_id = Column(Integer, ForeignKey("bloklar.id"))
+    sinif_id = Column(Integer, ForeignKey("beton_siniflari.id"))
+
+    # Covering index: date-range / firma summaries are answered from the index alone
+    __table_args__ = (Index("ix_beton_tarih_firma_id_miktar", "tarih", "firma_id", "miktar"),)
 
 # Demir (Iron/Rebar) Model
 class Demir(Base):
@@ -26,9 +72,9 @@ class Demir(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     tarih = Column(DateTime, default=datetime.now)
-    etap = Column(String(50))
+    etap = Column(String(50), info={"lookup_id": "etap_id"})
     irsaliye_no = Column(String(50))
-    tedarikci = Column(String(100))
+    tedarikci = Column(String(100), info={"lookup_id": "tedarikci_id"})
     uretici = Column(String(100))
     q8 = Column(Float, default=0)
     q10 = Column(Float, default=0)
@@ -43,6 +89,101 @@ class Demir(Base):
     q32 = Column(Float, default=0)
     toplam_agirlik = Column(Float)  # kg
     created_at = Column(DateTime, default=datetime.now)
+    tedarikci_id = Column(Integer, ForeignKey("firmalar.id"))
+    etap_id = Column(Integer, ForeignKey("etaplar.id"))
+
+    __table_args__ = (Index("ix_demir_tarih_tedarikci_id_agirlik", "tarih", "tedarikci_id", "toplam_agirlik"),)
+
+# ============================================
+# DEMIR ÇAP (long format)
+# ============================================
+# One row per delivery and non-zero diameter, kept in sync with the wide q8..q32 columns by
+# database triggers (so ORM, Core bulk writes, shadow reimport and dedupe deletes all follow).
+# Diameter analyses read only the non-zero entries; a diameter without a wide column
+# (e.g. Q24) is just another `cap` value.
+
+DEMIR_CAPS = [8, 10, 12, 14, 16, 18, 20, 22, 25, 28, 32]
+
+class DemirCap(Base):
+    __tablename__ = "demir_cap"
+
+    id = Column(Integer, primary_key=True)
+    demir_id = Column(Integer, ForeignKey("demir.id", ondelete="CASCADE"), nullable=False, index=True)
+    tarih = Column(DateTime)  # copy of demir.tarih so period queries stay on this table
+    cap = Column(Integer, nullable=False)  # mm
+    kg = Column(Float, nullable=False)
+
+    __table_args__ = (Index("ix_demir_cap_cap_tarih_kg", "cap", "tarih", "kg"),)
+
+def _cap_values(row: str) -> str:
+    return ", ".join(f"({cap}, {row}.q{cap})" for cap in DEMIR_CAPS)
+
+def _cap_insert(row: str) -> str:
+    return (
+        f"INSERT INTO demir_cap (demir_id, tarih, cap, kg) "
+        f"SELECT {row}.id, {row}.tarih, c.cap, c.kg FROM (VALUES {_cap_values(row)}) AS c(cap, kg) "
+        f"WHERE c.kg IS NOT NULL AND c.kg <> 0"
+    )
+
+_WIDE_CAPS = ", ".join(str(cap) for cap in DEMIR_CAPS)
+_WATCHED = ", ".join(["tarih"] + [f"q{cap}" for cap in DEMIR_CAPS])
+
+def _sqlite_cap_insert(row: str) -> str:
+    # SQLite has no column aliases on VALUES; name them through a UNION ALL instead
+    values = " UNION ALL ".join(f"SELECT {cap} AS cap, {row}.q{cap} AS kg" for cap in DEMIR_CAPS)
+    return (
+        f"INSERT INTO demir_cap (demir_id, tarih, cap, kg) "
+        f"SELECT {row}.id, {row}.tarih, c.cap, c.kg FROM ({values}) AS c "
+        f"WHERE c.kg IS NOT NULL AND c.kg <> 0"
+    )
+
+SQLITE_CAP_TRIGGERS = [
+    f"CREATE TRIGGER IF NOT EXISTS trg_demir_cap_insert AFTER INSERT ON demir BEGIN "
+    f"{_sqlite_cap_insert('NEW')}; END",
+    # Only the wide diameters are rebuilt; rows for other diameters (Q24) keep their value
+    f"CREATE TRIGGER IF NOT EXISTS trg_demir_cap_update AFTER UPDATE OF {_WATCHED} ON demir BEGIN "
+    f"DELETE FROM demir_cap WHERE demir_id = OLD.id AND cap IN ({_WIDE_CAPS}); "
+    f"{_sqlite_cap_insert('NEW')}; "
+    f"UPDATE demir_cap SET tarih = NEW.tarih WHERE demir_id = NEW.id; END",
+    "CREATE TRIGGER IF NOT EXISTS trg_demir_cap_delete AFTER DELETE ON demir BEGIN "
+    "DELETE FROM demir_cap WHERE demir_id = OLD.id; END",
+]
+
+POSTGRES_CAP_TRIGGERS = [
+    f"""CREATE OR REPLACE FUNCTION demir_cap_sync() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' THEN
+        DELETE FROM demir_cap WHERE demir_id = OLD.id AND cap IN ({_WIDE_CAPS});
+        UPDATE demir_cap SET tarih = NEW.tarih WHERE demir_id = NEW.id;
+    END IF;
+    {_cap_insert('NEW')};
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql""",
+    "DROP TRIGGER IF EXISTS trg_demir_cap ON demir",
+    # Deletes are covered by ON DELETE CASCADE
+    f"CREATE TRIGGER trg_demir_cap AFTER INSERT OR UPDATE OF {_WATCHED} ON demir "
+    f"FOR EACH ROW EXECUTE FUNCTION demir_cap_sync()",
+]
+
+def ensure_cap_triggers(connection):
+    statements = {"sqlite": SQLITE_CAP_TRIGGERS, "postgresql": POSTGRES_CAP_TRIGGERS}
+    for statement in statements.get(connection.dialect.name, []):
+        connection.exec_driver_sql(statement)
+
+def backfill_demir_cap(connection):
+    """Long rows for deliveries written before demir_cap existed (or before the triggers)"""
+    for cap in DEMIR_CAPS:
+        column = Demir.__table__.c[f"q{cap}"]
+        already = exists().where(DemirCap.demir_id == Demir.id, DemirCap.cap == cap)
+        connection.execute(insert(DemirCap).from_select(
+            ["demir_id", "tarih", "cap", "kg"],
+            select(Demir.id, Demir.tarih, literal(cap), column).where(column.is_not(None), column != 0, ~already)
+        ))
+
+@event.listens_for(DemirCap.__table__, "after_create")
+def _create_cap_triggers(target, connection, **kw):
+    ensure_cap_triggers(connection)
 
 # Hasir (Mesh) Model
 class Hasir(Base):
@@ -50,24 +191,157 @@ class Hasir(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     tarih = Column(DateTime, default=datetime.now)
-    firma = Column(String(100))
+    firma = Column(String(100), info={"lookup_id": "firma_id"})
     irsaliye_no = Column(String(50))
-    etap = Column(String(50))
+    etap = Column(String(50), info={"lookup_id": "etap_id"})
     hasir_tipi = Column(String(50))
     ebatlar = Column(String(100))
     adet = Column(Integer)
     agirlik = Column(Float)  # kg
     kullanim_yeri = Column(String(200))
     created_at = Column(DateTime, default=datetime.now)
+    firma_id = Column(Integer, ForeignKey("firmalar.id"))
+    etap_id = Column(Integer, ForeignKey("etaplar.id"))
+
+    __table_args__ = (Index("ix_hasir_tarih_firma_id_agirlik", "tarih", "firma_id", "agirlik"),)
+
+# ============================================
+# WAYBILL UNIQUENESS
+# ============================================
+# One delivery per (irsaliye_no, firma). Rows without a real waybill (empty, or the synthetic
+# AUTO-xxxxxxxx numbers the importers generate) are left out of the partial index. Literal
+# SQL (no bind parameters) so queries repeating real_waybill() match the index predicate.
+
+def real_waybill(column):
+    return and_(column.is_not(None), column != literal_column("''"), column.notlike(literal_column("'AUTO-%'")))
+
+WAYBILL_INDEXES = {
+    model: Index(f"ux_{model.__tablename__}_irsaliye_{supplier.key}", model.irsaliye_no, supplier, unique=True,
+                 sqlite_where=real_waybill(model.irsaliye_no), postgresql_where=real_waybill(model.irsaliye_no))
+    for model, supplier in ((Beton, Beton.firma_id), (Demir, Demir.tedarikci_id), (Hasir, Hasir.firma_id))
+}
 
 # Database setup
-DATABASE_URL = "sqlite:///./santiye_997.db"
+DATABASE_URL = settings.DATABASE_URL
+
+# SQLite tuning: WAL lets readers run while an import is writing
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -64000,       # ~64 MB page cache (negative = KiB)
+    "mmap_size": 268435456,     # 256 MB memory-mapped I/O
+    "temp_store": "MEMORY",
+    "busy_timeout": 30000,      # ms; wait for the write lock instead of failing
+}
+
+def _is_memory_sqlite(url: str) -> bool:
+    return url in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in url
+
+def sqlite_pragma_listener(read_only: bool = False):
+    """Connect-event hook that applies SQLITE_PRAGMAS (and query_only for readers)"""
+    def _on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+    return _on_connect
+
+def create_db_engine(url: str = None, read_only: bool = False):
+    """
+    Engine factory honoring config.settings.
+    SQLite: one pooled writer connection (writes queue in the pool) or a pool of
+    query_only readers (SQLITE_READER_POOL_SIZE + DB_MAX_OVERFLOW). PostgreSQL: sized pool with recycle and pre-ping.
+    """
+    url = url or settings.DATABASE_URL
+
+    if url.startswith("sqlite"):
+        if _is_memory_sqlite(url):
+            return create_engine(url, connect_args={"check_same_thread": False}, poolclass=StaticPool)
+
+        # Readers are cheap under WAL; a single writer avoids lock contention between writers
+        engine = create_engine(
+            url,
+            connect_args={"check_same_thread": False, "timeout": 30},
+            pool_size=settings.SQLITE_READER_POOL_SIZE if read_only else 1,
+            max_overflow=settings.DB_MAX_OVERFLOW if read_only else 0,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+        )
+        event.listen(engine, "connect", sqlite_pragma_listener(read_only))
+        return engine
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+    return create_engine(
+        url,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_pre_ping=True,
+    )
+
+def create_read_engine(writer, url: str = None):
+    """Reader engine: a query_only pool on the same SQLite file, or the replica URL for Postgres"""
+    url = url or settings.DATABASE_URL
+    if url.startswith("sqlite"):
+        # An in-memory database only exists on the writer's connection
+        return writer if _is_memory_sqlite(url) else create_db_engine(url, read_only=True)
+    if settings.DATABASE_READ_URL:
+        return create_db_engine(settings.DATABASE_READ_URL)
+    return writer
+
+engine = create_db_engine(DATABASE_URL)
+read_engine = create_read_engine(engine, DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+def ensure_indexes(connection):
+    """create_all skips indexes of tables that already exist; add any missing ones"""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            if not index.unique:
+                index.create(connection, checkfirst=True)
+                continue
+            # Old data may already hold duplicates; keep starting and say how to fix it
+            try:
+                with connection.begin_nested():
+                    index.create(connection, checkfirst=True)
+            except IntegrityError:
+                logger.warning("%s oluşturulamadı: mükerrer irsaliye kayıtları var. Aynı gündekiler "
+                               "POST /api/admin/dedupe/%s?apply=true ile silinir; farklı tarihlerde aynı "
+                               "irsaliye + firma ile kalanlar elle incelenmeli (GET /api/lookup/waybill/{no})",
+                               index.name, table.name)
+
+def ensure_columns(connection):
+    """create_all skips columns added to existing tables; add them (nullable) with ALTER TABLE"""
+    inspector = inspect(connection)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing:
+                column_type = column.type.compile(dialect=connection.dialect)
+                connection.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}")
+
+def migrate(connection):
+    """Schema upgrades for databases created by older versions"""
+    from dimensions import backfill_dimension_ids
+    from search_index import ensure_search_index
+
+    ensure_columns(connection)
+    # Lookup ids first: the unique waybill indexes are keyed on them, so building them on
+    # NULL ids would let duplicates in and make this backfill fail on the index instead
+    backfill_dimension_ids(connection)
+    ensure_indexes(connection)
+    ensure_cap_triggers(connection)
+    backfill_demir_cap(connection)
+    ensure_search_index(connection)
 
 def init_db():
     Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        migrate(connection)
 
 def get_db():
     db = SessionLocal()
@@ -76,6 +350,14 @@ def get_db():
     finally:
         db.close()
 
+def get_read_db():
+    """Session for read-only endpoints (never waits behind writers on SQLite WAL)"""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
 
 
 
@@ -0,0 +1,54 @@
+"""
+Async Database Layer
+Async engine/session for the /api/v2 endpoints: aiosqlite for the local SQLite
+file, asyncpg for PostgreSQL. The URL comes from config.settings.DATABASE_URL.
+"""
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from config import settings
+from database import Base, migrate, sqlite_pragma_listener
+
+
+def to_async_url(url: str) -> str:
+    """Map a sync database URL to its async driver (sqlite -> aiosqlite, postgres -> asyncpg)"""
+    if url.startswith("sqlite:///"):
+        return url.replace("sqlite:///", "sqlite+aiosqlite:///", 1)
+    if url.startswith("postgres://"):
+        return url.replace("postgres://", "postgresql+asyncpg://", 1)
+    if url.startswith("postgresql://"):
+        return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    if url.startswith("postgresql+psycopg2://"):
+        return url.replace("postgresql+psycopg2://", "postgresql+asyncpg://", 1)
+    return url
+
+
+ASYNC_DATABASE_URL = to_async_url(settings.DATABASE_URL)
+
+if ASYNC_DATABASE_URL.startswith("sqlite"):
+    # Writers wait for the file lock instead of failing immediately under concurrency
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, connect_args={"timeout": 30})
+    event.listen(async_engine.sync_engine, "connect", sqlite_pragma_listener())
+else:
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_pre_ping=True
+    )
+
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+
+async def init_async_db():
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(migrate)
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
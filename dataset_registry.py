@@ -0,0 +1,99 @@
+"""
+Shared Dataset Registry for app.py
+One process-wide, versioned, read-only copy of the beton/demir/hasır frames. Every browser
+session reads the same DataFrame objects (no per-session copy, no reload on session start).
+A write that goes through the API publishes a new version for everybody; edits made in
+local (offline) mode stay in the session that made them, copy-on-write: the session gets a
+private frame only when it first edits a dataset.
+
+The shared copy expires after `ttl` seconds (records written by other API clients show up)
+and can be dropped earlier with reload(), e.g. when the API comes back after an outage.
+
+Shared frames must be treated as read-only (copy before mutating, as the analysis pages do).
+"""
+
+import threading
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
+from types import MappingProxyType
+from typing import Callable, Dict, Mapping, MutableMapping, Optional, Tuple
+
+import pandas as pd
+
+Loader = Callable[[], Tuple[Dict[str, pd.DataFrame], bool]]
+
+
+@dataclass(frozen=True)
+class Dataset:
+    version: int
+    frames: Mapping[str, pd.DataFrame]
+    api_mode: bool
+    loaded_at: datetime
+
+
+class DatasetRegistry:
+    """
+    Holds the current Dataset. The loader (returns frames and whether they came from the
+    API) runs once per process, again when the copy is older than `ttl` seconds or after
+    reload(); concurrent sessions wait for it instead of loading in parallel.
+    """
+
+    def __init__(self, loader: Loader, ttl: Optional[float] = 600):
+        self._loader = loader
+        self._ttl = timedelta(seconds=ttl) if ttl else None
+        self._lock = threading.Lock()
+        self._current = None
+        self._version = 0
+
+    def _stale(self, snapshot: Optional[Dataset]) -> bool:
+        return snapshot is None or (self._ttl is not None and datetime.now() - snapshot.loaded_at > self._ttl)
+
+    def current(self) -> Dataset:
+        snapshot = self._current
+        if self._stale(snapshot):
+            with self._lock:
+                if self._stale(self._current):
+                    frames, api_mode = self._loader()
+                    self._version += 1
+                    self._current = Dataset(self._version, MappingProxyType(dict(frames)), api_mode, datetime.now())
+                snapshot = self._current
+        return snapshot
+
+    def publish(self, name: str, frame: pd.DataFrame) -> Dataset:
+        """Replace one frame for every session; the other frames are carried over by reference"""
+        base = self.current()
+        with self._lock:
+            base = self._current or base  # a concurrent reload() may have dropped it
+            self._version += 1
+            frames = dict(base.frames, **{name: frame})
+            self._current = replace(base, version=self._version, frames=MappingProxyType(frames))
+            return self._current
+
+    def reload(self, version: Optional[int] = None):
+        """
+        Drop the shared copy; the next current() runs the loader again. With `version`, only
+        if that is still the current one (several sessions noticing the same change reload once).
+        """
+        with self._lock:
+            if version is None or (self._current is not None and self._current.version == version):
+                self._current = None
+
+
+# ============================================
+# PER-SESSION VIEW (copy-on-write)
+# ============================================
+
+def session_frame(registry: DatasetRegistry, state: MutableMapping, name: str) -> pd.DataFrame:
+    """The session's own frame if it edited `name`, otherwise the shared one (same object)"""
+    edits = state.get("local_edits") or {}
+    if name in edits:
+        return edits[name]
+    return registry.current().frames[name]
+
+
+def edit_session_frame(registry: DatasetRegistry, state: MutableMapping, name: str,
+                       edit: Callable[[pd.DataFrame], pd.DataFrame]) -> pd.DataFrame:
+    """Apply `edit` (must return a new frame, e.g. pd.concat) and keep the result for this session only"""
+    edits = state.setdefault("local_edits", {})
+    edits[name] = edit(session_frame(registry, state, name))
+    return edits[name]
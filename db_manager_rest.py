@@ -896,6 +896,73 @@ class SupabaseManagerREST_v2:
             st.error(f"❌ Silme işlemi başarısız: {e}")
             return {'success': False, 'error': str(e)}
 
+    # ============================================
+    # PAGED READS (Veri Tabloları)
+    # ============================================
+    
+    LOG_TABLES = ('concrete_logs', 'rebar_logs', 'mesh_logs')
+    
+    def _filtered_logs_query(self, table: str, start_date: Optional[str] = None, end_date: Optional[str] = None,
+                             supplier: Optional[str] = None, waybill: Optional[str] = None, count: Optional[str] = None):
+        """Build a filtered select on one of the log tables (filtering happens in PostgREST)"""
+        if table not in self.LOG_TABLES:
+            raise ValueError(f"Bilinmeyen tablo: {table}")
+        query = self.client.table(table).select("*", count=count)
+        if start_date:
+            query = query.gte('date', start_date)
+        if end_date:
+            query = query.lte('date', end_date)
+        if supplier:
+            query = query.ilike('supplier', f"%{supplier}%")
+        if waybill:
+            query = query.ilike('waybill_no', f"%{waybill}%")
+        return query
+    
+    def get_logs_page(self, table: str, offset: int = 0, limit: int = 100,
+                      sort_by: str = 'date', descending: bool = True,
+                      start_date: Optional[str] = None, end_date: Optional[str] = None,
+                      supplier: Optional[str] = None, waybill: Optional[str] = None) -> Tuple[pd.DataFrame, int]:
+        """
+        Fetch a single window of rows with server-side filtering and sorting.
+        Returns (page DataFrame, total matching row count).
+        """
+        try:
+            query = self._filtered_logs_query(table, start_date, end_date, supplier, waybill, count='exact')
+            # id as tie-breaker keeps the paging stable
+            query = query.order(sort_by, desc=descending).order('id')
+            response = query.range(offset, offset + limit - 1).execute()
+            
+            total = response.count or 0
+            if response.data:
+                df = pd.DataFrame(response.data)
+                df['date'] = pd.to_datetime(df['date'])
+                return df, total
+            return pd.DataFrame(), total
+        except Exception as e:
+            st.error(f"❌ Failed to get {table} page: {e}")
+            return pd.DataFrame(), 0
+    
+    def export_logs_csv(self, table: str, sort_by: str = 'date', descending: bool = True,
+                        start_date: Optional[str] = None, end_date: Optional[str] = None,
+                        supplier: Optional[str] = None, waybill: Optional[str] = None) -> bytes:
+        """All rows matching the filters as CSV (UTF-8 BOM for Excel), read page by page"""
+        frames = []
+        page_size = 1000
+        page = 0
+        while True:
+            query = self._filtered_logs_query(table, start_date, end_date, supplier, waybill)
+            response = query.order(sort_by, desc=descending).order('id') \
+                .range(page * page_size, (page + 1) * page_size - 1).execute()
+            if not response.data:
+                break
+            frames.append(pd.DataFrame(response.data))
+            if len(response.data) < page_size:
+                break
+            page += 1
+        
+        df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        return df.to_csv(index=False).encode('utf-8-sig')
+
     # ============================================
     # UTILITY FUNCTIONS
     # ============================================
@@ -0,0 +1,148 @@
+"""
+Duplicate Cleanup
+Finds duplicate deliveries server-side with ROW_NUMBER() OVER (PARTITION BY date,
+waybill, supplier) and deletes them in one statement, keeping the first inserted row.
+Only real waybills are compared (database.real_waybill, same rule as the unique waybill
+index): blank and AUTO- numbers never make two deliveries duplicates.
+Supabase tables go through the dedupe_logs RPC (dedupe_functions.sql); the local
+backend tables (beton/demir/hasir) use the same window query through SQLAlchemy.
+
+Kullanım:
+    python dedupe.py                          # Supabase, tüm tablolar, sadece rapor
+    python dedupe.py --table rebar_logs --apply
+    python dedupe.py --local --table demir --apply
+"""
+
+import argparse
+import os
+from typing import Dict, List
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+from database import Beton, Demir, Hasir, real_waybill
+
+SUPABASE_TABLES = ["concrete_logs", "rebar_logs", "mesh_logs"]
+
+# kind -> (model, supplier column); demir's supplier is `tedarikci`
+LOCAL_TABLES = {
+    "beton": (Beton, Beton.firma),
+    "demir": (Demir, Demir.tedarikci),
+    "hasir": (Hasir, Hasir.firma),
+}
+SAMPLE_SIZE = 20
+
+
+# ============================================
+# LOCAL BACKEND (SQLAlchemy)
+# ============================================
+
+def _normalized(column):
+    """Same key normalization as the old script: trim, drop spaces, upper-case"""
+    return func.upper(func.replace(func.trim(func.coalesce(column, "")), " ", ""))
+
+
+def ranked_subquery(kind: str):
+    model, supplier = LOCAL_TABLES[kind]
+    return select(
+        model.id.label("id"),
+        func.row_number().over(
+            partition_by=(func.date(model.tarih), _normalized(model.irsaliye_no), _normalized(supplier)),
+            order_by=(model.created_at, model.id)
+        ).label("rn")
+    ).where(real_waybill(model.irsaliye_no)).subquery()
+
+
+def dedupe_local(db: Session, kind: str, apply: bool = False) -> Dict:
+    """Dry-run report (and, with apply=True, a single DELETE) for one backend table"""
+    model, supplier = LOCAL_TABLES[kind]
+    ranked = ranked_subquery(kind)
+    duplicate_ids = select(ranked.c.id).where(ranked.c.rn > 1)
+
+    total = db.execute(select(func.count()).select_from(model)).scalar_one()
+    duplicates = db.execute(select(func.count()).select_from(ranked).where(ranked.c.rn > 1)).scalar_one()
+    sample = db.execute(
+        select(model.id, model.tarih, model.irsaliye_no, supplier.label("tedarikci"))
+        .where(model.id.in_(duplicate_ids)).order_by(model.tarih.desc()).limit(SAMPLE_SIZE)
+    ).mappings().all()
+
+    deleted = 0
+    if apply and duplicates:
+        deleted = db.execute(
+            delete(model).where(model.id.in_(duplicate_ids)).execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+
+    return {
+        "table": kind,
+        "dry_run": not apply,
+        "total": total,
+        "unique": total - duplicates,
+        "duplicates": duplicates,
+        "deleted": deleted,
+        "sample": [dict(row) for row in sample],
+    }
+
+
+# ============================================
+# SUPABASE (RPC)
+# ============================================
+
+def get_supabase_client():
+    """Read credentials from .streamlit/secrets.toml (same as the other maintenance scripts)"""
+    import toml
+    from supabase import create_client
+
+    secrets_path = os.path.join(os.getcwd(), ".streamlit", "secrets.toml")
+    if not os.path.exists(secrets_path):
+        print("secrets.toml not found!")
+        return None
+    secrets = toml.load(secrets_path)
+    return create_client(secrets["supabase"]["url"], secrets["supabase"]["anon_key"])
+
+
+def dedupe_supabase(client, table: str, apply: bool = False) -> Dict:
+    return client.rpc("dedupe_logs", {"p_table": table, "p_dry_run": not apply}).execute().data
+
+
+# ============================================
+# CLI
+# ============================================
+
+def print_report(report: Dict):
+    action = "silinecek (dry-run)" if report["dry_run"] else "silindi"
+    count = report["duplicates"] if report["dry_run"] else report["deleted"]
+    print(f"📋 {report['table']}: {report['total']} kayıt, {report['unique']} benzersiz, {count} mükerrer {action}")
+    for row in report["sample"][:5]:
+        print(f"   - {row}")
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Mükerrer kayıt temizliği (sunucu tarafında)")
+    parser.add_argument("--local", action="store_true", help="FastAPI backend veritabanı (beton/demir/hasir)")
+    parser.add_argument("--table", default="all", help="Tablo adı veya 'all'")
+    parser.add_argument("--apply", action="store_true", help="Mükerrerleri sil (varsayılan: sadece rapor)")
+    args = parser.parse_args(argv)
+
+    tables = list(LOCAL_TABLES) if args.local else SUPABASE_TABLES
+    selected = tables if args.table == "all" else [args.table]
+    unknown = [t for t in selected if t not in tables]
+    if unknown:
+        parser.error(f"Geçersiz tablo: {', '.join(unknown)} (geçerli: {', '.join(tables)})")
+
+    if args.local:
+        from database import SessionLocal
+        with SessionLocal() as db:
+            for kind in selected:
+                print_report(dedupe_local(db, kind, args.apply))
+        return
+
+    client = get_supabase_client()
+    if not client:
+        return
+    for table in selected:
+        print_report(dedupe_supabase(client, table, args.apply))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+-- ============================================
+-- DEDUPE: Mükerrer kayıt temizliği (RPC)
+-- ============================================
+-- Aynı tarih + irsaliye no + tedarikçi (boşluksuz, büyük harf) kayıtlarından
+-- ilk ekleneni tutar, diğerlerini tek DELETE ile siler. Varsayılan dry-run'dır.
+-- Boş ve AUTO-… irsaliyeler hiç eşleştirilmez (aynı gün aynı firmadan ayrı teslimatlar olabilir).
+--
+-- Kullanım (SQL Editor):
+--   SELECT dedupe_logs('rebar_logs');          -- sadece rapor
+--   SELECT dedupe_logs('rebar_logs', false);   -- mükerrerleri sil
+-- Python:
+--   supabase.rpc('dedupe_logs', {'p_table': 'rebar_logs', 'p_dry_run': True}).execute()
+--   veya: python dedupe.py --table all [--apply]
+
+CREATE OR REPLACE FUNCTION dedupe_logs(p_table TEXT, p_dry_run BOOLEAN DEFAULT TRUE)
+RETURNS JSONB AS $$
+DECLARE
+    v_ranked TEXT;
+    v_total BIGINT;
+    v_duplicates BIGINT;
+    v_deleted BIGINT := 0;
+    v_sample JSONB;
+BEGIN
+    IF p_table NOT IN ('concrete_logs', 'rebar_logs', 'mesh_logs') THEN
+        RAISE EXCEPTION 'Geçersiz tablo: %', p_table;
+    END IF;
+
+    -- rn = 1: tutulacak kayıt (ilk eklenen), rn > 1: mükerrer
+    v_ranked := format(
+        'SELECT id, date, waybill_no, supplier,
+                ROW_NUMBER() OVER (
+                    PARTITION BY date,
+                                 upper(regexp_replace(coalesce(waybill_no, ''''), ''\s'', '''', ''g'')),
+                                 upper(regexp_replace(coalesce(supplier, ''''), ''\s'', '''', ''g''))
+                    ORDER BY created_at, id
+                ) AS rn
+         FROM %I
+         WHERE waybill_no IS NOT NULL AND waybill_no <> '''' AND waybill_no NOT LIKE ''AUTO-%%''', p_table);
+
+    EXECUTE format(
+        'SELECT (SELECT count(*) FROM %I), count(*) FILTER (WHERE rn > 1),
+                coalesce((SELECT jsonb_agg(s) FROM (
+                    SELECT id, date, waybill_no, supplier FROM (%s) d WHERE rn > 1 ORDER BY date DESC LIMIT 20
+                ) s), ''[]''::jsonb)
+         FROM (%s) r', p_table, v_ranked, v_ranked)
+        INTO v_total, v_duplicates, v_sample;
+
+    IF NOT p_dry_run AND v_duplicates > 0 THEN
+        EXECUTE format('DELETE FROM %I t USING (%s) r WHERE t.id = r.id AND r.rn > 1', p_table, v_ranked);
+        GET DIAGNOSTICS v_deleted = ROW_COUNT;
+    END IF;
+
+    RETURN jsonb_build_object(
+        'table', p_table,
+        'dry_run', p_dry_run,
+        'total', v_total,
+        'unique', v_total - v_duplicates,
+        'duplicates', v_duplicates,
+        'deleted', v_deleted,
+        'sample', v_sample
+    );
+END;
+$$ LANGUAGE plpgsql;
+
+-- Partition anahtarı için ifade indeksleri (büyük tablolarda sıralamayı hızlandırır)
+CREATE INDEX IF NOT EXISTS idx_concrete_dedupe ON concrete_logs
+    (date, upper(regexp_replace(coalesce(waybill_no, ''), '\s', '', 'g')), upper(regexp_replace(coalesce(supplier, ''), '\s', '', 'g')));
+CREATE INDEX IF NOT EXISTS idx_rebar_dedupe ON rebar_logs
+    (date, upper(regexp_replace(coalesce(waybill_no, ''), '\s', '', 'g')), upper(regexp_replace(coalesce(supplier, ''), '\s', '', 'g')));
+CREATE INDEX IF NOT EXISTS idx_mesh_dedupe ON mesh_logs
+    (date, upper(regexp_replace(coalesce(waybill_no, ''), '\s', '', 'g')), upper(regexp_replace(coalesce(supplier, ''), '\s', '', 'g')));
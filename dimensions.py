@@ -0,0 +1,174 @@
+"""
+Dimension Lookups
+Firma/tedarikçi, blok, beton sınıfı and etap names live once in lookup tables
+(firmalar, bloklar, beton_siniflari, etaplar); fact rows carry the integer key.
+Names are normalized a single time, on write: whitespace collapsed, Turkish upper case,
+and the match key folds I/İ so "İçdaş", "ICDAŞ" and "içdaş " resolve to the same row.
+
+Every write path goes through here: ORM flushes (before_flush hook), the Core bulk
+endpoints and the shadow reimport (resolve_rows).
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, bindparam, event, insert, select, update
+from sqlalchemy.orm import Session
+
+from database import Beton, Demir, Hasir
+
+FACT_MODELS = (Beton, Demir, Hasir)
+
+
+# ============================================
+# NORMALIZATION
+# ============================================
+
+def tr_upper(text: str) -> str:
+    """Turkish upper case: i -> İ, ı -> I (str.upper maps both to I)"""
+    return text.replace("i", "İ").replace("ı", "I").upper()
+
+
+def normalize_name(value) -> Optional[str]:
+    """Display form stored on the row; None for empty values (and pandas NaN)"""
+    if value is None or (isinstance(value, float) and value != value):
+        return None
+    text = " ".join(str(value).split())
+    return tr_upper(text) if text else None
+
+
+def tr_fold(value) -> Optional[str]:
+    """Match key: normalized name with dotted/dotless I folded together"""
+    name = normalize_name(value)
+    return name.replace("İ", "I") if name else None
+
+
+# ============================================
+# LOOKUPS
+# ============================================
+
+def name_columns(model) -> List[Tuple]:
+    """(name column, id column, lookup table) for every lookup-backed column of a model"""
+    result = []
+    for column in model.__table__.columns:
+        id_key = column.info.get("lookup_id")
+        if id_key:
+            id_column = model.__table__.c[id_key]
+            result.append((column, id_column, next(iter(id_column.foreign_keys)).column.table))
+    return result
+
+
+def lookup_for(column) -> Optional[Tuple]:
+    """(id column, lookup table) when `column` (e.g. Beton.firma) is lookup-backed, else None"""
+    column = column.expression
+    id_key = column.info.get("lookup_id")
+    if not id_key:
+        return None
+    id_column = column.table.c[id_key]
+    return id_column, next(iter(id_column.foreign_keys)).column.table
+
+
+def _insert_missing(connection, table, rows: List[Dict]):
+    dialect = connection.dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        # Another writer may have created the same name in the meantime
+        connection.execute(dialect_insert(table).on_conflict_do_nothing(index_elements=["anahtar"]), rows)
+    else:
+        connection.execute(insert(table), rows)
+
+
+def lookup_ids(connection, table, names: Iterable) -> Dict[str, Tuple[int, str]]:
+    """match key -> (id, display name), creating lookup rows for names seen for the first time"""
+    wanted = {}
+    for name in names:
+        key = tr_fold(name)
+        if key:
+            wanted.setdefault(key, normalize_name(name))
+    if not wanted:
+        return {}
+
+    query = select(table.c.anahtar, table.c.id, table.c.ad)
+    found = {key: (id_, ad) for key, id_, ad in connection.execute(query.where(table.c.anahtar.in_(wanted)))}
+    missing = [{"anahtar": key, "ad": ad} for key, ad in wanted.items() if key not in found]
+    if missing:
+        _insert_missing(connection, table, missing)
+        keys = [row["anahtar"] for row in missing]
+        found.update({key: (id_, ad) for key, id_, ad in connection.execute(query.where(table.c.anahtar.in_(keys)))})
+    return found
+
+
+def resolve_rows(connection, model, rows: List[Dict]) -> List[Dict]:
+    """Normalize names and fill the *_id keys in place (only for names present in each row)"""
+    for column, id_column, table in name_columns(model):
+        present = [row for row in rows if column.key in row]
+        if not present:
+            continue
+        ids = lookup_ids(connection, table, (row[column.key] for row in present))
+        for row in present:
+            key = tr_fold(row[column.key])
+            if key:
+                row[id_column.key], row[column.key] = ids[key]
+            else:
+                row[id_column.key] = None
+    return rows
+
+
+@event.listens_for(Session, "before_flush")
+def _resolve_on_flush(session, flush_context, instances):
+    """Single ORM hook: new and modified fact rows get normalized names and lookup ids"""
+    pending = [obj for obj in list(session.new) + list(session.dirty) if isinstance(obj, FACT_MODELS)]
+    if not pending:
+        return
+    connection = session.connection()
+    for model in FACT_MODELS:
+        objects = [obj for obj in pending if type(obj) is model]
+        if not objects:
+            continue
+        columns = name_columns(model)
+        rows = [{column.key: getattr(obj, column.key) for column, _, _ in columns} for obj in objects]
+        resolve_rows(connection, model, rows)
+        for obj, row in zip(objects, rows):
+            for column, id_column, _ in columns:
+                # Empty names keep their original value ("" stays ""), only the key is cleared
+                if row[column.key] is not None:
+                    setattr(obj, column.key, row[column.key])
+                setattr(obj, id_column.key, row[id_column.key])
+
+
+def name_filter(column, value):
+    """`column == value` matched through the lookup key (case / I-İ insensitive) when lookup-backed"""
+    lookup = lookup_for(column)
+    if lookup is None:
+        return column == value
+    id_column, table = lookup
+    return id_column == select(table.c.id).where(table.c.anahtar == tr_fold(value)).scalar_subquery()
+
+
+# ============================================
+# MIGRATION
+# ============================================
+
+def backfill_dimension_ids(connection):
+    """Fill the *_id columns of rows written before the lookup tables existed"""
+    for model in FACT_MODELS:
+        table = model.__table__
+        for column, id_column, lookup in name_columns(model):
+            raw_names = connection.execute(
+                select(column).where(id_column.is_(None), column.is_not(None)).distinct()
+            ).scalars().all()
+            ids = lookup_ids(connection, lookup, raw_names)
+            params = [
+                {"raw": raw, "new_id": ids[tr_fold(raw)][0], "new_name": ids[tr_fold(raw)][1]}
+                for raw in raw_names if tr_fold(raw)
+            ]
+            if params:
+                connection.execute(
+                    update(table)
+                    .where(and_(column == bindparam("raw"), id_column.is_(None)))
+                    .values({id_column.key: bindparam("new_id"), column.key: bindparam("new_name")}),
+                    params
+                )
+
@@ -0,0 +1,118 @@
+"""
+Connection Health Monitor
+Probes a backend in a background thread at a fixed interval with a strict timeout.
+UI code reads the cached status and latency instead of blocking the render.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+
+class HealthMonitor:
+    """
+    Background health checker for a single connection.
+    `probe` must return True when the backend is reachable; exceptions count as failures.
+    """
+
+    def __init__(self, probe: Callable[[], bool], interval: float = 30.0, timeout: float = 5.0,
+                 name: str = "health-monitor"):
+        self.probe = probe
+        self.interval = interval
+        self.timeout = timeout
+        self.name = name
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._first_result = threading.Event()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"{name}-probe")
+        self._pending = None
+        self._thread: Optional[threading.Thread] = None
+        self._status = {
+            'ok': None,            # None until the first probe finishes
+            'latency_ms': None,
+            'checked_at': None,
+            'error': None,
+        }
+
+    # ============================================
+    # LIFECYCLE
+    # ============================================
+
+    def start(self) -> "HealthMonitor":
+        """Start probing in the background (first probe runs immediately)"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the background loop"""
+        self._stop.set()
+        self._wake.set()
+        self._executor.shutdown(wait=False)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.check_now()
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    # ============================================
+    # PROBING
+    # ============================================
+
+    def check_now(self) -> Dict:
+        """Run one probe with the strict timeout and store the result"""
+        # A probe stuck past its timeout keeps the worker busy; don't queue behind it
+        if self._pending is not None and not self._pending.done():
+            self._store(False, None, f"Önceki kontrol hâlâ yanıt bekliyor (>{self.timeout:g} sn)")
+            return self.status()
+
+        started = time.perf_counter()
+        try:
+            self._pending = self._executor.submit(self.probe)
+            ok = bool(self._pending.result(timeout=self.timeout))
+            latency_ms = (time.perf_counter() - started) * 1000
+            self._store(ok, latency_ms, None if ok else "Bağlantı testi başarısız")
+        except FutureTimeoutError:
+            self._store(False, None, f"Zaman aşımı ({self.timeout:g} sn)")
+        except Exception as e:
+            self._store(False, None, str(e))
+        return self.status()
+
+    def request_check(self) -> None:
+        """Ask the background loop to probe now instead of waiting for the interval"""
+        self._wake.set()
+
+    def _store(self, ok: bool, latency_ms: Optional[float], error: Optional[str]):
+        with self._lock:
+            self._status = {
+                'ok': ok,
+                'latency_ms': latency_ms,
+                'checked_at': datetime.now(),
+                'error': error,
+            }
+        self._first_result.set()
+
+    # ============================================
+    # CACHED STATE
+    # ============================================
+
+    def status(self) -> Dict:
+        """Last known status (never blocks on the network)"""
+        with self._lock:
+            return dict(self._status)
+
+    def is_healthy(self) -> bool:
+        """True only if the last finished probe succeeded"""
+        return self.status()['ok'] is True
+
+    def wait_for_first_check(self, timeout: Optional[float] = None) -> Dict:
+        """Wait (at most the probe timeout) for the first result, e.g. before an initial data load"""
+        self._first_result.wait(self.timeout if timeout is None else timeout)
+        return self.status()
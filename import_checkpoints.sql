@@ -0,0 +1,27 @@
+-- ============================================
+-- RESUMABLE IMPORT: İdempotency anahtarları
+-- ============================================
+-- resumable_import.py her satıra import_key = '<dosya hash>:<sayfa>:<satır no>' yazar ve
+-- ON CONFLICT (import_key) DO NOTHING ile ekler. Çökmeden hemen önce commit edilmiş bir
+-- batch tekrar gönderildiğinde mükerrer kayıt oluşmaz. Elle eklenen kayıtlarda
+-- import_key NULL kalır (NULL değerler UNIQUE kısıtına takılmaz).
+--
+-- Kullanım:
+--   python resumable_import.py BETON-997.xlsx --table concrete_logs --sheet Sayfa1
+
+ALTER TABLE concrete_logs ADD COLUMN IF NOT EXISTS import_key TEXT;
+ALTER TABLE rebar_logs ADD COLUMN IF NOT EXISTS import_key TEXT;
+ALTER TABLE mesh_logs ADD COLUMN IF NOT EXISTS import_key TEXT;
+
+-- PostgREST on_conflict bir UNIQUE kısıt/indeks ister (kısmi indeks yetmez)
+ALTER TABLE concrete_logs DROP CONSTRAINT IF EXISTS concrete_logs_import_key_key;
+ALTER TABLE concrete_logs ADD CONSTRAINT concrete_logs_import_key_key UNIQUE (import_key);
+ALTER TABLE rebar_logs DROP CONSTRAINT IF EXISTS rebar_logs_import_key_key;
+ALTER TABLE rebar_logs ADD CONSTRAINT rebar_logs_import_key_key UNIQUE (import_key);
+ALTER TABLE mesh_logs DROP CONSTRAINT IF EXISTS mesh_logs_import_key_key;
+ALTER TABLE mesh_logs ADD CONSTRAINT mesh_logs_import_key_key UNIQUE (import_key);
+
+-- Shadow tablolar (shadow_reimport.sql) aynı kolona sahip olmalı: swap SELECT * ile kopyalar
+ALTER TABLE IF EXISTS concrete_logs_shadow ADD COLUMN IF NOT EXISTS import_key TEXT;
+ALTER TABLE IF EXISTS rebar_logs_shadow ADD COLUMN IF NOT EXISTS import_key TEXT;
+ALTER TABLE IF EXISTS mesh_logs_shadow ADD COLUMN IF NOT EXISTS import_key TEXT;
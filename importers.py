@@ -0,0 +1,217 @@
+"""
+Excel Importers for the FastAPI backend
+Parses uploaded Excel files into ORM objects. Shared by the sync (/api) and
+async (/api/v2) import endpoints, which only differ in how they persist.
+"""
+
+import pandas as pd
+from typing import List, Optional
+
+from database import Beton, Demir, Hasir
+
+
+def waybill_text(value) -> Optional[str]:
+    """Excel hücresi -> irsaliye no; boş hücre (NaN, "", "nan") None olur, unique indeks onu saymaz"""
+    if value is None or pd.isna(value):
+        return None
+    text = str(value).strip()
+    return text if text and text.lower() != "nan" else None
+
+
+def resolve_beton_firma(irsaliye_no) -> Optional[str]:
+    """İrsaliye numarasına göre firma; numara sayıya çevrilemezse None (gönderilen firma kalır)"""
+    try:
+        irsa_num = float(irsaliye_no)
+    except:
+        return None
+    if pd.isna(irsa_num):  # float("nan") parses
+        return None
+    return "ALBAYRAK BETON" if irsa_num > 14000 else "ÖZYURT BETON"
+
+
+def apply_beton_firma_rule(beton: Beton) -> Beton:
+    """İrsaliye numarasına göre firma otomatik belirleme"""
+    firma = resolve_beton_firma(beton.irsaliye_no)
+    if firma:
+        beton.firma = firma
+    return beton
+
+
+# ============================================
+# BETON
+# ============================================
+
+def parse_beton_excel(contents: bytes) -> List[Beton]:
+    df = pd.read_excel(contents, sheet_name='Sayfa1')
+
+    # Column mapping
+    column_mapping = {
+        'TARH': 'TARİH', 'TARİH': 'TARİH',
+        'FRMA': 'FİRMA', 'FİRMA': 'FİRMA',
+        'RSALYE NO': 'İRSALİYE NO', 'İRSALİYE NO': 'İRSALİYE NO',
+        'BETON SINIFI': 'BETON SINIFI',
+        'TESLM EKL': 'TESLİM ŞEKLİ', 'TESLİM ŞEKLİ': 'TESLİM ŞEKLİ',
+        'MKTAR': 'MİKTAR (m3)', 'MİKTAR': 'MİKTAR (m3)',
+        'BLOK': 'BLOK',
+        'AIKLAMA': 'AÇIKLAMA', 'AÇIKLAMA': 'AÇIKLAMA'
+    }
+
+    df = df.rename(columns=column_mapping)
+    df = df.dropna(subset=['MİKTAR (m3)'])
+
+    records = []
+    for _, row in df.iterrows():
+        beton = Beton(
+            tarih=pd.to_datetime(row.get('TARİH')),
+            firma=row.get('FİRMA'),
+            irsaliye_no=waybill_text(row.get('İRSALİYE NO')),
+            beton_sinifi=row.get('BETON SINIFI'),
+            teslim_sekli=row.get('TESLİM ŞEKLİ'),
+            miktar=float(row.get('MİKTAR (m3)')),
+            blok=row.get('BLOK'),
+            aciklama=row.get('AÇIKLAMA')
+        )
+        records.append(apply_beton_firma_rule(beton))
+
+    return records
+
+
+# ============================================
+# DEMİR
+# ============================================
+
+def parse_demir_excel(contents: bytes) -> List[Demir]:
+    df_demir = pd.read_excel(contents, sheet_name=0, header=1)
+
+    df_demir.columns = df_demir.columns.astype(str)
+
+    # Yardımcı Fonksiyon
+    def get_col_by_keyword(columns, keywords, exclude_keywords=[]):
+        found_cols = []
+        for col in columns:
+            if any(kw in col for kw in keywords):
+                if not any(ex in col for ex in exclude_keywords):
+                    found_cols.append(col)
+        return found_cols
+
+    # Kolon Bulma
+    tar_col = get_col_by_keyword(df_demir.columns, ['TAR', 'TARİH'])[0] if get_col_by_keyword(df_demir.columns, ['TAR', 'TARİH']) else None
+    etap_col = get_col_by_keyword(df_demir.columns, ['ETAP'])[0] if get_col_by_keyword(df_demir.columns, ['ETAP']) else None
+    irsa_col = get_col_by_keyword(df_demir.columns, ['İRSALİYE', 'RSALYE'])[0] if get_col_by_keyword(df_demir.columns, ['İRSALİYE', 'RSALYE']) else None
+    tedarik_col = get_col_by_keyword(df_demir.columns, ['SİPARİŞ', 'SPAR'])[0] if get_col_by_keyword(df_demir.columns, ['SİPARİŞ', 'SPAR']) else None
+    uretici_col = get_col_by_keyword(df_demir.columns, ['GELDİĞİ', 'GELD'])[0] if get_col_by_keyword(df_demir.columns, ['GELDİĞİ', 'GELD']) else None
+
+    # Çap Kolonları
+    q8_cols = get_col_by_keyword(df_demir.columns, ["8'", "8 "], exclude_keywords=["18", "28"])
+    q10_cols = get_col_by_keyword(df_demir.columns, ["10'", "10 "])
+    q12_cols = get_col_by_keyword(df_demir.columns, ["12'", "12 "])
+    q14_cols = get_col_by_keyword(df_demir.columns, ["14'", "14 "])
+    q16_cols = get_col_by_keyword(df_demir.columns, ["16'", "16 "])
+    q18_cols = get_col_by_keyword(df_demir.columns, ["18'", "18 ", "18L"])
+    q20_cols = get_col_by_keyword(df_demir.columns, ["20'", "20 "])
+    q22_cols = get_col_by_keyword(df_demir.columns, ["22'", "22 "])
+    q25_cols = get_col_by_keyword(df_demir.columns, ["25'", "25 ", "24'", "24 "])
+    q28_cols = get_col_by_keyword(df_demir.columns, ["28'", "28 "])
+    q32_cols = get_col_by_keyword(df_demir.columns, ["32'", "32 "])
+
+    cap_cols_map = {
+        8: q8_cols, 10: q10_cols, 12: q12_cols, 14: q14_cols,
+        16: q16_cols, 18: q18_cols, 20: q20_cols, 22: q22_cols,
+        25: q25_cols, 28: q28_cols, 32: q32_cols
+    }
+
+    records = []
+    for _, row in df_demir.iterrows():
+        if tar_col and pd.isna(row.get(tar_col)):
+            continue
+
+        # Çap Ağırlıkları
+        cap_values = {}
+        for cap, cols in cap_cols_map.items():
+            val = 0
+            for c in cols:
+                v = pd.to_numeric(row.get(c), errors='coerce')
+                if pd.notna(v):
+                    val += v
+            cap_values[f'q{cap}'] = val
+
+        toplam = sum(cap_values.values())
+
+        if toplam > 0:
+            records.append(Demir(
+                tarih=pd.to_datetime(row.get(tar_col)),
+                etap=row.get(etap_col),
+                irsaliye_no=waybill_text(row.get(irsa_col)),
+                tedarikci=row.get(tedarik_col),
+                uretici=row.get(uretici_col),
+                toplam_agirlik=toplam,
+                **cap_values
+            ))
+
+    return records
+
+
+# ============================================
+# HASIR
+# ============================================
+
+def parse_hasir_excel(contents: bytes) -> List[Hasir]:
+    df_hasir = pd.read_excel(contents)
+
+    df_hasir.columns = df_hasir.columns.astype(str)
+
+    def get_col_by_keyword(columns, keywords):
+        for col in columns:
+            for kw in keywords:
+                if kw in col:
+                    return col
+        return None
+
+    tar_col = get_col_by_keyword(df_hasir.columns, ['TARİH', 'TARH'])
+    firma_col = get_col_by_keyword(df_hasir.columns, ['FİRMA', 'FRMA'])
+    irsa_col = get_col_by_keyword(df_hasir.columns, ['İRSALİYE', 'RSALYE'])
+    etap_col = get_col_by_keyword(df_hasir.columns, ['ETAP'])
+    tip_col = get_col_by_keyword(df_hasir.columns, ['HASIR TİPİ', 'HASIR TP'])
+    boy_col = get_col_by_keyword(df_hasir.columns, ['HASIR UZUNLUĞU', 'HASIR UZUNLUU'])
+    en_col = get_col_by_keyword(df_hasir.columns, ['HASIRIN ENİ', 'HASIRIN EN'])
+    adet_col = get_col_by_keyword(df_hasir.columns, ['ADET'])
+    weight_cols = [c for c in df_hasir.columns if 'AĞIRLIK' in c or 'AIRLIK' in c or 'ARLIK' in c]
+    ss_col = get_col_by_keyword(df_hasir.columns, ['SS', 'KULLANIM YERİ'])
+
+    records = []
+    for _, row in df_hasir.iterrows():
+        if tar_col and pd.isna(row.get(tar_col)):
+            continue
+
+        # Ebat
+        boy_val = row.get(boy_col) if boy_col else None
+        en_val = row.get(en_col) if en_col else None
+        ebatlar = f"{en_val}x{boy_val}" if pd.notna(boy_val) and pd.notna(en_val) else ""
+
+        # Ağırlık
+        val = 0
+        if weight_cols:
+            vals = []
+            for c in weight_cols:
+                v = pd.to_numeric(row[c], errors='coerce')
+                if pd.notna(v):
+                    vals.append(v)
+            if vals:
+                val = max(vals)
+
+        adet = pd.to_numeric(row.get(adet_col), errors='coerce') if adet_col else 0
+
+        if val > 0 or (adet and adet > 0):
+            records.append(Hasir(
+                tarih=pd.to_datetime(row.get(tar_col)),
+                firma=row.get(firma_col),
+                irsaliye_no=waybill_text(row.get(irsa_col)),
+                etap=row.get(etap_col) or "Genel",
+                hasir_tipi=row.get(tip_col),
+                ebatlar=ebatlar,
+                adet=int(adet) if pd.notna(adet) else None,
+                agirlik=val,
+                kullanim_yeri=row.get(ss_col)
+            ))
+
+    return records
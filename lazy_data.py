@@ -0,0 +1,52 @@
+"""
+Lazy Data Loading for the Streamlit dashboards
+Pages and tabs declare the datasets they need; only those are fetched.
+"""
+
+import streamlit as st
+from typing import Any, Callable, Dict, List, Sequence
+
+
+class LazyDataLoader:
+    """
+    Registry of named dataset loaders.
+    Loaders are usually st.cache_data functions, so a dataset is fetched
+    the first time a visible page/tab asks for it and reused afterwards.
+    """
+
+    def __init__(self):
+        self._loaders: Dict[str, Callable[[], Any]] = {}
+
+    def register(self, name: str, loader: Callable[[], Any]) -> None:
+        """Register a loader under a dataset name"""
+        self._loaders[name] = loader
+
+    def get(self, name: str) -> Any:
+        """Fetch a single dataset"""
+        if name not in self._loaders:
+            raise KeyError(f"Unknown dataset: {name}")
+        return self._loaders[name]()
+
+    def require(self, *names: str) -> Dict[str, Any]:
+        """Fetch only the declared datasets and return them by name"""
+        return {name: self.get(name) for name in names}
+
+
+def lazy_tabs(labels: Sequence[str], key: str) -> List:
+    """
+    Tabs that only execute the selected tab's body.
+    Use `if tab.open:` inside each tab before loading its data.
+    """
+    return st.tabs(list(labels), key=key, on_change="rerun")
+
+
+def lazy_section(loader: LazyDataLoader, title: str, key: str, needs: Sequence[str],
+                 render: Callable[[Dict[str, Any]], None], expanded: bool = False) -> None:
+    """
+    Below-the-fold section rendered on demand.
+    The declared datasets are fetched only when the user opens the section.
+    """
+    section = st.expander(title, expanded=expanded, key=key, on_change="rerun")
+    with section:
+        if section.open:
+            render(loader.require(*needs))
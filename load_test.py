@@ -0,0 +1,101 @@
+"""
+Load Test - sync (/api) vs async (/api/v2) endpoints
+Sends mixed read/write traffic to a running backend and reports throughput and latency.
+
+Kullanım:
+    uvicorn main:app --port 8000
+    python load_test.py --requests 2000 --concurrency 50 --write-ratio 0.2
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+import httpx
+
+READ_PATHS = [
+    "/beton/?limit=100",
+    "/demir/?limit=100",
+    "/hasir/?limit=100",
+    "/analytics/summary",
+    "/analytics/dashboard",
+]
+
+
+def beton_payload(i: int) -> dict:
+    return {
+        "tarih": "2025-11-20T10:00:00",
+        "firma": "ÖZYURT BETON",
+        "irsaliye_no": f"LT-{i}",
+        "beton_sinifi": random.choice(["C25", "C30", "C35"]),
+        "teslim_sekli": random.choice(["POMPALI", "MİKSERLİ"]),
+        "miktar": round(random.uniform(1, 20), 1),
+        "blok": random.choice(["A1", "B2", "GK1"]),
+        "aciklama": "load test",
+    }
+
+
+async def run_mix(base_url: str, prefix: str, total: int, concurrency: int, write_ratio: float) -> dict:
+    """Run `total` requests with `concurrency` in flight; returns throughput/latency stats"""
+    latencies = []
+    errors = 0
+    counter = iter(range(total))
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=60,
+                                 limits=httpx.Limits(max_connections=concurrency)) as client:
+        async def worker():
+            nonlocal errors
+            for i in counter:
+                started = time.perf_counter()
+                try:
+                    if random.random() < write_ratio:
+                        response = await client.post(f"{prefix}/beton/", json=beton_payload(i))
+                    else:
+                        response = await client.get(prefix + random.choice(READ_PATHS))
+                    if response.status_code >= 400:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "prefix": prefix,
+        "requests": total,
+        "errors": errors,
+        "seconds": elapsed,
+        "rps": total / elapsed if elapsed else 0,
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1],
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync vs async API load test")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    parser.add_argument("--prefix", action="append", help="Endpoint prefix(es); default: /api and /api/v2")
+    args = parser.parse_args()
+
+    prefixes = args.prefix or ["/api", "/api/v2"]
+    print(f"🚀 {args.requests} istek, eşzamanlılık {args.concurrency}, yazma oranı %{args.write_ratio * 100:.0f}")
+    print(f"{'prefix':<10}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'hata':>8}")
+
+    for prefix in prefixes:
+        # Warm up connections and caches before measuring
+        asyncio.run(run_mix(args.base_url, prefix, min(100, args.requests), args.concurrency, args.write_ratio))
+        r = asyncio.run(run_mix(args.base_url, prefix, args.requests, args.concurrency, args.write_ratio))
+        print(f"{r['prefix']:<10}{r['rps']:>10.1f}{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}{r['p99_ms']:>10.1f}{r['errors']:>8}")
+
+
+if __name__ == "__main__":
+    main()
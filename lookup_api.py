@@ -0,0 +1,149 @@
+"""
+Waybill lookup
+"Was this irsaliye already entered?" answered from the unique (irsaliye_no, firma) index
+(database.WAYBILL_INDEXES) instead of scanning. Create endpoints use the same helpers to turn
+the unique-index violation into a 409 with the conflicting records.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import select, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional
+
+from database import get_read_db, real_waybill, Beton, Demir, Hasir
+from dimensions import name_filter, resolve_rows
+from shadow_reimport import reimport_local
+
+# material -> (model, supplier name column, supplier id column, quantity column)
+WAYBILL_TABLES = {
+    "beton": (Beton, Beton.firma, Beton.firma_id, Beton.miktar),
+    "demir": (Demir, Demir.tedarikci, Demir.tedarikci_id, Demir.toplam_agirlik),
+    "hasir": (Hasir, Hasir.firma, Hasir.firma_id, Hasir.agirlik),
+}
+MODEL_MATERIAL = {model: material for material, (model, _, _, _) in WAYBILL_TABLES.items()}
+
+router = APIRouter(prefix="/api/lookup", tags=["lookup"], default_response_class=ORJSONResponse)
+
+
+def waybill_matches(connection, irsaliye_no: str, firma: Optional[str] = None,
+                    material: Optional[str] = None) -> List[Dict]:
+    """Records carrying this waybill (index seek per table; AUTO-/empty numbers scan)"""
+    synthetic = not irsaliye_no or irsaliye_no.startswith("AUTO-")
+    results = []
+    for name, (model, supplier, _, quantity) in WAYBILL_TABLES.items():
+        if material and name != material:
+            continue
+        conditions = [model.irsaliye_no == irsaliye_no]
+        if not synthetic:
+            conditions.append(real_waybill(model.irsaliye_no))  # lets the partial index be used
+        if firma:
+            conditions.append(name_filter(supplier, firma))
+        rows = connection.execute(
+            select(model.id, model.tarih, supplier.label("firma"), quantity.label("miktar")).where(*conditions)
+        ).all()
+        results += [
+            {"malzeme": name, "id": row.id, "tarih": row.tarih, "irsaliye_no": irsaliye_no,
+             "firma": row.firma, "miktar": row.miktar}
+            for row in rows
+        ]
+    return results
+
+
+def is_waybill_conflict(error: IntegrityError) -> bool:
+    message = str(error.orig)
+    return "irsaliye" in message and ("UNIQUE" in message or "unique" in message)
+
+
+def conflicting_items(connection, model, rows: List[Dict], include_stored: bool = True) -> List[Dict]:
+    """Per-item 409 results for a batch: waybills already stored (unless include_stored=False) or repeated within the batch"""
+    _, _, supplier_id, _ = WAYBILL_TABLES[MODEL_MATERIAL[model]]
+    keys = [(row.get("irsaliye_no"), row.get(supplier_id.key)) for row in rows]
+    candidates = [key for key in keys if key[0] and key[1] is not None and not key[0].startswith("AUTO-")]
+    stored = {}
+    if candidates and include_stored:
+        stored = {
+            (no, sid): record_id for record_id, no, sid in connection.execute(
+                select(model.id, model.irsaliye_no, supplier_id)
+                .where(tuple_(model.irsaliye_no, supplier_id).in_(candidates), real_waybill(model.irsaliye_no))
+            )
+        }
+
+    results, seen = [], {}
+    for index, key in enumerate(keys):
+        if key in stored:
+            results.append({"index": index, "status": "conflict", "irsaliye_no": key[0], "mevcut_id": stored[key]})
+        elif key in candidates and key in seen:
+            results.append({"index": index, "status": "conflict", "irsaliye_no": key[0], "tekrar_index": seen[key]})
+        seen.setdefault(key, index)
+    return results
+
+
+def waybill_conflict(irsaliye_no: Optional[str], matches: List[Dict]) -> HTTPException:
+    return HTTPException(status_code=409, detail={
+        "message": f"{irsaliye_no} numaralı irsaliye bu firma için zaten kayıtlı",
+        "kayitlar": jsonable_encoder(matches),  # error responses go through the stdlib encoder
+    })
+
+
+def commit_or_409(db: Session, obj):
+    """add + commit; the unique waybill index rejecting the row becomes a 409 with the stored record"""
+    material = MODEL_MATERIAL[type(obj)]
+    supplier = WAYBILL_TABLES[material][1]
+    irsaliye_no, firma = obj.irsaliye_no, getattr(obj, supplier.key)
+    db.add(obj)
+    try:
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        if not is_waybill_conflict(e):
+            raise
+        raise waybill_conflict(irsaliye_no, waybill_matches(db.connection(), irsaliye_no, firma, material))
+    db.refresh(obj)
+    return obj
+
+
+def add_all_or_409(db: Session, records: List):
+    """Excel import: add_all + commit; waybill conflicts become a 409 listing the offending rows"""
+    db.add_all(records)
+    try:
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        if not is_waybill_conflict(e):
+            raise
+        raise import_conflict(db.connection(), records)
+
+
+def reimport_or_409(db: Session, kind: str, records: List) -> Dict:
+    """reimport_local; the old rows are replaced, so only waybills repeated within the file conflict"""
+    try:
+        return reimport_local(db, kind, records)
+    except IntegrityError as e:
+        if not is_waybill_conflict(e):
+            raise
+        raise import_conflict(db.connection(), records, include_stored=False)
+
+
+def import_conflict(connection, records: List, include_stored: bool = True) -> HTTPException:
+    """conflicting_items for unsaved ORM records; lookup ids are resolved like the flush hook does"""
+    model = type(records[0])
+    supplier = WAYBILL_TABLES[MODEL_MATERIAL[model]][1]
+    rows = [{"irsaliye_no": r.irsaliye_no, supplier.key: getattr(r, supplier.key)} for r in records]
+    results = conflicting_items(connection, model, resolve_rows(connection, model, rows), include_stored)
+    return HTTPException(status_code=409, detail={
+        "message": "Kayıtlı veya dosyada tekrarlanan irsaliyeler var, hiçbir kayıt eklenmedi",
+        "results": jsonable_encoder(results),
+    })
+
+
+@router.get("/waybill/{irsaliye_no}")
+def lookup_waybill(irsaliye_no: str, firma: Optional[str] = None, malzeme: Optional[str] = None,
+                   db: Session = Depends(get_read_db)):
+    """İrsaliye daha önce girilmiş mi? (isteğe bağlı firma / malzeme ile)"""
+    if malzeme and malzeme not in WAYBILL_TABLES:
+        raise HTTPException(status_code=400, detail=f"Geçersiz malzeme: {malzeme} (geçerli: {', '.join(WAYBILL_TABLES)})")
+    matches = waybill_matches(db.connection(), irsaliye_no, firma, malzeme)
+    return {"irsaliye_no": irsaliye_no, "bulundu": bool(matches), "kayitlar": matches}
@@ -1,12 +1,34 @@
 from fastapi import FastAPI, Depends, HTTPException, UploadFile, File
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, PlainTextResponse
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from contextlib import asynccontextmanager
 import pandas as pd
-from datetime import datetime
-
-from database import get_db, init_db, Beton, Demir, Hasir
+from datetime import date, datetime
+
+from database import get_db, get_read_db, init_db, Beton, Demir, Hasir
+from importers import apply_beton_firma_rule, parse_beton_excel, parse_demir_excel, parse_hasir_excel
+from database_async import init_async_db
+from async_api import router as async_router
+from bulk_api import router as bulk_router
+from admin_api import router as admin_router
+from search_api import router as search_router
+from lookup_api import router as lookup_router, add_all_or_409, commit_or_409, reimport_or_409
+from middleware import (
+    analytics_cache_middleware, brotli_middleware, metrics_middleware,
+    query_profiling_middleware, rate_limit_middleware
+)
+from metrics import import_timer, render_metrics
+from serializers import list_select, rows_response
+from analytics import (
+    summary_statement, summary_response, by_date_statement, grouped_sum_statement, grouped_sum_response,
+    timeseries_statement, timeseries_response, validate_timeseries, cap_totals_statement, cap_totals_response,
+    timeseries_bounds_statement, effective_range, timeseries_range_error
+)
+from config import settings
 from schemas import (
     BetonCreate, BetonResponse, DemirCreate, DemirResponse,
     HasirCreate, HasirResponse, DashboardStats, BetonAnalytics,
@@ -17,12 +39,32 @@ from schemas import (
 async def lifespan(app: FastAPI):
     # Startup
     init_db()
+    await init_async_db()
     yield
     # Shutdown (if needed)
 
-app = FastAPI(title="Şantiye Malzeme Yönetim API", version="1.0.0", lifespan=lifespan)
+app = FastAPI(title="Şantiye Malzeme Yönetim API", version="1.0.0", lifespan=lifespan,
+              default_response_class=ORJSONResponse)
+
+# Query profiler (inside the response cache: cache hits run no queries)
+app.middleware("http")(query_profiling_middleware)
+
+# Analytics responses: ETag / Last-Modified, 304 and cache keyed by data version
+app.middleware("http")(analytics_cache_middleware)
 
-# CORS Middleware
+# Compression: brotli when the client accepts it (and the package is installed), else gzip
+app.middleware("http")(brotli_middleware)
+app.add_middleware(GZipMiddleware, minimum_size=settings.COMPRESSION_MIN_SIZE, compresslevel=settings.COMPRESSION_GZIP_LEVEL)
+
+# Rate limiting (rejected requests do no other work)
+if settings.RATE_LIMIT_ENABLED:
+    app.middleware("http")(rate_limit_middleware)
+
+# Metrics (latency includes every other middleware, 429s are counted)
+app.middleware("http")(metrics_middleware)
+
+# CORS Middleware (added last = outermost: cache HITs, 304s and 429s return without
+# reaching the inner layers and still need the CORS headers)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -31,6 +73,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Async (v2) endpoints
+app.include_router(async_router)
+
+# Admin (query profiler reports)
+app.include_router(admin_router)
+
+# Bulk endpoints (registered before /{id} routes so /bulk isn't parsed as an id)
+app.include_router(bulk_router)
+
+# Full-text search and waybill lookup
+app.include_router(search_router)
+app.include_router(lookup_router)
+
 # Health Check
 @app.get("/")
 def read_root():
@@ -40,6 +95,11 @@ def read_root():
 def health_check():
     return {"status": "healthy", "version": "1.0.0"}
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Prometheus text format"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 # ========== BETON ENDPOINTS ==========
 
 @app.post("/api/beton/", response_model=BetonResponse)
@@ -47,27 +107,16 @@ def create_beton(beton: BetonCreate, db: Session = Depends(get_db)):
     db_beton = Beton(**beton.dict())
     
     # İrsaliye numarasına göre firma otomatik belirleme
-    try:
-        irsa_num = float(beton.irsaliye_no)
-        if irsa_num > 14000:
-            db_beton.firma = "ALBAYRAK BETON"
-        else:
-            db_beton.firma = "ÖZYURT BETON"
-    except:
-        pass  # İrsaliye numarası sayıya çevrilemezse, gönderilen firma değeri kullanılır
+    apply_beton_firma_rule(db_beton)
     
-    db.add(db_beton)
-    db.commit()
-    db.refresh(db_beton)
-    return db_beton
+    return commit_or_409(db, db_beton)
 
 @app.get("/api/beton/", response_model=List[BetonResponse])
-def get_all_beton(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    betons = db.query(Beton).offset(skip).limit(limit).all()
-    return betons
+def get_all_beton(skip: int = 0, limit: int = 100, db: Session = Depends(get_read_db)):
+    return rows_response(db.execute(list_select(Beton, BetonResponse).offset(skip).limit(limit)))
 
 @app.get("/api/beton/{beton_id}", response_model=BetonResponse)
-def get_beton(beton_id: int, db: Session = Depends(get_db)):
+def get_beton(beton_id: int, db: Session = Depends(get_read_db)):
     beton = db.query(Beton).filter(Beton.id == beton_id).first()
     if not beton:
         raise HTTPException(status_code=404, detail="Beton kaydı bulunamadı")
@@ -83,18 +132,9 @@ def update_beton(beton_id: int, beton: BetonCreate, db: Session = Depends(get_db
         setattr(db_beton, key, value)
     
     # İrsaliye numarasına göre firma otomatik belirleme
-    try:
-        irsa_num = float(beton.irsaliye_no)
-        if irsa_num > 14000:
-            db_beton.firma = "ALBAYRAK BETON"
-        else:
-            db_beton.firma = "ÖZYURT BETON"
-    except:
-        pass
+    apply_beton_firma_rule(db_beton)
     
-    db.commit()
-    db.refresh(db_beton)
-    return db_beton
+    return commit_or_409(db, db_beton)
 
 @app.delete("/api/beton/{beton_id}")
 def delete_beton(beton_id: int, db: Session = Depends(get_db)):
@@ -110,18 +150,14 @@ def delete_beton(beton_id: int, db: Session = Depends(get_db)):
 @app.post("/api/demir/", response_model=DemirResponse)
 def create_demir(demir: DemirCreate, db: Session = Depends(get_db)):
     db_demir = Demir(**demir.dict())
-    db.add(db_demir)
-    db.commit()
-    db.refresh(db_demir)
-    return db_demir
+    return commit_or_409(db, db_demir)
 
 @app.get("/api/demir/", response_model=List[DemirResponse])
-def get_all_demir(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    demirs = db.query(Demir).offset(skip).limit(limit).all()
-    return demirs
+def get_all_demir(skip: int = 0, limit: int = 100, db: Session = Depends(get_read_db)):
+    return rows_response(db.execute(list_select(Demir, DemirResponse).offset(skip).limit(limit)))
 
 @app.get("/api/demir/{demir_id}", response_model=DemirResponse)
-def get_demir(demir_id: int, db: Session = Depends(get_db)):
+def get_demir(demir_id: int, db: Session = Depends(get_read_db)):
     demir = db.query(Demir).filter(Demir.id == demir_id).first()
     if not demir:
         raise HTTPException(status_code=404, detail="Demir kaydı bulunamadı")
@@ -136,9 +172,7 @@ def update_demir(demir_id: int, demir: DemirCreate, db: Session = Depends(get_db
     for key, value in demir.dict().items():
         setattr(db_demir, key, value)
     
-    db.commit()
-    db.refresh(db_demir)
-    return db_demir
+    return commit_or_409(db, db_demir)
 
 @app.delete("/api/demir/{demir_id}")
 def delete_demir(demir_id: int, db: Session = Depends(get_db)):
@@ -154,18 +188,14 @@ def delete_demir(demir_id: int, db: Session = Depends(get_db)):
 @app.post("/api/hasir/", response_model=HasirResponse)
 def create_hasir(hasir: HasirCreate, db: Session = Depends(get_db)):
     db_hasir = Hasir(**hasir.dict())
-    db.add(db_hasir)
-    db.commit()
-    db.refresh(db_hasir)
-    return db_hasir
+    return commit_or_409(db, db_hasir)
 
 @app.get("/api/hasir/", response_model=List[HasirResponse])
-def get_all_hasir(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    hasirs = db.query(Hasir).offset(skip).limit(limit).all()
-    return hasirs
+def get_all_hasir(skip: int = 0, limit: int = 100, db: Session = Depends(get_read_db)):
+    return rows_response(db.execute(list_select(Hasir, HasirResponse).offset(skip).limit(limit)))
 
 @app.get("/api/hasir/{hasir_id}", response_model=HasirResponse)
-def get_hasir(hasir_id: int, db: Session = Depends(get_db)):
+def get_hasir(hasir_id: int, db: Session = Depends(get_read_db)):
     hasir = db.query(Hasir).filter(Hasir.id == hasir_id).first()
     if not hasir:
         raise HTTPException(status_code=404, detail="Hasır kaydı bulunamadı")
@@ -180,9 +210,7 @@ def update_hasir(hasir_id: int, hasir: HasirCreate, db: Session = Depends(get_db
     for key, value in hasir.dict().items():
         setattr(db_hasir, key, value)
     
-    db.commit()
-    db.refresh(db_hasir)
-    return db_hasir
+    return commit_or_409(db, db_hasir)
 
 @app.delete("/api/hasir/{hasir_id}")
 def delete_hasir(hasir_id: int, db: Session = Depends(get_db)):
@@ -196,73 +224,35 @@ def delete_hasir(hasir_id: int, db: Session = Depends(get_db)):
 # ========== ANALYTICS ENDPOINTS ==========
 
 @app.get("/api/analytics/dashboard")
-def get_dashboard_stats(db: Session = Depends(get_db)):
+def get_dashboard_stats(db: Session = Depends(get_read_db)):
+    def grouped_sum(column, value, *where, default=None):
+        return grouped_sum_response(db.execute(grouped_sum_statement(column, value, *where)), default)
+
     # Beton Analytics
-    betons = db.query(Beton).all()
-    toplam_beton = sum([b.miktar for b in betons])
-    
-    firma_dagilimi = {}
-    sinif_dagilimi = {}
-    blok_dagilimi = {}
-    
-    for b in betons:
-        firma_dagilimi[b.firma] = firma_dagilimi.get(b.firma, 0) + b.miktar
-        sinif_dagilimi[b.beton_sinifi] = sinif_dagilimi.get(b.beton_sinifi, 0) + b.miktar
-        blok = b.blok or "Bilinmiyor"
-        blok_dagilimi[blok] = blok_dagilimi.get(blok, 0) + b.miktar
-    
+    toplam_beton = db.execute(select(func.coalesce(func.sum(Beton.miktar), 0))).scalar()
     beton_analytics = {
         "toplam_miktar": toplam_beton,
-        "firma_dagilimi": firma_dagilimi,
-        "sinif_dagilimi": sinif_dagilimi,
-        "blok_dagilimi": blok_dagilimi
+        "firma_dagilimi": grouped_sum(Beton.firma, Beton.miktar, default="Belirtilmemiş"),
+        "sinif_dagilimi": grouped_sum(Beton.beton_sinifi, Beton.miktar, default="Belirtilmemiş"),
+        "blok_dagilimi": grouped_sum(Beton.blok, Beton.miktar, default="Bilinmiyor")
     }
     
     # Demir Analytics
-    demirs = db.query(Demir).all()
-    toplam_demir = sum([d.toplam_agirlik for d in demirs])
-    
-    cap_dagilimi = {
-        "Q8": sum([d.q8 for d in demirs]),
-        "Q10": sum([d.q10 for d in demirs]),
-        "Q12": sum([d.q12 for d in demirs]),
-        "Q14": sum([d.q14 for d in demirs]),
-        "Q16": sum([d.q16 for d in demirs]),
-        "Q18": sum([d.q18 for d in demirs]),
-        "Q20": sum([d.q20 for d in demirs]),
-        "Q22": sum([d.q22 for d in demirs]),
-        "Q25": sum([d.q25 for d in demirs]),
-        "Q28": sum([d.q28 for d in demirs]),
-        "Q32": sum([d.q32 for d in demirs]),
-    }
-    
-    tedarikci_dagilimi = {}
-    for d in demirs:
-        if d.tedarikci:
-            tedarikci_dagilimi[d.tedarikci] = tedarikci_dagilimi.get(d.tedarikci, 0) + d.toplam_agirlik
-    
+    toplam_demir = db.execute(select(func.coalesce(func.sum(Demir.toplam_agirlik), 0))).scalar()
     demir_analytics = {
         "toplam_agirlik": toplam_demir,
-        "cap_dagilimi": cap_dagilimi,
-        "tedarikci_dagilimi": tedarikci_dagilimi
+        "cap_dagilimi": cap_totals_response(db.execute(cap_totals_statement())),
+        "tedarikci_dagilimi": grouped_sum(Demir.tedarikci, Demir.toplam_agirlik, Demir.tedarikci_id.is_not(None))
     }
     
     # Hasir Analytics
-    hasirs = db.query(Hasir).all()
-    toplam_hasir = sum([h.agirlik for h in hasirs])
-    
-    hasir_firma_dagilimi = {}
-    tip_dagilimi = {}
-    
-    for h in hasirs:
-        hasir_firma_dagilimi[h.firma] = hasir_firma_dagilimi.get(h.firma, 0) + h.agirlik
-        if h.hasir_tipi:
-            tip_dagilimi[h.hasir_tipi] = tip_dagilimi.get(h.hasir_tipi, 0) + h.agirlik
-    
+    toplam_hasir = db.execute(select(func.coalesce(func.sum(Hasir.agirlik), 0))).scalar()
     hasir_analytics = {
         "toplam_agirlik": toplam_hasir,
-        "firma_dagilimi": hasir_firma_dagilimi,
-        "tip_dagilimi": tip_dagilimi
+        "firma_dagilimi": grouped_sum(Hasir.firma, Hasir.agirlik, default="Belirtilmemiş"),
+        "tip_dagilimi": grouped_sum(
+            Hasir.hasir_tipi, Hasir.agirlik, Hasir.hasir_tipi.is_not(None), Hasir.hasir_tipi != ""
+        )
     }
     
     return {
@@ -277,248 +267,97 @@ def get_dashboard_stats(db: Session = Depends(get_db)):
 # ========== EXCEL IMPORT ENDPOINTS ==========
 
 @app.post("/api/import/beton")
-async def import_beton_excel(file: UploadFile = File(...), db: Session = Depends(get_db)):
+async def import_beton_excel(file: UploadFile = File(...), replace: bool = False, db: Session = Depends(get_db)):
     try:
-        contents = await file.read()
-        df = pd.read_excel(contents, sheet_name='Sayfa1')
-        
-        # Column mapping
-        column_mapping = {
-            'TARH': 'TARİH', 'TARİH': 'TARİH',
-            'FRMA': 'FİRMA', 'FİRMA': 'FİRMA',
-            'RSALYE NO': 'İRSALİYE NO', 'İRSALİYE NO': 'İRSALİYE NO',
-            'BETON SINIFI': 'BETON SINIFI',
-            'TESLM EKL': 'TESLİM ŞEKLİ', 'TESLİM ŞEKLİ': 'TESLİM ŞEKLİ',
-            'MKTAR': 'MİKTAR (m3)', 'MİKTAR': 'MİKTAR (m3)',
-            'BLOK': 'BLOK',
-            'AIKLAMA': 'AÇIKLAMA', 'AÇIKLAMA': 'AÇIKLAMA'
-        }
-        
-        df = df.rename(columns=column_mapping)
-        df = df.dropna(subset=['MİKTAR (m3)'])
-        
-        count = 0
-        for _, row in df.iterrows():
-            beton = Beton(
-                tarih=pd.to_datetime(row.get('TARİH')),
-                firma=row.get('FİRMA'),
-                irsaliye_no=str(row.get('İRSALİYE NO', '')),
-                beton_sinifi=row.get('BETON SINIFI'),
-                teslim_sekli=row.get('TESLİM ŞEKLİ'),
-                miktar=float(row.get('MİKTAR (m3)')),
-                blok=row.get('BLOK'),
-                aciklama=row.get('AÇIKLAMA')
-            )
-            
-            # İrsaliye numarasına göre firma belirleme
-            try:
-                irsa_num = float(beton.irsaliye_no)
-                if irsa_num > 14000:
-                    beton.firma = "ALBAYRAK BETON"
-                else:
-                    beton.firma = "ÖZYURT BETON"
-            except:
-                pass
-            
-            db.add(beton)
-            count += 1
-        
-        db.commit()
-        return {"message": f"{count} beton kaydı başarıyla eklendi"}
+        with import_timer("beton") as imported:
+            contents = await file.read()
+            records = parse_beton_excel(contents)
+            if replace:
+                result = reimport_or_409(db, "beton", records)
+                imported.rows = len(records)
+                return {"message": f"{result['replaced']} eski beton kaydı {len(records)} yeni kayıtla değiştirildi", **result}
+            add_all_or_409(db, records)
+            imported.rows = len(records)
+        return {"message": f"{len(records)} beton kaydı başarıyla eklendi"}
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Excel import hatası: {str(e)}")
 
 @app.post("/api/import/demir")
-async def import_demir_excel(file: UploadFile = File(...), db: Session = Depends(get_db)):
+async def import_demir_excel(file: UploadFile = File(...), replace: bool = False, db: Session = Depends(get_db)):
     try:
-        contents = await file.read()
-        df_demir = pd.read_excel(contents, sheet_name=0, header=1)
-        
-        df_demir.columns = df_demir.columns.astype(str)
-        
-        # Yardımcı Fonksiyon
-        def get_col_by_keyword(columns, keywords, exclude_keywords=[]):
-            found_cols = []
-            for col in columns:
-                if any(kw in col for kw in keywords):
-                    if not any(ex in col for ex in exclude_keywords):
-                        found_cols.append(col)
-            return found_cols
-
-        # Kolon Bulma
-        tar_col = get_col_by_keyword(df_demir.columns, ['TAR', 'TARİH'])[0] if get_col_by_keyword(df_demir.columns, ['TAR', 'TARİH']) else None
-        etap_col = get_col_by_keyword(df_demir.columns, ['ETAP'])[0] if get_col_by_keyword(df_demir.columns, ['ETAP']) else None
-        irsa_col = get_col_by_keyword(df_demir.columns, ['İRSALİYE', 'RSALYE'])[0] if get_col_by_keyword(df_demir.columns, ['İRSALİYE', 'RSALYE']) else None
-        tedarik_col = get_col_by_keyword(df_demir.columns, ['SİPARİŞ', 'SPAR'])[0] if get_col_by_keyword(df_demir.columns, ['SİPARİŞ', 'SPAR']) else None
-        uretici_col = get_col_by_keyword(df_demir.columns, ['GELDİĞİ', 'GELD'])[0] if get_col_by_keyword(df_demir.columns, ['GELDİĞİ', 'GELD']) else None
-
-        # Çap Kolonları
-        q8_cols = get_col_by_keyword(df_demir.columns, ["8'", "8 "], exclude_keywords=["18", "28"])
-        q10_cols = get_col_by_keyword(df_demir.columns, ["10'", "10 "])
-        q12_cols = get_col_by_keyword(df_demir.columns, ["12'", "12 "])
-        q14_cols = get_col_by_keyword(df_demir.columns, ["14'", "14 "])
-        q16_cols = get_col_by_keyword(df_demir.columns, ["16'", "16 "])
-        q18_cols = get_col_by_keyword(df_demir.columns, ["18'", "18 ", "18L"])
-        q20_cols = get_col_by_keyword(df_demir.columns, ["20'", "20 "])
-        q22_cols = get_col_by_keyword(df_demir.columns, ["22'", "22 "])
-        q25_cols = get_col_by_keyword(df_demir.columns, ["25'", "25 ", "24'", "24 "])
-        q28_cols = get_col_by_keyword(df_demir.columns, ["28'", "28 "])
-        q32_cols = get_col_by_keyword(df_demir.columns, ["32'", "32 "])
-        
-        cap_cols_map = {
-            8: q8_cols, 10: q10_cols, 12: q12_cols, 14: q14_cols,
-            16: q16_cols, 18: q18_cols, 20: q20_cols, 22: q22_cols,
-            25: q25_cols, 28: q28_cols, 32: q32_cols
-        }
-
-        count = 0
-        for _, row in df_demir.iterrows():
-            if tar_col and pd.isna(row.get(tar_col)):
-                continue
-                
-            # Çap Ağırlıkları
-            cap_values = {}
-            for cap, cols in cap_cols_map.items():
-                val = 0
-                for c in cols:
-                    v = pd.to_numeric(row.get(c), errors='coerce')
-                    if pd.notna(v):
-                        val += v
-                cap_values[f'q{cap}'] = val
-            
-            toplam = sum(cap_values.values())
-            
-            if toplam > 0:
-                demir = Demir(
-                    tarih=pd.to_datetime(row.get(tar_col)),
-                    etap=row.get(etap_col),
-                    irsaliye_no=str(row.get(irsa_col, '')),
-                    tedarikci=row.get(tedarik_col),
-                    uretici=row.get(uretici_col),
-                    toplam_agirlik=toplam,
-                    **cap_values
-                )
-                db.add(demir)
-                count += 1
-        
-        db.commit()
-        return {"message": f"{count} demir kaydı başarıyla eklendi"}
+        with import_timer("demir") as imported:
+            contents = await file.read()
+            records = parse_demir_excel(contents)
+            if replace:
+                result = reimport_or_409(db, "demir", records)
+                imported.rows = len(records)
+                return {"message": f"{result['replaced']} eski demir kaydı {len(records)} yeni kayıtla değiştirildi", **result}
+            add_all_or_409(db, records)
+            imported.rows = len(records)
+        return {"message": f"{len(records)} demir kaydı başarıyla eklendi"}
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Excel import hatası: {str(e)}")
 
 @app.post("/api/import/hasir")
-async def import_hasir_excel(file: UploadFile = File(...), db: Session = Depends(get_db)):
+async def import_hasir_excel(file: UploadFile = File(...), replace: bool = False, db: Session = Depends(get_db)):
     try:
-        contents = await file.read()
-        df_hasir = pd.read_excel(contents)
-        
-        df_hasir.columns = df_hasir.columns.astype(str)
-        
-        def get_col_by_keyword(columns, keywords):
-            for col in columns:
-                for kw in keywords:
-                    if kw in col:
-                        return col
-            return None
-
-        tar_col = get_col_by_keyword(df_hasir.columns, ['TARİH', 'TARH'])
-        firma_col = get_col_by_keyword(df_hasir.columns, ['FİRMA', 'FRMA'])
-        irsa_col = get_col_by_keyword(df_hasir.columns, ['İRSALİYE', 'RSALYE'])
-        etap_col = get_col_by_keyword(df_hasir.columns, ['ETAP'])
-        tip_col = get_col_by_keyword(df_hasir.columns, ['HASIR TİPİ', 'HASIR TP'])
-        boy_col = get_col_by_keyword(df_hasir.columns, ['HASIR UZUNLUĞU', 'HASIR UZUNLUU'])
-        en_col = get_col_by_keyword(df_hasir.columns, ['HASIRIN ENİ', 'HASIRIN EN'])
-        adet_col = get_col_by_keyword(df_hasir.columns, ['ADET'])
-        weight_cols = [c for c in df_hasir.columns if 'AĞIRLIK' in c or 'AIRLIK' in c or 'ARLIK' in c]
-        ss_col = get_col_by_keyword(df_hasir.columns, ['SS', 'KULLANIM YERİ'])
-        
-        count = 0
-        for _, row in df_hasir.iterrows():
-            if tar_col and pd.isna(row.get(tar_col)):
-                continue
-            
-            # Ebat
-            boy_val = row.get(boy_col) if boy_col else None
-            en_val = row.get(en_col) if en_col else None
-            ebatlar = f"{en_val}x{boy_val}" if pd.notna(boy_val) and pd.notna(en_val) else ""
-            
-            # Ağırlık
-            val = 0
-            if weight_cols:
-                vals = []
-                for c in weight_cols:
-                    v = pd.to_numeric(row[c], errors='coerce')
-                    if pd.notna(v):
-                        vals.append(v)
-                if vals:
-                    val = max(vals)
-            
-            adet = pd.to_numeric(row.get(adet_col), errors='coerce') if adet_col else 0
-            
-            if val > 0 or (adet and adet > 0):
-                hasir = Hasir(
-                    tarih=pd.to_datetime(row.get(tar_col)),
-                    firma=row.get(firma_col),
-                    irsaliye_no=str(row.get(irsa_col, '')),
-                    etap=row.get(etap_col) or "Genel",
-                    hasir_tipi=row.get(tip_col),
-                    ebatlar=ebatlar,
-                    adet=int(adet) if pd.notna(adet) else None,
-                    agirlik=val,
-                    kullanim_yeri=row.get(ss_col)
-                )
-                db.add(hasir)
-                count += 1
-        
-        db.commit()
-        return {"message": f"{count} hasır kaydı başarıyla eklendi"}
+        with import_timer("hasir") as imported:
+            contents = await file.read()
+            records = parse_hasir_excel(contents)
+            if replace:
+                result = reimport_or_409(db, "hasir", records)
+                imported.rows = len(records)
+                return {"message": f"{result['replaced']} eski hasır kaydı {len(records)} yeni kayıtla değiştirildi", **result}
+            add_all_or_409(db, records)
+            imported.rows = len(records)
+        return {"message": f"{len(records)} hasır kaydı başarıyla eklendi"}
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Excel import hatası: {str(e)}")
 
 # ========== ADVANCED ANALYTICS ENDPOINTS ==========
 
 @app.get("/api/analytics/beton/by-date")
-def get_beton_by_date(db: Session = Depends(get_db)):
+def get_beton_by_date(start_date: Optional[date] = None, end_date: Optional[date] = None,
+                      db: Session = Depends(get_read_db)):
     """Tarihe göre beton dökümü"""
-    betons = db.query(Beton).all()
-    date_data = {}
-    for b in betons:
-        date_str = b.tarih.strftime('%Y-%m-%d')
-        date_data[date_str] = date_data.get(date_str, 0) + b.miktar
-    return {"data": date_data}
+    rows = db.execute(by_date_statement(Beton, Beton.miktar, start_date, end_date))
+    return {"data": {bucket: total for bucket, total in rows}}
 
 @app.get("/api/analytics/demir/by-date")
-def get_demir_by_date(db: Session = Depends(get_db)):
+def get_demir_by_date(start_date: Optional[date] = None, end_date: Optional[date] = None,
+                      db: Session = Depends(get_read_db)):
     """Tarihe göre demir girişi"""
-    demirs = db.query(Demir).all()
-    date_data = {}
-    for d in demirs:
-        date_str = d.tarih.strftime('%Y-%m-%d')
-        date_data[date_str] = date_data.get(date_str, 0) + d.toplam_agirlik
-    return {"data": date_data}
+    rows = db.execute(by_date_statement(Demir, Demir.toplam_agirlik, start_date, end_date))
+    return {"data": {bucket: total for bucket, total in rows}}
+
+@app.get("/api/analytics/timeseries")
+def get_timeseries(material: str, granularity: str = "day", group_by: Optional[str] = None,
+                   start_date: Optional[date] = None, end_date: Optional[date] = None,
+                   db: Session = Depends(get_read_db)):
+    """Gün/hafta/ay periyotlu zaman serisi; boş periyotlar 0 ile doldurulur"""
+    error = validate_timeseries(material, granularity, group_by, start_date, end_date)
+    if not error and (start_date is None) != (end_date is None):
+        bounds = db.execute(timeseries_bounds_statement(material, group_by)).one()
+        error = timeseries_range_error(*effective_range(bounds, start_date, end_date), granularity)
+    if error:
+        raise HTTPException(status_code=400, detail=error)
+    rows = db.execute(timeseries_statement(material, granularity, group_by, start_date, end_date))
+    return timeseries_response(rows, material, granularity, group_by, start_date, end_date)
 
 @app.get("/api/analytics/summary")
-def get_summary_stats(db: Session = Depends(get_db)):
-    """Özet istatistikler"""
-    total_beton = db.query(Beton).count()
-    total_demir = db.query(Demir).count()
-    total_hasir = db.query(Hasir).count()
-    
-    return {
-        "total_records": {
-            "beton": total_beton,
-            "demir": total_demir,
-            "hasir": total_hasir
-        },
-        "total_quantities": {
-            "beton_m3": sum([b.miktar for b in db.query(Beton).all()]),
-            "demir_kg": sum([d.toplam_agirlik for d in db.query(Demir).all()]),
-            "hasir_kg": sum([h.agirlik for h in db.query(Hasir).all()])
-        }
-    }
+def get_summary_stats(start_date: Optional[date] = None, end_date: Optional[date] = None,
+                      firma: Optional[str] = None, db: Session = Depends(get_read_db)):
+    """Özet istatistikler (tek sorgu; opsiyonel tarih aralığı ve firma/tedarikçi filtresi)"""
+    return summary_response(db.execute(summary_statement(start_date, end_date, firma)))
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,220 @@
+"""
+Metrics (Prometheus text format)
+Dependency-free counters, gauges and histograms for the backend: per-route request
+counts and latency, in-flight requests, DB queries per request (SQLAlchemy cursor
+events), import throughput and response-cache hit ratio. Served by GET /metrics.
+"""
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from response_cache import response_cache
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    items = list(labels) + ([extra] if extra else [])
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+# ============================================
+# METRIC TYPES
+# ============================================
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str):
+        super().__init__(name, help_text)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(tuple(sorted(labels.items())), 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            return self.header() + [f"{self.name}{_format_labels(k)} {_format_value(v)}" for k, v in self._values.items()]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[tuple(sorted(labels.items()))] = value
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, buckets: Iterable[float] = LATENCY_BUCKETS):
+        super().__init__(name, help_text)
+        self.buckets = tuple(buckets)
+        self._values: Dict[Labels, list] = {}  # labels -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            data = self._values.setdefault(key, [0] * len(self.buckets) + [0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    data[i] += 1
+            data[-2] += value
+            data[-1] += 1
+
+    def count(self, **labels) -> int:
+        data = self._values.get(tuple(sorted(labels.items())))
+        return data[-1] if data else 0
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        with self._lock:
+            for key, data in self._values.items():
+                for bound, bucket_count in zip(self.buckets, data):
+                    lines.append(f"{self.name}_bucket{_format_labels(key, ('le', _format_value(bound)))} {bucket_count}")
+                lines.append(f"{self.name}_bucket{_format_labels(key, ('le', '+Inf'))} {data[-1]}")
+                lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(data[-2])}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {data[-1]}")
+        return lines
+
+
+# ============================================
+# REGISTRY
+# ============================================
+
+http_requests_total = Counter("http_requests_total", "HTTP istekleri (route şablonu, method, status)")
+http_request_duration_seconds = Histogram("http_request_duration_seconds", "İstek süresi (saniye)")
+http_requests_in_flight = Gauge("http_requests_in_flight", "Şu an işlenen istekler")
+db_queries_total = Counter("db_queries_total", "Çalıştırılan SQL sorguları")
+db_query_duration_seconds_total = Counter("db_query_duration_seconds_total", "SQL sorgularında geçen toplam süre")
+db_queries_per_request = Histogram("db_queries_per_request", "İstek başına SQL sorgu sayısı", QUERY_COUNT_BUCKETS)
+db_time_per_request_seconds = Histogram("db_time_per_request_seconds", "İstek başına SQL süresi (saniye)")
+import_rows_total = Counter("import_rows_total", "Excel import ile eklenen satırlar")
+import_duration_seconds_total = Counter("import_duration_seconds_total", "Excel import süresi (saniye)")
+import_last_rows_per_second = Gauge("import_last_rows_per_second", "Son import hızı (satır/saniye)")
+response_cache_hits = Gauge("response_cache_hits", "Analytics yanıt önbelleği isabetleri")
+response_cache_misses = Gauge("response_cache_misses", "Analytics yanıt önbelleği ıskaları")
+response_cache_hit_ratio = Gauge("response_cache_hit_ratio", "Analytics yanıt önbelleği isabet oranı")
+
+REGISTRY: List[_Metric] = [
+    http_requests_total, http_request_duration_seconds, http_requests_in_flight,
+    db_queries_total, db_query_duration_seconds_total, db_queries_per_request, db_time_per_request_seconds,
+    import_rows_total, import_duration_seconds_total, import_last_rows_per_second,
+    response_cache_hits, response_cache_misses, response_cache_hit_ratio,
+]
+
+
+def render_metrics() -> str:
+    hits, misses = response_cache.hits, response_cache.misses
+    response_cache_hits.set(hits)
+    response_cache_misses.set(misses)
+    response_cache_hit_ratio.set(hits / (hits + misses) if hits + misses else 0.0)
+    return "\n".join(line for metric in REGISTRY for line in metric.render()) + "\n"
+
+
+# ============================================
+# DB QUERY TRACKING
+# ============================================
+
+# Per-request [query count, seconds]; set by the metrics middleware. The list is shared
+# by reference, so queries run in threadpool workers (sync endpoints) are counted too.
+_request_db_stats: contextvars.ContextVar = contextvars.ContextVar("request_db_stats", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("metrics_query_start")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    db_queries_total.inc()
+    db_query_duration_seconds_total.inc(elapsed)
+    stats = _request_db_stats.get()
+    if stats is not None:
+        stats[0] += 1
+        stats[1] += elapsed
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_cursor_error(exception_context):
+    # A failed statement never reaches after_cursor_execute; drop its start time
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("metrics_query_start"):
+        conn.info["metrics_query_start"].pop()
+
+
+def start_request_tracking() -> Tuple[list, contextvars.Token]:
+    stats = [0, 0.0]
+    return stats, _request_db_stats.set(stats)
+
+
+def finish_request_tracking(stats: list, token: contextvars.Token):
+    _request_db_stats.reset(token)
+    db_queries_per_request.observe(stats[0])
+    db_time_per_request_seconds.observe(stats[1])
+
+
+# ============================================
+# IMPORTS
+# ============================================
+
+class _ImportRun:
+    rows = 0
+
+
+@contextmanager
+def import_timer(kind: str):
+    """Times an Excel import; set `.rows` on the yielded object once the rows are committed"""
+    run = _ImportRun()
+    started = time.perf_counter()
+    yield run
+    elapsed = time.perf_counter() - started
+    import_rows_total.inc(run.rows, kind=kind)
+    import_duration_seconds_total.inc(elapsed, kind=kind)
+    if elapsed > 0:
+        import_last_rows_per_second.set(run.rows / elapsed, kind=kind)
@@ -1,41 +1,149 @@
 from fastapi import Request, HTTPException
 from fastapi.responses import JSONResponse
+from starlette.responses import Response
+import math
+import sqlite3
+import threading
 import time
-from collections import defaultdict
-from datetime import datetime, timedelta
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+try:
+    import brotli  # opsiyonel: pip install brotli
+except ImportError:
+    brotli = None
+
+from config import settings
+from response_cache import data_version, response_cache, make_etag, http_date, is_not_modified
+import metrics
+from query_profiler import profiler
+
+# ============================================
+# RATE LIMITING (token bucket)
+# ============================================
+# Each client+route bucket holds `capacity` tokens and refills at `rate` tokens/s;
+# a request costs one token. O(1) per request, and a bucket idle long enough to be
+# full again carries no state, so it can be evicted without changing any decision.
+
+class MemoryBucketStore:
+    """Per-process buckets in an LRU, bounded by max_clients; full buckets are dropped"""
+
+    def __init__(self, max_clients: int = 10000):
+        self.max_clients = max_clients
+        self._lock = threading.Lock()
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()  # key -> [tokens, updated_at, full_at]
+
+    def take(self, key: str, rate: float, capacity: float, now: float) -> Tuple[bool, float]:
+        with self._lock:
+            bucket = self._buckets.pop(key, None)
+            tokens = capacity if bucket is None else min(capacity, bucket[0] + (now - bucket[1]) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = [tokens, now, now + (capacity - tokens) / rate]
+            self._evict(now)
+            return allowed, 0.0 if allowed else (1 - tokens) / rate
+
+    def _evict(self, now: float):
+        while self._buckets:
+            oldest = next(iter(self._buckets.values()))
+            if len(self._buckets) <= self.max_clients and oldest[2] > now:
+                break
+            self._buckets.popitem(last=False)
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+class SQLiteBucketStore:
+    """Buckets in a shared SQLite file so every uvicorn worker enforces the same limit"""
+
+    def __init__(self, path: str, cleanup_every: int = 1000):
+        self.path = path
+        self.cleanup_every = cleanup_every
+        self._calls = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limit_buckets ("
+            "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL, full_at REAL NOT NULL)"
+        )
+
+    def take(self, key: str, rate: float, capacity: float, now: float) -> Tuple[bool, float]:
+        with self._lock:
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT tokens, updated_at FROM rate_limit_buckets WHERE key = ?", (key,)).fetchone()
+                tokens = capacity if row is None else min(capacity, row[0] + max(0.0, now - row[1]) * rate)
+                allowed = tokens >= 1
+                if allowed:
+                    tokens -= 1
+                conn.execute(
+                    "INSERT INTO rate_limit_buckets (key, tokens, updated_at, full_at) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, "
+                    "updated_at = excluded.updated_at, full_at = excluded.full_at",
+                    (key, tokens, now, now + (capacity - tokens) / rate)
+                )
+                self._calls += 1
+                if self._calls % self.cleanup_every == 0:
+                    conn.execute("DELETE FROM rate_limit_buckets WHERE full_at <= ?", (now,))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            return allowed, 0.0 if allowed else (1 - tokens) / rate
+
 
-# Simple in-memory rate limiter
 class RateLimiter:
-    def __init__(self, requests_per_minute: int = 60):
+    def __init__(self, requests_per_minute: int = 60, burst: Optional[int] = None,
+                 route_limits: Optional[Dict[str, int]] = None, store=None, clock=time.time):
         self.requests_per_minute = requests_per_minute
-        self.requests = defaultdict(list)
-    
-    def is_allowed(self, client_ip: str) -> bool:
-        now = datetime.now()
-        minute_ago = now - timedelta(minutes=1)
-        
-        # Clean old requests
-        self.requests[client_ip] = [
-            req_time for req_time in self.requests[client_ip]
-            if req_time > minute_ago
-        ]
-        
-        # Check limit
-        if len(self.requests[client_ip]) >= self.requests_per_minute:
-            return False
-        
-        self.requests[client_ip].append(now)
-        return True
+        self.burst = burst
+        # Longest prefix first so /api/v2/import/ wins over /api/
+        self.route_limits = sorted((route_limits or {}).items(), key=lambda item: len(item[0]), reverse=True)
+        self.store = store if store is not None else MemoryBucketStore()
+        self.clock = clock
+
+    def limit_for(self, path: str) -> Tuple[str, int]:
+        for prefix, per_minute in self.route_limits:
+            if path.startswith(prefix):
+                return prefix, per_minute
+        return "*", self.requests_per_minute
+
+    def check(self, client_ip: str, path: str = "") -> Tuple[bool, float]:
+        """(allowed, retry_after seconds)"""
+        scope, per_minute = self.limit_for(path)
+        capacity = self.burst if scope == "*" and self.burst else per_minute
+        return self.store.take(f"{client_ip}|{scope}", per_minute / 60.0, capacity, self.clock())
+
+    def is_allowed(self, client_ip: str, path: str = "") -> bool:
+        return self.check(client_ip, path)[0]
+
 
-rate_limiter = RateLimiter(requests_per_minute=100)
+def create_rate_limiter() -> RateLimiter:
+    store = (SQLiteBucketStore(settings.RATE_LIMIT_SQLITE_PATH) if settings.RATE_LIMIT_BACKEND == "sqlite"
+             else MemoryBucketStore(settings.RATE_LIMIT_MAX_CLIENTS))
+    return RateLimiter(
+        requests_per_minute=settings.RATE_LIMIT_PER_MINUTE,
+        burst=settings.RATE_LIMIT_BURST,
+        route_limits=settings.RATE_LIMIT_ROUTES,
+        store=store
+    )
+
+rate_limiter = create_rate_limiter()
 
 async def rate_limit_middleware(request: Request, call_next):
-    client_ip = request.client.host
+    client_ip = request.client.host if request.client else "unknown"
     
-    if not rate_limiter.is_allowed(client_ip):
+    allowed, retry_after = rate_limiter.check(client_ip, request.url.path)
+    if not allowed:
         return JSONResponse(
             status_code=429,
-            content={"detail": "Çok fazla istek. Lütfen bir dakika bekleyin."}
+            content={"detail": "Çok fazla istek. Lütfen biraz bekleyin."},
+            headers={"Retry-After": str(math.ceil(retry_after))}
         )
     
     response = await call_next(request)
@@ -54,6 +162,108 @@ async def logging_middleware(request: Request, call_next):
     
     return response
 
+# Prometheus metrics: per-route count/latency, in-flight, DB queries per request
+async def metrics_middleware(request: Request, call_next):
+    if request.url.path == "/metrics":
+        return await call_next(request)
+
+    metrics.http_requests_in_flight.inc()
+    stats, token = metrics.start_request_tracking()
+    start_time = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        elapsed = time.perf_counter() - start_time
+        metrics.http_requests_in_flight.dec()
+        metrics.finish_request_tracking(stats, token)
+        # Route template (/api/beton/{beton_id}), not the raw path, to keep label cardinality bounded
+        route = request.scope.get("route")
+        route_path = route.path if route is not None else "unmatched"
+        metrics.http_requests_total.inc(method=request.method, route=route_path, status=str(status))
+        metrics.http_request_duration_seconds.observe(elapsed, method=request.method, route=route_path)
+
+# Per-request query profile (QUERY_PROFILING=true)
+async def query_profiling_middleware(request: Request, call_next):
+    if not profiler.installed or request.url.path.startswith("/api/admin/"):
+        return await call_next(request)
+
+    token = profiler.begin_request(request.method, request.url.path)
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        profile = profiler.end_request(token, status)
+    response.headers["X-Query-Count"] = str(profile["query_count"])
+    response.headers["X-Query-Time-Ms"] = str(profile["query_ms"])
+    return response
+
+# Conditional GET + response cache for analytics endpoints
+async def analytics_cache_middleware(request: Request, call_next):
+    path = request.url.path
+    if request.method != "GET" or not path.startswith(tuple(settings.CACHED_PATH_PREFIXES)):
+        return await call_next(request)
+
+    # Version is read before the handler runs: a write that lands mid-request bumps it,
+    # so the body stored here is never served for the newer version
+    version, last_modified = data_version.snapshot()
+    key = f"{path}?{'&'.join(sorted(f'{k}={v}' for k, v in request.query_params.multi_items()))}"
+    etag = make_etag(key, version)
+    validators = {
+        "ETag": etag,
+        "Last-Modified": http_date(last_modified),
+        "Cache-Control": "no-cache",
+    }
+
+    if is_not_modified(request.headers.get("if-none-match"), request.headers.get("if-modified-since"), etag, last_modified):
+        return Response(status_code=304, headers=validators)
+
+    cached = response_cache.get(key, version)
+    if cached is not None:
+        return Response(content=cached["body"], media_type=cached["media_type"],
+                        headers={**validators, "X-Cache": "HIT"})
+
+    response = await call_next(request)
+    if response.status_code != 200:
+        return response
+
+    body = b"".join([chunk async for chunk in response.body_iterator])
+    media_type = response.headers.get("content-type", "application/json")
+    response_cache.set(key, version, {"body": body, "media_type": media_type})
+    headers = {k: v for k, v in response.headers.items() if k != "content-length"}
+    return Response(content=body, media_type=media_type, headers={**headers, **validators, "X-Cache": "MISS"})
+
+# Brotli compression (GZipMiddleware handles gzip and skips already-encoded responses)
+def _accepts_encoding(accept_encoding: str, coding: str) -> bool:
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        if name.strip().lower() != coding:
+            continue
+        try:
+            return float(params.strip()[2:]) > 0 if params.strip().startswith("q=") else True
+        except ValueError:
+            return False
+    return False
+
+async def brotli_middleware(request: Request, call_next):
+    if brotli is None or not _accepts_encoding(request.headers.get("accept-encoding", ""), "br"):
+        return await call_next(request)
+
+    response = await call_next(request)
+    if "content-encoding" in response.headers or not response.headers.get("content-type", "").startswith("application/json"):
+        return response
+
+    body = b"".join([chunk async for chunk in response.body_iterator])
+    headers = {k: v for k, v in response.headers.items() if k != "content-length"}
+    if len(body) >= settings.COMPRESSION_MIN_SIZE:
+        body = brotli.compress(body, quality=4)
+        headers["Content-Encoding"] = "br"
+        headers["Vary"] = "Accept-Encoding"
+    return Response(content=body, status_code=response.status_code, headers=headers)
+
 # Error handling
 async def custom_exception_handler(request: Request, exc: Exception):
     return JSONResponse(
@@ -0,0 +1,97 @@
+"""
+Paged Data Table
+Shows one window of a large table at a time. Filtering and sorting are delegated
+to the data source; CSV exports are generated only when the download is clicked.
+"""
+
+import streamlit as st
+import pandas as pd
+from typing import Callable, Dict, Optional, Tuple
+
+PAGE_SIZES = [50, 100, 250, 500]
+
+
+def _filters_ui(key: str, sort_columns: Dict[str, str]) -> Tuple[Dict, str, bool, int]:
+    """Filter / sort controls; returns (filters, sort column, descending, page size)"""
+    with st.expander("🔍 Filtre ve Sıralama", expanded=False):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            date_range = st.date_input("Tarih Aralığı", value=(), key=f"{key}_dates")
+        with col2:
+            supplier = st.text_input("Tedarikçi (içerir)", key=f"{key}_supplier")
+        with col3:
+            waybill = st.text_input("İrsaliye No (içerir)", key=f"{key}_waybill")
+
+        col4, col5, col6 = st.columns(3)
+        with col4:
+            sort_label = st.selectbox("Sırala", list(sort_columns), key=f"{key}_sort")
+        with col5:
+            descending = st.toggle("Azalan", value=True, key=f"{key}_desc")
+        with col6:
+            page_size = st.selectbox("Sayfa Boyutu", PAGE_SIZES, index=1, key=f"{key}_size")
+
+    filters = {
+        'start_date': date_range[0].isoformat() if len(date_range) > 0 else None,
+        'end_date': date_range[1].isoformat() if len(date_range) > 1 else None,
+        'supplier': supplier.strip() or None,
+        'waybill': waybill.strip() or None,
+    }
+    return filters, sort_columns[sort_label], descending, page_size
+
+
+@st.fragment
+def paged_table(key: str,
+                fetch_page: Callable[..., Tuple[pd.DataFrame, int]],
+                sort_columns: Dict[str, str],
+                export: Optional[Callable[..., bytes]] = None,
+                file_name: str = "kayitlar.csv",
+                empty_message: str = "Kayıt bulunamadı"):
+    """
+    Server-paged table. Runs as a fragment, so paging/filtering only reruns the table.
+
+    fetch_page(offset, limit, sort_by, descending, **filters) -> (page DataFrame, total count)
+    export(sort_by, descending, **filters) -> CSV bytes (called only on download)
+    """
+    filters, sort_by, descending, page_size = _filters_ui(key, sort_columns)
+
+    # Go back to the first page whenever the query changes
+    page_key = f"{key}_page"
+    signature = (tuple(filters.items()), sort_by, descending, page_size)
+    if st.session_state.get(f"{key}_signature") != signature:
+        st.session_state[f"{key}_signature"] = signature
+        st.session_state[page_key] = 1
+    page = st.session_state.get(page_key, 1)
+
+    df, total = fetch_page(offset=(page - 1) * page_size, limit=page_size,
+                           sort_by=sort_by, descending=descending, **filters)
+
+    page_count = max(1, (total - 1) // page_size + 1)
+    if page > page_count:
+        # Data shrank since the page was chosen
+        page = st.session_state[page_key] = page_count
+        df, total = fetch_page(offset=(page - 1) * page_size, limit=page_size,
+                               sort_by=sort_by, descending=descending, **filters)
+
+    if df.empty:
+        st.info(empty_message)
+        return
+
+    st.dataframe(df, use_container_width=True, hide_index=True, height=min(600, 35 * (len(df) + 1) + 3))
+
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        st.number_input("Sayfa", min_value=1, max_value=page_count, step=1, key=page_key)
+    with col2:
+        start = (page - 1) * page_size
+        st.caption(f"{start + 1:,} – {start + len(df):,} / {total:,} kayıt · Sayfa {page}/{page_count}")
+    with col3:
+        if export is not None:
+            st.download_button(
+                label="📥 CSV İndir",
+                data=lambda: export(sort_by=sort_by, descending=descending, **filters),
+                file_name=file_name,
+                mime="text/csv",
+                on_click="ignore",
+                help="Filtrelenmiş tüm kayıtlar, tıklandığında hazırlanır",
+                key=f"{key}_download"
+            )
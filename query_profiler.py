@@ -0,0 +1,156 @@
+"""
+SQL Query Profiler
+Opt-in (QUERY_PROFILING=true): records every statement of a request with its duration
+and row count through SQLAlchemy cursor events. Statements slower than SLOW_QUERY_MS go
+to the slow-query log with their EXPLAIN plan and are aggregated for /api/admin/slow-queries.
+"""
+
+import contextvars
+import logging
+import re
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from config import settings
+
+logger = logging.getLogger("slow_query")
+
+MAX_QUERIES_PER_REQUEST = 500
+EXPLAIN_PREFIX = {"sqlite": "EXPLAIN QUERY PLAN ", "postgresql": "EXPLAIN "}
+
+_IN_LIST = re.compile(r"\((?:\s*(?:\?|%\(\w+\)s|\$\d+|:\w+)\s*,)+\s*(?:\?|%\(\w+\)s|\$\d+|:\w+)\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_statement(statement: str) -> str:
+    """Collapse whitespace and expanded IN (...) lists so the same query aggregates together"""
+    return _IN_LIST.sub("(?, ...)", _WHITESPACE.sub(" ", statement).strip())
+
+
+class QueryProfiler:
+    def __init__(self, slow_ms: float = 100.0, max_statements: int = 200, recent_requests: int = 100):
+        self.slow_ms = slow_ms
+        self.max_statements = max_statements
+        self.installed = False
+        self._lock = threading.Lock()
+        self._slow: Dict[str, Dict] = {}
+        self._recent = deque(maxlen=recent_requests)
+        self._current: contextvars.ContextVar = contextvars.ContextVar("query_profile", default=None)
+
+    # ---------- install ----------
+
+    def install(self):
+        if not self.installed:
+            event.listen(Engine, "before_cursor_execute", self._before_cursor_execute)
+            event.listen(Engine, "after_cursor_execute", self._after_cursor_execute)
+            self.installed = True
+
+    def uninstall(self):
+        if self.installed:
+            event.remove(Engine, "before_cursor_execute", self._before_cursor_execute)
+            event.remove(Engine, "after_cursor_execute", self._after_cursor_execute)
+            self.installed = False
+
+    # ---------- cursor events ----------
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("profiler_query_start", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("profiler_query_start")
+        if not starts:
+            return
+        duration_ms = (time.perf_counter() - starts.pop()) * 1000
+        # rowcount: DML and psycopg2 SELECTs; sqlite3 reports -1 for SELECT (not known until fetched)
+        rows = cursor.rowcount if cursor.rowcount is not None and cursor.rowcount >= 0 else None
+
+        profile = self._current.get()
+        if profile is not None and len(profile["queries"]) < MAX_QUERIES_PER_REQUEST:
+            profile["queries"].append({"statement": statement, "duration_ms": round(duration_ms, 3), "rows": rows})
+
+        if duration_ms >= self.slow_ms:
+            self._record_slow(conn, statement, parameters, executemany, duration_ms, rows,
+                              profile["path"] if profile else None)
+
+    def _record_slow(self, conn, statement, parameters, executemany, duration_ms, rows, path):
+        key = normalize_statement(statement)
+        with self._lock:
+            entry = self._slow.get(key)
+            if entry is None:
+                if len(self._slow) >= self.max_statements:
+                    # Drop the least expensive entry so the top offenders survive
+                    del self._slow[min(self._slow, key=lambda k: self._slow[k]["total_ms"])]
+                entry = self._slow[key] = {
+                    "statement": key, "count": 0, "total_ms": 0.0, "max_ms": 0.0,
+                    "last_rows": None, "last_path": None, "explain": None
+                }
+            entry["count"] += 1
+            entry["total_ms"] += duration_ms
+            entry["max_ms"] = max(entry["max_ms"], duration_ms)
+            entry["last_rows"] = rows
+            entry["last_path"] = path
+            needs_plan = entry["explain"] is None
+
+        if needs_plan and not executemany:
+            plan = self._explain(conn, statement, parameters)
+            with self._lock:
+                entry["explain"] = plan
+
+        logger.warning("Yavaş sorgu %.1f ms (%s): %s", duration_ms, path or "-", key)
+
+    def _explain(self, conn, statement: str, parameters) -> Optional[List[str]]:
+        """Plan of a slow SELECT, run on a raw DBAPI cursor so it bypasses these events"""
+        prefix = EXPLAIN_PREFIX.get(conn.dialect.name)
+        if not prefix or not statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            return None
+        try:
+            cursor = conn.connection.dbapi_connection.cursor()
+            try:
+                cursor.execute(prefix + statement, parameters)
+                return [" | ".join(str(col) for col in row) for row in cursor.fetchall()]
+            finally:
+                cursor.close()
+        except Exception as e:
+            return [f"EXPLAIN hatası: {e}"]
+
+    # ---------- per request ----------
+
+    def begin_request(self, method: str, path: str) -> contextvars.Token:
+        return self._current.set({"method": method, "path": path, "queries": []})
+
+    def end_request(self, token: contextvars.Token, status: int) -> Dict:
+        profile = self._current.get()
+        self._current.reset(token)
+        profile["status"] = status
+        profile["query_count"] = len(profile["queries"])
+        profile["query_ms"] = round(sum(q["duration_ms"] for q in profile["queries"]), 3)
+        with self._lock:
+            self._recent.append(profile)
+        return profile
+
+    # ---------- reports ----------
+
+    def top_slow_queries(self, limit: int = 20, sort_by: str = "total_ms") -> List[Dict]:
+        with self._lock:
+            entries = [dict(e, avg_ms=round(e["total_ms"] / e["count"], 3)) for e in self._slow.values()]
+        return sorted(entries, key=lambda e: e[sort_by], reverse=True)[:limit]
+
+    def recent_requests(self, limit: int = 20) -> List[Dict]:
+        with self._lock:
+            return list(self._recent)[-limit:][::-1]
+
+    def reset(self):
+        with self._lock:
+            self._slow.clear()
+            self._recent.clear()
+
+
+profiler = QueryProfiler(slow_ms=settings.SLOW_QUERY_MS)
+
+if settings.QUERY_PROFILING:
+    profiler.install()
@@ -0,0 +1,66 @@
+-- ============================================
+-- REBAR DIAMETERS: Çap bazında uzun format (teslimat, çap, kg)
+-- ============================================
+-- rebar_logs'taki q8_kg..q32_kg kolonlarının sıfır olmayanları, her teslimat ve çap için
+-- bir satır olarak rebar_diameters tablosunda tutulur. Trigger her INSERT/UPDATE'te
+-- (shadow swap ve resumable import dahil) satırları yeniler; silmeler CASCADE ile gider.
+-- Çap/dönem sorguları 11 kolonu toplamak yerine sadece dolu çapları okur. Geniş kolonu
+-- olmayan bir çap (ör. Q24) doğrudan bu tabloya eklenir, şema değişikliği gerekmez.
+--
+-- Kullanım (Supabase SQL Editor'da bir kez çalıştırın, tekrar çalıştırılabilir):
+--   SELECT diameter, sum(kg) FROM rebar_diameters
+--   WHERE date BETWEEN '2025-01-01' AND '2025-06-30' GROUP BY diameter;
+
+CREATE TABLE IF NOT EXISTS rebar_diameters (
+    rebar_id UUID NOT NULL REFERENCES rebar_logs(id) ON DELETE CASCADE,
+    date DATE NOT NULL,          -- rebar_logs.date kopyası; dönem sorguları bu tabloda kalır
+    diameter SMALLINT NOT NULL,  -- mm
+    kg FLOAT NOT NULL CHECK (kg >= 0),
+    PRIMARY KEY (rebar_id, diameter)
+);
+
+CREATE INDEX IF NOT EXISTS idx_rebar_diameters_diameter_date ON rebar_diameters(diameter, date) INCLUDE (kg);
+CREATE INDEX IF NOT EXISTS idx_rebar_diameters_date ON rebar_diameters(date);
+
+CREATE OR REPLACE FUNCTION rebar_diameters_sync()
+RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' THEN
+        -- Sadece geniş kolonu olan çaplar yeniden yazılır; diğerleri (Q24) korunur
+        DELETE FROM rebar_diameters
+        WHERE rebar_id = OLD.id AND diameter IN (8, 10, 12, 14, 16, 18, 20, 22, 25, 28, 32);
+        UPDATE rebar_diameters SET date = NEW.date WHERE rebar_id = NEW.id;
+    END IF;
+
+    INSERT INTO rebar_diameters (rebar_id, date, diameter, kg)
+    SELECT NEW.id, NEW.date, c.diameter, c.kg
+    FROM (VALUES (8, NEW.q8_kg), (10, NEW.q10_kg), (12, NEW.q12_kg), (14, NEW.q14_kg),
+                 (16, NEW.q16_kg), (18, NEW.q18_kg), (20, NEW.q20_kg), (22, NEW.q22_kg),
+                 (25, NEW.q25_kg), (28, NEW.q28_kg), (32, NEW.q32_kg)) AS c(diameter, kg)
+    WHERE c.kg IS NOT NULL AND c.kg <> 0;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_rebar_diameters ON rebar_logs;
+CREATE TRIGGER trg_rebar_diameters
+    AFTER INSERT OR UPDATE OF date, q8_kg, q10_kg, q12_kg, q14_kg, q16_kg, q18_kg, q20_kg,
+                              q22_kg, q25_kg, q28_kg, q32_kg
+    ON rebar_logs
+    FOR EACH ROW EXECUTE FUNCTION rebar_diameters_sync();
+
+-- Mevcut kayıtlar (tekrar çalıştırıldığında var olanlar atlanır)
+INSERT INTO rebar_diameters (rebar_id, date, diameter, kg)
+SELECT r.id, r.date, c.diameter, c.kg
+FROM rebar_logs r
+CROSS JOIN LATERAL (VALUES (8, r.q8_kg), (10, r.q10_kg), (12, r.q12_kg), (14, r.q14_kg),
+                           (16, r.q16_kg), (18, r.q18_kg), (20, r.q20_kg), (22, r.q22_kg),
+                           (25, r.q25_kg), (28, r.q28_kg), (32, r.q32_kg)) AS c(diameter, kg)
+WHERE c.kg IS NOT NULL AND c.kg <> 0
+ON CONFLICT (rebar_id, diameter) DO NOTHING;
+
+-- Çap + gün toplamları (v_rebar_by_diameter teslimat bazında geniş listeyi vermeye devam eder)
+CREATE OR REPLACE VIEW v_rebar_diameter_totals AS
+SELECT date, diameter, 'Q' || diameter AS label, SUM(kg) AS total_kg, COUNT(*) AS delivery_count
+FROM rebar_diameters
+GROUP BY date, diameter;
@@ -0,0 +1,205 @@
+"""
+Source vs Database Reconciliation
+Compares a workbook (through ExcelValidator) with a Supabase table without downloading
+the table: both sides are reduced to per-day + supplier row counts, quantity sums and
+content hashes (reconcile_groups RPC, reconcile_functions.sql). Only days whose groups
+differ are fetched row by row (reconcile_rows RPC) to produce an exact missing/extra diff.
+Replaces check_real_count.py, check_import_status.py, get_total_m3.py and check_concrete_data.py.
+
+Kullanım:
+    python reconcile.py BETON-997.xlsx --table concrete_logs --sheet Sayfa1
+    python reconcile.py demir.xlsx --table rebar_logs --start 2025-01-01 --end 2025-06-30
+"""
+
+import argparse
+import hashlib
+from collections import Counter, defaultdict
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Dict, List, Optional, Tuple
+
+from dedupe import get_supabase_client
+from shadow_reimport import SUPABASE_TABLES, read_supabase_records
+
+SAMPLE_SIZE = 50
+
+
+# ============================================
+# FINGERPRINTS (same normalization as reconcile_row_sql)
+# ============================================
+
+def _norm(value) -> str:
+    return str(value if value is not None else "").strip(" ").upper()
+
+
+def _quantity(value) -> Decimal:
+    # Decimal(str(float)) + HALF_UP matches PostgreSQL round(float::numeric, 2)
+    return Decimal(str(value or 0)).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+
+
+def row_fingerprint(day: str, waybill_no, supplier, quantity) -> str:
+    text = f"{day}|{_norm(waybill_no)}|{_norm(supplier)}|{_quantity(quantity)}"
+    return hashlib.md5(text.encode("utf-8")).hexdigest()
+
+
+def group_hash(row_hashes: List[str]) -> str:
+    return hashlib.md5(",".join(sorted(row_hashes)).encode("utf-8")).hexdigest()
+
+
+# ============================================
+# BOTH SIDES
+# ============================================
+
+def source_rows(records: List[Dict], quantity_key: str, start: Optional[str] = None,
+                end: Optional[str] = None) -> List[Dict]:
+    rows = []
+    for record in records:
+        day = str(record["date"])[:10]
+        if (start and day < start) or (end and day > end):
+            continue
+        rows.append({
+            "row_num": record.get("row_num"),
+            "day": day,
+            "supplier": _norm(record.get("supplier")),
+            "waybill_no": _norm(record.get("waybill_no")),
+            "quantity": float(_quantity(record.get(quantity_key))),
+            "row_hash": row_fingerprint(day, record.get("waybill_no"), record.get("supplier"), record.get(quantity_key)),
+        })
+    return rows
+
+
+def source_groups(rows: List[Dict]) -> Dict[Tuple[str, str], Dict]:
+    grouped = defaultdict(list)
+    for row in rows:
+        grouped[(row["day"], row["supplier"])].append(row)
+    return {
+        key: {
+            "row_count": len(items),
+            "total": float(sum(_quantity(r["quantity"]) for r in items)),
+            "content_hash": group_hash([r["row_hash"] for r in items]),
+        }
+        for key, items in grouped.items()
+    }
+
+
+def database_groups(client, table: str, start: Optional[str] = None,
+                    end: Optional[str] = None) -> Dict[Tuple[str, str], Dict]:
+    rows = client.rpc("reconcile_groups", {"p_table": table, "p_start": start, "p_end": end}).execute().data
+    return {
+        (str(row["day"])[:10], row["supplier"]): {
+            "row_count": row["row_count"], "total": float(row["total"]), "content_hash": row["content_hash"],
+        }
+        for row in rows or []
+    }
+
+
+# ============================================
+# COMPARE + DRILL DOWN
+# ============================================
+
+def compare_groups(source: Dict, database: Dict) -> List[Dict]:
+    mismatches = []
+    for day, supplier in sorted(set(source) | set(database)):
+        ours, theirs = source.get((day, supplier)), database.get((day, supplier))
+        if ours and theirs and ours["content_hash"] == theirs["content_hash"]:
+            continue
+        mismatches.append({
+            "day": day,
+            "supplier": supplier,
+            "source_count": ours["row_count"] if ours else 0,
+            "db_count": theirs["row_count"] if theirs else 0,
+            "source_total": ours["total"] if ours else 0.0,
+            "db_total": theirs["total"] if theirs else 0.0,
+        })
+    return mismatches
+
+
+def row_diff(source: List[Dict], database: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+    """Multiset difference on row fingerprints: (missing from DB, extra in DB)"""
+    db_counts = Counter(r["row_hash"] for r in database)
+    source_counts = Counter(r["row_hash"] for r in source)
+
+    missing = []
+    for row in source:
+        if db_counts[row["row_hash"]] > 0:
+            db_counts[row["row_hash"]] -= 1
+        else:
+            missing.append(row)
+    extra = []
+    for row in database:
+        if source_counts[row["row_hash"]] > 0:
+            source_counts[row["row_hash"]] -= 1
+        else:
+            extra.append(row)
+    return missing, extra
+
+
+def reconcile(client, table: str, records: List[Dict], start: Optional[str] = None,
+              end: Optional[str] = None) -> Dict:
+    quantity_key, _ = SUPABASE_TABLES[table]
+    rows = source_rows(records, quantity_key, start, end)
+    source = source_groups(rows)
+    database = database_groups(client, table, start, end)
+    mismatches = compare_groups(source, database)
+
+    days = sorted({m["day"] for m in mismatches})
+    missing, extra = [], []
+    if days:
+        db_rows = client.rpc("reconcile_rows", {"p_table": table, "p_days": days}).execute().data or []
+        day_set = set(days)
+        missing, extra = row_diff([r for r in rows if r["day"] in day_set],
+                                  [dict(r, day=str(r["day"])[:10]) for r in db_rows])
+
+    return {
+        "table": table,
+        "groups": len(set(source) | set(database)),
+        "mismatched_groups": mismatches,
+        "source": {"count": len(rows), "total": round(sum(g["total"] for g in source.values()), 2)},
+        "database": {"count": sum(g["row_count"] for g in database.values()),
+                     "total": round(sum(g["total"] for g in database.values()), 2)},
+        "missing": missing,
+        "extra": extra,
+    }
+
+
+# ============================================
+# CLI
+# ============================================
+
+def print_report(report: Dict):
+    src, db = report["source"], report["database"]
+    print(f"📋 {report['table']}: Excel {src['count']} kayıt / {src['total']:,.2f}, "
+          f"veritabanı {db['count']} kayıt / {db['total']:,.2f}")
+    if not report["mismatched_groups"]:
+        print(f"✅ {report['groups']} gün/tedarikçi grubunun hepsi eşleşiyor")
+        return
+
+    print(f"⚠️  {len(report['mismatched_groups'])}/{report['groups']} grup farklı:")
+    for m in report["mismatched_groups"][:SAMPLE_SIZE]:
+        print(f"   {m['day']} {m['supplier']}: Excel {m['source_count']} / {m['source_total']:.2f}, "
+              f"DB {m['db_count']} / {m['db_total']:.2f}")
+    print(f"❌ Veritabanında eksik: {len(report['missing'])}")
+    for row in report["missing"][:SAMPLE_SIZE]:
+        print(f"   satır {row['row_num']}: {row['day']} {row['supplier']} {row['waybill_no']} {row['quantity']}")
+    print(f"➕ Veritabanında fazla: {len(report['extra'])}")
+    for row in report["extra"][:SAMPLE_SIZE]:
+        print(f"   id {row['id']}: {row['day']} {row['supplier']} {row['waybill_no']} {row['quantity']}")
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Excel ile veritabanı mutabakatı (gün/tedarikçi checksum)")
+    parser.add_argument("excel", help="Kaynak Excel dosyası")
+    parser.add_argument("--table", required=True, choices=list(SUPABASE_TABLES))
+    parser.add_argument("--sheet", default=0, help="Sayfa adı (varsayılan: ilk sayfa)")
+    parser.add_argument("--start", help="Başlangıç tarihi (YYYY-MM-DD)")
+    parser.add_argument("--end", help="Bitiş tarihi (YYYY-MM-DD)")
+    args = parser.parse_args(argv)
+
+    client = get_supabase_client()
+    if not client:
+        return
+    records = read_supabase_records(args.excel, args.table, args.sheet)
+    print_report(reconcile(client, args.table, records, args.start, args.end))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+-- ============================================
+-- RECONCILE: Excel ↔ veritabanı mutabakatı (RPC)
+-- ============================================
+-- reconcile_groups: gün + tedarikçi başına kayıt sayısı, miktar toplamı ve içerik hash'i
+-- (tablo indirilmez, sadece gruplar döner). reconcile_rows: sadece uyuşmayan günlerin
+-- satır parmak izleri. Satır parmak izi reconcile.py'deki row_fingerprint ile aynıdır:
+--   md5(tarih | BÜYÜK(irsaliye) | BÜYÜK(tedarikçi) | miktar 2 hane)
+-- Grup hash'i, gruptaki satır parmak izlerinin sıralı birleşiminin md5'idir.
+--
+-- Kullanım:
+--   python reconcile.py BETON-997.xlsx --table concrete_logs --sheet Sayfa1
+
+CREATE OR REPLACE FUNCTION reconcile_row_sql(p_table TEXT)
+RETURNS TEXT AS $$
+DECLARE
+    v_quantity TEXT;
+BEGIN
+    v_quantity := CASE p_table
+        WHEN 'concrete_logs' THEN 'quantity_m3'
+        WHEN 'rebar_logs' THEN 'total_weight_kg'
+        WHEN 'mesh_logs' THEN 'weight_kg'
+    END;
+    IF v_quantity IS NULL THEN
+        RAISE EXCEPTION 'Geçersiz tablo: %', p_table;
+    END IF;
+
+    RETURN format(
+        'SELECT id, date AS day,
+                upper(trim(coalesce(supplier, ''''))) AS supplier,
+                upper(trim(coalesce(waybill_no, ''''))) AS waybill_no,
+                round(%1$I::numeric, 2) AS quantity,
+                md5(date::text || ''|'' || upper(trim(coalesce(waybill_no, ''''))) || ''|''
+                    || upper(trim(coalesce(supplier, ''''))) || ''|''
+                    || to_char(round(%1$I::numeric, 2), ''FM999999999990.00'')) AS row_hash
+         FROM %2$I', v_quantity, p_table);
+END;
+$$ LANGUAGE plpgsql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION reconcile_groups(p_table TEXT, p_start DATE DEFAULT NULL, p_end DATE DEFAULT NULL)
+RETURNS TABLE(day DATE, supplier TEXT, row_count BIGINT, total NUMERIC, content_hash TEXT) AS $$
+BEGIN
+    RETURN QUERY EXECUTE format(
+        'SELECT r.day, r.supplier, count(*), sum(r.quantity),
+                md5(string_agg(r.row_hash, '','' ORDER BY r.row_hash COLLATE "C"))
+         FROM (%s) r
+         WHERE ($1 IS NULL OR r.day >= $1) AND ($2 IS NULL OR r.day <= $2)
+         GROUP BY r.day, r.supplier', reconcile_row_sql(p_table))
+        USING p_start, p_end;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION reconcile_rows(p_table TEXT, p_days DATE[])
+RETURNS TABLE(id UUID, day DATE, supplier TEXT, waybill_no TEXT, quantity NUMERIC, row_hash TEXT) AS $$
+BEGIN
+    RETURN QUERY EXECUTE format('SELECT * FROM (%s) r WHERE r.day = ANY($1)', reconcile_row_sql(p_table))
+        USING p_days;
+END;
+$$ LANGUAGE plpgsql;
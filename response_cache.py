@@ -0,0 +1,143 @@
+"""
+Response Cache for read-heavy endpoints
+A process-wide data version is bumped on every committed write (SQLAlchemy session
+events). Cached responses are keyed by path + query + version, so they never go stale
+and polling clients can revalidate with ETag / Last-Modified and get a 304.
+
+The counter restarts at 0 with every process, so ETags also carry a random boot id:
+another uvicorn worker or a restarted server never answers 304 to an ETag it didn't issue.
+"""
+
+import hashlib
+import secrets
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from config import settings
+
+
+# ============================================
+# DATA VERSION
+# ============================================
+
+class DataVersion:
+    """Monotonic counter + timestamp of the last committed write"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.version = 0
+        self.last_modified = datetime.now(timezone.utc).replace(microsecond=0)
+
+    def bump(self) -> int:
+        with self._lock:
+            self.version += 1
+            # HTTP dates have 1 s resolution; keep Last-Modified strictly increasing so
+            # If-Modified-Since never matches across a write within the same second
+            now = datetime.now(timezone.utc).replace(microsecond=0)
+            self.last_modified = max(now, self.last_modified + timedelta(seconds=1))
+            return self.version
+
+    def snapshot(self) -> Tuple[int, datetime]:
+        with self._lock:
+            return self.version, self.last_modified
+
+
+data_version = DataVersion()
+BOOT_ID = secrets.token_hex(4)  # per process; distinguishes version N of different workers / boots
+
+
+def bump_data_version() -> int:
+    """For write paths outside the ORM session (raw SQL, schema resets)"""
+    return data_version.bump()
+
+
+# Every Session (sync, and the sync_session behind AsyncSession) marks itself dirty on
+# flushes and Core/bulk DML; a successful commit of a dirty session bumps the version.
+@event.listens_for(Session, "after_flush")
+def _mark_flush(session, flush_context):
+    session.info["data_written"] = True
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_dml(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["data_written"] = True
+
+@event.listens_for(Session, "after_commit")
+def _bump_on_commit(session):
+    if session.info.pop("data_written", False):
+        data_version.bump()
+
+@event.listens_for(Session, "after_rollback")
+def _clear_on_rollback(session):
+    session.info.pop("data_written", None)
+
+
+# ============================================
+# RESPONSE CACHE
+# ============================================
+
+class ResponseCache:
+    """Small LRU of rendered response bodies keyed by request key + data version"""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, int], Dict]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str, version: int) -> Optional[Dict]:
+        with self._lock:
+            entry = self._entries.get((key, version))
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end((key, version))
+            self.hits += 1
+            return entry
+
+    def set(self, key: str, version: int, entry: Dict) -> None:
+        with self._lock:
+            self._entries[(key, version)] = entry
+            self._entries.move_to_end((key, version))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+response_cache = ResponseCache(settings.RESPONSE_CACHE_MAX_ENTRIES)
+
+
+# ============================================
+# HTTP HELPERS
+# ============================================
+
+def make_etag(key: str, version: int) -> str:
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).hexdigest()
+    return f'W/"{BOOT_ID}-{version}-{digest}"'
+
+
+def http_date(dt: datetime) -> str:
+    return format_datetime(dt, usegmt=True)
+
+
+def is_not_modified(if_none_match: Optional[str], if_modified_since: Optional[str],
+                    etag: str, last_modified: datetime) -> bool:
+    """RFC 7232: If-None-Match wins over If-Modified-Since"""
+    if if_none_match:
+        return etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*"
+    if if_modified_since:
+        try:
+            return last_modified <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
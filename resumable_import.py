@@ -0,0 +1,201 @@
+"""
+Resumable Imports
+Long Supabase imports write a checkpoint after every committed batch (source file hash,
+sheet, last row, inserted count) to a local SQLite file. Rerunning the same file resumes
+after the last checkpointed row. Every row also carries an idempotency key (file hash +
+sheet + row number) backed by a unique index (import_checkpoints.sql), so a batch that
+committed right before a crash is ignored on retry instead of inserted twice.
+Replaces continue_import.py / import_remaining.py.
+
+Kullanım:
+    python resumable_import.py BETON-997.xlsx --table concrete_logs --sheet Sayfa1
+    python resumable_import.py BETON-997.xlsx --table concrete_logs --sheet Sayfa1 --restart
+    python resumable_import.py --status
+"""
+
+import argparse
+import hashlib
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from dedupe import get_supabase_client
+from shadow_reimport import SUPABASE_TABLES, prepare_rows, read_supabase_records
+
+CHECKPOINT_PATH = "import_checkpoints.db"
+BATCH_SIZE = 500
+RETRIES = 3
+
+
+def file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def idempotency_key(source_hash: str, sheet, row_num: int) -> str:
+    return f"{source_hash[:16]}:{sheet}:{row_num}"
+
+
+# ============================================
+# CHECKPOINT STORE
+# ============================================
+
+class CheckpointStore:
+    """One row per (file hash, sheet, table); each save is its own committed transaction"""
+
+    def __init__(self, path: str = CHECKPOINT_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5, isolation_level=None, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS import_checkpoints ("
+            "file_hash TEXT NOT NULL, sheet TEXT NOT NULL, table_name TEXT NOT NULL, "
+            "last_row INTEGER NOT NULL, inserted INTEGER NOT NULL, skipped INTEGER NOT NULL, "
+            "total INTEGER NOT NULL, status TEXT NOT NULL, updated_at TEXT NOT NULL, "
+            "PRIMARY KEY (file_hash, sheet, table_name))"
+        )
+
+    def get(self, source_hash: str, sheet, table: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM import_checkpoints WHERE file_hash = ? AND sheet = ? AND table_name = ?",
+                (source_hash, str(sheet), table)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def save(self, source_hash: str, sheet, table: str, last_row: int, inserted: int, skipped: int,
+             total: int, status: str = "running"):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO import_checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(file_hash, sheet, table_name) DO UPDATE SET last_row = excluded.last_row, "
+                "inserted = excluded.inserted, skipped = excluded.skipped, total = excluded.total, "
+                "status = excluded.status, updated_at = excluded.updated_at",
+                (source_hash, str(sheet), table, last_row, inserted, skipped, total, status,
+                 datetime.now().isoformat(timespec="seconds"))
+            )
+
+    def clear(self, source_hash: str, sheet, table: str):
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM import_checkpoints WHERE file_hash = ? AND sheet = ? AND table_name = ?",
+                (source_hash, str(sheet), table)
+            )
+
+    def all(self) -> List[Dict]:
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM import_checkpoints ORDER BY updated_at DESC").fetchall()
+        return [dict(row) for row in rows]
+
+
+# ============================================
+# IMPORT LOOP
+# ============================================
+
+def run_import(records: List[Dict], insert_batch: Callable[[List[Dict]], int], store: CheckpointStore,
+               source_hash: str, sheet, table: str, batch_size: int = BATCH_SIZE,
+               retry_delay: float = 2.0) -> Dict:
+    """Insert `records` (ExcelValidator output, with row_num) batch by batch, resuming from the checkpoint.
+
+    `insert_batch` returns how many rows were actually inserted; rows whose idempotency key
+    already exists count as skipped.
+    """
+    records = sorted(records, key=lambda r: r["row_num"])
+    checkpoint = store.get(source_hash, sheet, table)
+    if checkpoint and checkpoint["status"] == "done":
+        return dict(checkpoint, resumed_from=checkpoint["last_row"], already_done=True)
+
+    resumed_from = checkpoint["last_row"] if checkpoint else 0
+    inserted = checkpoint["inserted"] if checkpoint else 0
+    skipped = checkpoint["skipped"] if checkpoint else 0
+    pending = [r for r in records if r["row_num"] > resumed_from]
+    last_row = resumed_from
+
+    for i in range(0, len(pending), batch_size):
+        batch = pending[i:i + batch_size]
+        rows = prepare_rows(batch)
+        for row, record in zip(rows, batch):
+            row["import_key"] = idempotency_key(source_hash, sheet, record["row_num"])
+
+        for attempt in range(RETRIES):
+            try:
+                count = insert_batch(rows)
+                break
+            except Exception:
+                if attempt == RETRIES - 1:
+                    raise  # checkpoint still points at the last committed batch
+                time.sleep(retry_delay * 2 ** attempt)
+
+        inserted += count
+        skipped += len(rows) - count
+        last_row = batch[-1]["row_num"]
+        store.save(source_hash, sheet, table, last_row, inserted, skipped, len(records))
+        print(f"   ⏳ satır {last_row}: {inserted} eklendi, {skipped} zaten vardı")
+
+    store.save(source_hash, sheet, table, last_row, inserted, skipped, len(records), status="done")
+    return {
+        "file_hash": source_hash, "sheet": str(sheet), "table_name": table, "last_row": last_row,
+        "inserted": inserted, "skipped": skipped, "total": len(records), "status": "done",
+        "resumed_from": resumed_from,
+    }
+
+
+def supabase_inserter(client, table: str) -> Callable[[List[Dict]], int]:
+    """ON CONFLICT (import_key) DO NOTHING: only rows that were not committed before come back"""
+    def insert_batch(rows: List[Dict]) -> int:
+        response = client.table(table).upsert(rows, on_conflict="import_key", ignore_duplicates=True).execute()
+        return len(response.data or [])
+    return insert_batch
+
+
+# ============================================
+# CLI
+# ============================================
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Kaldığı yerden devam edebilen toplu import")
+    parser.add_argument("excel", nargs="?", help="Kaynak Excel dosyası")
+    parser.add_argument("--table", choices=list(SUPABASE_TABLES), help="Hedef tablo")
+    parser.add_argument("--sheet", default=0, help="Sayfa adı (varsayılan: ilk sayfa)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--restart", action="store_true", help="Checkpoint'i sil ve baştan başla")
+    parser.add_argument("--checkpoint-db", default=CHECKPOINT_PATH)
+    parser.add_argument("--status", action="store_true", help="Kayıtlı checkpoint'leri listele")
+    args = parser.parse_args(argv)
+
+    store = CheckpointStore(args.checkpoint_db)
+    if args.status:
+        for cp in store.all():
+            print(f"{cp['table_name']} {cp['sheet']} {cp['file_hash'][:12]}: satır {cp['last_row']}, "
+                  f"{cp['inserted']}/{cp['total']} eklendi, {cp['status']} ({cp['updated_at']})")
+        return
+    if not args.excel or not args.table:
+        parser.error("Excel dosyası ve --table gerekli")
+
+    source_hash = file_hash(args.excel)
+    if args.restart:
+        store.clear(source_hash, args.sheet, args.table)
+
+    client = get_supabase_client()
+    if not client:
+        return
+    records = read_supabase_records(args.excel, args.table, args.sheet)
+    result = run_import(records, supabase_inserter(client, args.table), store,
+                        source_hash, args.sheet, args.table, args.batch_size)
+
+    if result.get("already_done"):
+        print(f"ℹ️  Bu dosya zaten tamamen yüklenmiş ({result['inserted']} kayıt). Tekrar için --restart")
+    else:
+        print(f"✅ {args.table}: {result['inserted']} eklendi, {result['skipped']} zaten vardı "
+              f"(satır {result['resumed_from']} sonrasından devam edildi)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 # Beton Schemas
 class BetonBase(BaseModel):
@@ -75,6 +75,57 @@ class HasirResponse(HasirBase):
     class Config:
         from_attributes = True
 
+# Bulk Schemas (PATCH: sadece gönderilen alanlar güncellenir)
+class BetonBulkUpdate(BaseModel):
+    id: int
+    tarih: Optional[datetime] = None
+    firma: Optional[str] = None
+    irsaliye_no: Optional[str] = None
+    beton_sinifi: Optional[str] = None
+    teslim_sekli: Optional[str] = None
+    miktar: Optional[float] = None
+    blok: Optional[str] = None
+    aciklama: Optional[str] = None
+
+class DemirBulkUpdate(BaseModel):
+    id: int
+    tarih: Optional[datetime] = None
+    etap: Optional[str] = None
+    irsaliye_no: Optional[str] = None
+    tedarikci: Optional[str] = None
+    uretici: Optional[str] = None
+    q8: Optional[float] = None
+    q10: Optional[float] = None
+    q12: Optional[float] = None
+    q14: Optional[float] = None
+    q16: Optional[float] = None
+    q18: Optional[float] = None
+    q20: Optional[float] = None
+    q22: Optional[float] = None
+    q25: Optional[float] = None
+    q28: Optional[float] = None
+    q32: Optional[float] = None
+    toplam_agirlik: Optional[float] = None
+
+class HasirBulkUpdate(BaseModel):
+    id: int
+    tarih: Optional[datetime] = None
+    firma: Optional[str] = None
+    irsaliye_no: Optional[str] = None
+    etap: Optional[str] = None
+    hasir_tipi: Optional[str] = None
+    ebatlar: Optional[str] = None
+    adet: Optional[int] = None
+    agirlik: Optional[float] = None
+    kullanim_yeri: Optional[str] = None
+
+class BulkDeleteRequest(BaseModel):
+    """ID listesi veya filtre (tarih aralığı / firma) ile silme"""
+    ids: Optional[List[int]] = None
+    tarih_baslangic: Optional[datetime] = None
+    tarih_bitis: Optional[datetime] = None
+    firma: Optional[str] = None  # Demir için tedarikçi
+
 # Analytics Schemas
 class BetonAnalytics(BaseModel):
     toplam_miktar: float
@@ -0,0 +1,28 @@
+"""
+Search endpoint
+Full-text search over waybill numbers, supplier names, locations and notes of all
+materials (search_index.py). Terms are prefix-matched and Turkish-folded, so
+"icdas 12" finds irsaliye 12345 of İÇDAŞ.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from database import get_read_db
+from search_index import SEARCH_TABLES, fold_query, search
+
+router = APIRouter(prefix="/api", tags=["search"], default_response_class=ORJSONResponse)
+
+
+@router.get("/search")
+def search_records(q: str = Query(..., max_length=200), malzeme: Optional[str] = None,
+                   limit: int = Query(20, ge=1, le=100), db: Session = Depends(get_read_db)):
+    """İrsaliye no, firma/tedarikçi, blok/etap/kullanım yeri ve açıklamada arama (en iyi eşleşme önce)"""
+    if malzeme and malzeme not in SEARCH_TABLES:
+        raise HTTPException(status_code=400, detail=f"Geçersiz malzeme: {malzeme} (geçerli: {', '.join(SEARCH_TABLES)})")
+    if not fold_query(q):
+        raise HTTPException(status_code=400, detail="Arama metni boş")
+    results = search(db.connection(), q, malzeme, limit)
+    return {"query": q, "count": len(results), "results": results}
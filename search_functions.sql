@@ -0,0 +1,80 @@
+-- ============================================
+-- SEARCH: İrsaliye / tedarikçi / yer / not tam metin araması (RPC)
+-- ============================================
+-- Her tabloda tsvector ifadesi üzerinde GIN indeksi. Ayrı bir kolon eklenmez: shadow swap
+-- (shadow_reimport.sql) INSERT ... SELECT * ile kopyaladığından generated kolon kullanılamaz.
+-- Türkçe katlama: search_fold() İ/I/ı -> i, ç/ğ/ö/ş/ü -> c/g/o/s/u ve küçük harf.
+-- Sorgudaki her kelime önek olarak eşleşir ("icdas 123" -> İÇDAŞ, irsaliye 12345).
+-- search_index.py'deki (yerel API) katlama ve kolon seçimi ile aynıdır.
+--
+-- Kullanım:
+--   SELECT * FROM search_logs('icdas 123');
+--   SELECT * FROM search_logs('gk1', 'concrete_logs', 50);
+--   supabase.rpc('search_logs', {'p_query': 'icdas 123'}).execute()
+
+CREATE OR REPLACE FUNCTION search_fold(p_text TEXT)
+RETURNS TEXT AS $$
+    SELECT lower(translate(p_text, 'İIıÇçĞğÖöŞşÜüÂâÎîÛû', 'iiiccggoossuuaaiiuu'));
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE;
+
+-- İndeks ifadeleri search_logs içindekilerle birebir aynı olmalı (yoksa indeks kullanılmaz)
+CREATE INDEX IF NOT EXISTS idx_concrete_logs_search ON concrete_logs USING gin (
+    to_tsvector('simple', search_fold(coalesce(waybill_no, '') || ' ' || coalesce(supplier, '') || ' '
+        || coalesce(location_block, '') || ' ' || coalesce(notes, '')))
+);
+CREATE INDEX IF NOT EXISTS idx_rebar_logs_search ON rebar_logs USING gin (
+    to_tsvector('simple', search_fold(coalesce(waybill_no, '') || ' ' || coalesce(supplier, '') || ' '
+        || coalesce(manufacturer, '') || ' ' || coalesce(project_stage, '') || ' ' || coalesce(notes, '')))
+);
+CREATE INDEX IF NOT EXISTS idx_mesh_logs_search ON mesh_logs USING gin (
+    to_tsvector('simple', search_fold(coalesce(waybill_no, '') || ' ' || coalesce(supplier, '') || ' '
+        || coalesce(usage_location, '') || ' ' || coalesce(notes, '')))
+);
+
+CREATE OR REPLACE FUNCTION search_logs(p_query TEXT, p_table TEXT DEFAULT NULL, p_limit INT DEFAULT 20)
+RETURNS TABLE(table_name TEXT, id UUID, date DATE, supplier TEXT, waybill_no TEXT, location TEXT, score REAL) AS $$
+DECLARE
+    v_query tsquery;
+BEGIN
+    IF p_table IS NOT NULL AND p_table NOT IN ('concrete_logs', 'rebar_logs', 'mesh_logs') THEN
+        RAISE EXCEPTION 'Geçersiz tablo: %', p_table;
+    END IF;
+
+    SELECT to_tsquery('simple', string_agg(term || ':*', ' & '))
+    INTO v_query
+    FROM regexp_split_to_table(search_fold(p_query), '[^[:alnum:]]+') AS term
+    WHERE term <> '';
+    IF v_query IS NULL THEN
+        RETURN;
+    END IF;
+
+    RETURN QUERY
+    SELECT * FROM (
+        SELECT 'concrete_logs'::TEXT, c.id, c.date, c.supplier, c.waybill_no, c.location_block,
+               ts_rank(to_tsvector('simple', search_fold(coalesce(c.waybill_no, '') || ' ' || coalesce(c.supplier, '') || ' '
+                   || coalesce(c.location_block, '') || ' ' || coalesce(c.notes, ''))), v_query)
+        FROM concrete_logs c
+        WHERE (p_table IS NULL OR p_table = 'concrete_logs')
+          AND to_tsvector('simple', search_fold(coalesce(c.waybill_no, '') || ' ' || coalesce(c.supplier, '') || ' '
+                   || coalesce(c.location_block, '') || ' ' || coalesce(c.notes, ''))) @@ v_query
+        UNION ALL
+        SELECT 'rebar_logs'::TEXT, r.id, r.date, r.supplier, r.waybill_no, r.project_stage,
+               ts_rank(to_tsvector('simple', search_fold(coalesce(r.waybill_no, '') || ' ' || coalesce(r.supplier, '') || ' '
+                   || coalesce(r.manufacturer, '') || ' ' || coalesce(r.project_stage, '') || ' ' || coalesce(r.notes, ''))), v_query)
+        FROM rebar_logs r
+        WHERE (p_table IS NULL OR p_table = 'rebar_logs')
+          AND to_tsvector('simple', search_fold(coalesce(r.waybill_no, '') || ' ' || coalesce(r.supplier, '') || ' '
+                   || coalesce(r.manufacturer, '') || ' ' || coalesce(r.project_stage, '') || ' ' || coalesce(r.notes, ''))) @@ v_query
+        UNION ALL
+        SELECT 'mesh_logs'::TEXT, m.id, m.date, m.supplier, m.waybill_no, m.usage_location,
+               ts_rank(to_tsvector('simple', search_fold(coalesce(m.waybill_no, '') || ' ' || coalesce(m.supplier, '') || ' '
+                   || coalesce(m.usage_location, '') || ' ' || coalesce(m.notes, ''))), v_query)
+        FROM mesh_logs m
+        WHERE (p_table IS NULL OR p_table = 'mesh_logs')
+          AND to_tsvector('simple', search_fold(coalesce(m.waybill_no, '') || ' ' || coalesce(m.supplier, '') || ' '
+                   || coalesce(m.usage_location, '') || ' ' || coalesce(m.notes, ''))) @@ v_query
+    ) hits
+    ORDER BY 7 DESC
+    LIMIT p_limit;
+END;
+$$ LANGUAGE plpgsql STABLE;
@@ -0,0 +1,240 @@
+"""
+Full-Text Search Index
+Waybill numbers, supplier/producer names, locations (blok, etap, kullanım yeri) and notes of
+all three material tables in one index.
+
+SQLite: an FTS5 table (`arama`) kept in sync by triggers, so every write path (ORM, Core bulk,
+import, shadow reimport, dedupe) updates it. rowid = kayıt id * 4 + malzeme kodu, so a
+trigger touches exactly one index row. PostgreSQL: GIN indexes on a `to_tsvector('simple', ...)`
+expression of each table (Supabase tables: search_functions.sql).
+
+Turkish folding: the unicode61 tokenizer lower-cases and strips diacritics (İ/Ç/Ş/Ğ/Ö/Ü -> i/c/s/g/o/u);
+dotless ı has no decomposition, so it is mapped to i on both the index and the query side.
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event, select, text
+
+from database import Base, Beton, Demir, Hasir
+
+# material -> (model, rowid code, {index column: source columns})
+SEARCH_TABLES = {
+    "beton": (Beton, 1, {
+        "irsaliye_no": ["irsaliye_no"], "firma": ["firma"], "yer": ["blok"], "aciklama": ["aciklama"],
+    }),
+    "demir": (Demir, 2, {
+        "irsaliye_no": ["irsaliye_no"], "firma": ["tedarikci", "uretici"], "yer": ["etap"], "aciklama": [],
+    }),
+    "hasir": (Hasir, 3, {
+        "irsaliye_no": ["irsaliye_no"], "firma": ["firma"], "yer": ["etap", "kullanim_yeri"], "aciklama": [],
+    }),
+}
+INDEX_COLUMNS = ["irsaliye_no", "firma", "yer", "aciklama"]
+# bm25 weights per index column: a waybill hit outranks a hit in the notes
+COLUMN_WEIGHTS = [10.0, 5.0, 2.0, 1.0]
+
+# Display columns returned with each hit
+RESULT_COLUMNS = {
+    "beton": {"firma": Beton.firma, "yer": Beton.blok},
+    "demir": {"firma": Demir.tedarikci, "yer": Demir.etap},
+    "hasir": {"firma": Hasir.firma, "yer": Hasir.kullanim_yeri},
+}
+
+
+# ============================================
+# NORMALIZATION
+# ============================================
+
+def fold_query(query: str) -> List[str]:
+    """Search terms; ı -> i like the index side, the tokenizer handles case and diacritics"""
+    return re.findall(r"\w+", query.replace("ı", "i"))
+
+
+def fts_match(terms: List[str]) -> str:
+    """FTS5 MATCH expression: every term must match as a prefix ("pom" finds POMPALI)"""
+    return " ".join('"' + term.replace('"', '""') + '"*' for term in terms)
+
+
+def tsquery(terms: List[str]) -> str:
+    """to_tsquery('simple', ...) text with the same prefix semantics"""
+    return " & ".join(f"{term}:*" for term in terms)
+
+
+# ============================================
+# SQLITE (FTS5)
+# ============================================
+
+def _sqlite_value(row: str, sources: List[str]) -> str:
+    if not sources:
+        return "NULL"
+    joined = " || ' ' || ".join(f"coalesce({row}.{column}, '')" for column in sources)
+    return f"replace({joined}, 'ı', 'i')"
+
+
+def _sqlite_insert(material: str, row: str) -> str:
+    _, code, columns = SEARCH_TABLES[material]
+    values = ", ".join(_sqlite_value(row, columns[c]) for c in INDEX_COLUMNS)
+    return (f"INSERT INTO arama (rowid, malzeme, kayit_id, {', '.join(INDEX_COLUMNS)}) "
+            f"VALUES ({row}.id * 4 + {code}, '{material}', {row}.id, {values})")
+
+
+def sqlite_statements() -> List[str]:
+    statements = [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS arama USING fts5("
+        f"malzeme UNINDEXED, kayit_id UNINDEXED, {', '.join(INDEX_COLUMNS)}, "
+        "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+    ]
+    for material, (model, code, columns) in SEARCH_TABLES.items():
+        table = model.__tablename__
+        watched = ", ".join(sorted({c for sources in columns.values() for c in sources}))
+        delete = f"DELETE FROM arama WHERE rowid = OLD.id * 4 + {code}"
+        statements += [
+            f"CREATE TRIGGER IF NOT EXISTS trg_{table}_arama_insert AFTER INSERT ON {table} BEGIN "
+            f"{_sqlite_insert(material, 'NEW')}; END",
+            f"CREATE TRIGGER IF NOT EXISTS trg_{table}_arama_update AFTER UPDATE OF {watched} ON {table} BEGIN "
+            f"{delete}; {_sqlite_insert(material, 'NEW')}; END",
+            f"CREATE TRIGGER IF NOT EXISTS trg_{table}_arama_delete AFTER DELETE ON {table} BEGIN {delete}; END",
+        ]
+    return statements
+
+
+def _sqlite_rebuild(connection):
+    connection.exec_driver_sql("DELETE FROM arama")
+    for material, (model, code, columns) in SEARCH_TABLES.items():
+        values = ", ".join(_sqlite_value(model.__tablename__, columns[c]) for c in INDEX_COLUMNS)
+        connection.exec_driver_sql(
+            f"INSERT INTO arama (rowid, malzeme, kayit_id, {', '.join(INDEX_COLUMNS)}) "
+            f"SELECT id * 4 + {code}, '{material}', id, {values} FROM {model.__tablename__}"
+        )
+
+
+# ============================================
+# POSTGRESQL (tsvector + GIN)
+# ============================================
+
+PG_FOLD_FROM, PG_FOLD_TO = "İIıÇçĞğÖöŞşÜüÂâÎîÛû", "iiiccggoossuuaaiiuu"
+
+
+def pg_fold(expression: str) -> str:
+    """Same folding as search_fold() in search_functions.sql; applied to both documents and queries"""
+    return f"lower(translate({expression}, '{PG_FOLD_FROM}', '{PG_FOLD_TO}'))"
+
+
+def pg_document(material: str) -> str:
+    """tsvector expression; the query must repeat it verbatim for the GIN index to be used"""
+    _, _, columns = SEARCH_TABLES[material]
+    sources = [c for name in INDEX_COLUMNS for c in columns[name]]
+    joined = " || ' ' || ".join(f"coalesce({column}, '')" for column in sources)
+    return f"to_tsvector('simple', {pg_fold(joined)})"
+
+
+def pg_search_statement(materials: List[str]):
+    """UNION ALL over the material tables, best first (params: q = tsquery(terms), limit)"""
+    query = f"to_tsquery('simple', {pg_fold(':q')})"
+    parts = [
+        f"SELECT '{m}' AS malzeme, id AS kayit_id, ts_rank({pg_document(m)}, {query}) AS skor "
+        f"FROM {SEARCH_TABLES[m][0].__tablename__} WHERE {pg_document(m)} @@ {query}"
+        for m in materials
+    ]
+    return text(" UNION ALL ".join(parts) + " ORDER BY skor DESC LIMIT :limit")
+
+
+def postgres_statements() -> List[str]:
+    return [
+        f"CREATE INDEX IF NOT EXISTS ix_{model.__tablename__}_arama ON {model.__tablename__} "
+        f"USING gin ({pg_document(material)})"
+        for material, (model, _, _) in SEARCH_TABLES.items()
+    ]
+
+
+# ============================================
+# SETUP
+# ============================================
+
+def ensure_search_index(connection):
+    """Create the index (and fill it when it is new); safe to run on every start"""
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        created = not connection.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'arama'"
+        ).first()
+        for statement in sqlite_statements():
+            connection.exec_driver_sql(statement)
+        if created:
+            _sqlite_rebuild(connection)
+    elif dialect == "postgresql":
+        for statement in postgres_statements():
+            connection.exec_driver_sql(statement)
+
+
+def drop_search_index(connection):
+    if connection.dialect.name == "sqlite":
+        connection.exec_driver_sql("DROP TABLE IF EXISTS arama")
+
+
+# The FTS table is not part of the metadata; follow create_all / drop_all
+@event.listens_for(Base.metadata, "after_create")
+def _create_on_create_all(target, connection, **kw):
+    ensure_search_index(connection)
+
+
+@event.listens_for(Base.metadata, "before_drop")
+def _drop_on_drop_all(target, connection, **kw):
+    drop_search_index(connection)
+
+
+# ============================================
+# QUERY
+# ============================================
+
+def search_hits(connection, query: str, material: Optional[str] = None, limit: int = 20) -> List[Tuple[str, int, float]]:
+    """(malzeme, kayıt id, skor) best first; higher skor = better match"""
+    terms = fold_query(query)
+    if not terms:
+        return []
+    materials = [material] if material else list(SEARCH_TABLES)
+
+    if connection.dialect.name == "postgresql":
+        rows = connection.execute(pg_search_statement(materials), {"q": tsquery(terms), "limit": limit}).all()
+        return [(row.malzeme, row.kayit_id, float(row.skor)) for row in rows]
+
+    weights = ", ".join(str(w) for w in COLUMN_WEIGHTS)
+    material_filter = " AND malzeme = :malzeme" if material else ""
+    rows = connection.execute(text(
+        f"SELECT malzeme, kayit_id, -bm25(arama, 0, 0, {weights}) AS skor FROM arama "
+        f"WHERE arama MATCH :q{material_filter} ORDER BY bm25(arama, 0, 0, {weights}) LIMIT :limit"
+    ), {"q": fts_match(terms), "malzeme": material, "limit": limit}).all()
+    return [(row.malzeme, row.kayit_id, row.skor) for row in rows]
+
+
+def search(connection, query: str, material: Optional[str] = None, limit: int = 20) -> List[Dict]:
+    """Hits with their display fields, one IN (...) lookup per material"""
+    hits = search_hits(connection, query, material, limit)
+    found = {}
+    for name in {m for m, _, _ in hits}:
+        model = SEARCH_TABLES[name][0]
+        columns = RESULT_COLUMNS[name]
+        ids = [record_id for m, record_id, _ in hits if m == name]
+        rows = connection.execute(
+            select(model.id, model.tarih, model.irsaliye_no, *[c.label(k) for k, c in columns.items()])
+            .where(model.id.in_(ids))
+        ).all()
+        found.update({(name, row.id): row for row in rows})
+
+    results = []
+    for name, record_id, score in hits:
+        row = found.get((name, record_id))
+        if row is None:
+            continue
+        results.append({
+            "malzeme": name,
+            "id": record_id,
+            "tarih": row.tarih,
+            "irsaliye_no": row.irsaliye_no,
+            "firma": row.firma,
+            "yer": row.yer,
+            "skor": round(score, 4),
+        })
+    return results
@@ -0,0 +1,26 @@
+"""
+Fast list serialization
+List endpoints select only the response columns as plain rows and hand them straight
+to orjson; returning a Response skips FastAPI's per-row response_model validation,
+which is redundant for rows that come from our own tables.
+"""
+
+from typing import List
+
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import Select, select
+
+
+def response_columns(model, schema) -> List:
+    """Table columns matching the response schema fields, in schema order"""
+    return [model.__table__.c[name] for name in schema.model_fields]
+
+
+def list_select(model, schema) -> Select:
+    return select(*response_columns(model, schema))
+
+
+def rows_response(result) -> ORJSONResponse:
+    """Result rows -> JSON array of objects (datetimes as ISO 8601, same as the Pydantic output)"""
+    keys = list(result.keys())
+    return ORJSONResponse([dict(zip(keys, row)) for row in result])
@@ -0,0 +1,220 @@
+"""
+Shadow-Table Reimport
+Full reloads go into <table>_shadow first, are checked against the source workbook (row
+count and quantity total), and replace the live rows in a single transaction. Readers keep
+seeing the previous data until that commit, never an empty or half-loaded table.
+
+The swap copies shadow -> live inside the transaction instead of renaming tables: views,
+RLS policies, the PostgREST schema cache and the backend's indexes all stay bound to the
+live table. Supabase uses the swap_shadow RPC (shadow_reimport.sql); the local backend
+tables (beton/demir/hasir) go through SQLAlchemy, also via `POST /api/import/{kind}?replace=true`.
+
+Kullanım:
+    python shadow_reimport.py BETON-997.xlsx --table concrete_logs --sheet Sayfa1
+    python shadow_reimport.py demir.xlsx --local --table demir
+"""
+
+import argparse
+import csv
+import io
+import math
+import os
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import Column, MetaData, Table, delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from analytics import SUMMARY_TABLES
+from dedupe import get_supabase_client
+from dimensions import resolve_rows
+
+SHADOW_SUFFIX = "_shadow"
+TOTAL_TOLERANCE = 0.01
+
+# Supabase table -> (quantity column, ExcelValidator method)
+SUPABASE_TABLES = {
+    "concrete_logs": ("quantity_m3", "validate_concrete"),
+    "rebar_logs": ("total_weight_kg", "validate_rebar"),
+    "mesh_logs": ("weight_kg", "validate_mesh"),
+}
+REST_BATCH_SIZE = 1000
+
+
+def check_totals(expected: Dict, loaded: Dict):
+    """Raise (nothing swapped yet) when the shadow table does not match the workbook"""
+    if expected["count"] != loaded["count"] or not math.isclose(
+            expected["total"], loaded["total"], rel_tol=1e-9, abs_tol=TOTAL_TOLERANCE):
+        raise ValueError(
+            f"Shadow tablo doğrulanamadı: Excel {expected['count']} kayıt / {expected['total']:.2f}, "
+            f"yüklenen {loaded['count']} kayıt / {loaded['total']:.2f}; canlı tablo değiştirilmedi"
+        )
+
+
+# ============================================
+# LOCAL BACKEND (SQLAlchemy)
+# ============================================
+
+def shadow_table(model) -> Table:
+    """Index-free copy of the live columns (without the id, the live table assigns it on swap)"""
+    columns = [
+        Column(c.name, c.type, default=c.default.arg if c.default is not None else None)
+        for c in model.__table__.columns if not c.primary_key
+    ]
+    return Table(model.__tablename__ + SHADOW_SUFFIX, MetaData(), *columns)
+
+
+def reimport_local(db: Session, kind: str, records: List) -> Dict:
+    """Replace every row of a backend table with `records` (unsaved ORM objects from importers)"""
+    model, quantity, _ = SUMMARY_TABLES[kind]
+    shadow = shadow_table(model)
+    names = [c.name for c in shadow.columns]
+    expected = {
+        "count": len(records),
+        "total": float(sum(getattr(r, quantity.key) or 0 for r in records)),
+    }
+
+    connection = db.connection()
+    shadow.drop(connection, checkfirst=True)
+    shadow.create(connection)
+    try:
+        if records:
+            rows = [{name: getattr(r, name) for name in names} for r in records]
+            db.execute(insert(shadow), resolve_rows(db.connection(), model, rows))
+        count, total = db.execute(
+            select(func.count(), func.coalesce(func.sum(shadow.c[quantity.key]), 0))
+        ).one()
+        loaded = {"count": count, "total": float(total)}
+        check_totals(expected, loaded)
+
+        # Same transaction: readers see the old rows until commit, then only the new ones
+        replaced = db.execute(delete(model).execution_options(synchronize_session=False)).rowcount
+        db.execute(insert(model.__table__).from_select(names, select(*shadow.c)))
+        shadow.drop(db.connection())
+        db.commit()
+    except Exception:
+        db.rollback()
+        shadow.drop(db.connection(), checkfirst=True)
+        db.commit()
+        raise
+
+    return {"table": kind, "expected": expected, "loaded": loaded, "replaced": replaced, "inserted": count}
+
+
+# ============================================
+# SUPABASE (RPC)
+# ============================================
+
+def get_db_url() -> Optional[str]:
+    """Direct Postgres URL for COPY (SUPABASE_DB_URL or [supabase] db_url in secrets.toml)"""
+    url = os.getenv("SUPABASE_DB_URL")
+    secrets_path = os.path.join(os.getcwd(), ".streamlit", "secrets.toml")
+    if not url and os.path.exists(secrets_path):
+        import toml
+        url = toml.load(secrets_path).get("supabase", {}).get("db_url")
+    return url
+
+
+def prepare_rows(records: List[Dict]) -> List[Dict]:
+    rows = []
+    for record in records:
+        row = {k: v for k, v in record.items() if k != "row_num"}
+        for key, value in row.items():
+            if isinstance(value, (date, datetime)):
+                row[key] = value.isoformat()
+        rows.append(row)
+    return rows
+
+
+def load_shadow_copy(db_url: str, shadow: str, rows: List[Dict]):
+    """Fastest path: one COPY ... FROM STDIN over a direct connection"""
+    import psycopg2
+
+    columns = sorted({key for row in rows for key in row})
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(["" if row.get(c) is None else row.get(c) for c in columns])
+    buffer.seek(0)
+
+    with psycopg2.connect(db_url) as conn, conn.cursor() as cursor:
+        cursor.copy_expert(f'COPY {shadow} ({", ".join(columns)}) FROM STDIN WITH (FORMAT csv)', buffer)
+
+
+def load_shadow_rest(client, shadow: str, rows: List[Dict]):
+    for i in range(0, len(rows), REST_BATCH_SIZE):
+        client.table(shadow).insert(rows[i:i + REST_BATCH_SIZE]).execute()
+        print(f"   ⏳ {min(i + REST_BATCH_SIZE, len(rows))}/{len(rows)} shadow tabloya yüklendi")
+
+
+def reimport_supabase(client, table: str, records: List[Dict], db_url: Optional[str] = None) -> Dict:
+    """Load ExcelValidator output into <table>_shadow, then validate + swap server-side"""
+    quantity, _ = SUPABASE_TABLES[table]
+    rows = prepare_rows(records)
+    expected_total = sum(float(row.get(quantity) or 0) for row in rows)
+
+    client.rpc("reset_shadow", {"p_table": table}).execute()
+    if db_url:
+        load_shadow_copy(db_url, table + SHADOW_SUFFIX, rows)
+    else:
+        load_shadow_rest(client, table + SHADOW_SUFFIX, rows)
+
+    return client.rpc("swap_shadow", {
+        "p_table": table,
+        "p_expected_count": len(rows),
+        "p_expected_total": round(expected_total, 2),
+    }).execute().data
+
+
+# ============================================
+# CLI
+# ============================================
+
+def read_local_records(path: str, kind: str) -> List:
+    from importers import parse_beton_excel, parse_demir_excel, parse_hasir_excel
+    parsers = {"beton": parse_beton_excel, "demir": parse_demir_excel, "hasir": parse_hasir_excel}
+    with open(path, "rb") as f:
+        return parsers[kind](f.read())
+
+
+def read_supabase_records(path: str, table: str, sheet) -> List[Dict]:
+    import pandas as pd
+    from excel_uploader import ExcelValidator
+
+    df = pd.read_excel(path, sheet_name=sheet).dropna(thresh=3)
+    records, errors, _ = getattr(ExcelValidator(), SUPABASE_TABLES[table][1])(df)
+    if errors:
+        print(f"⚠️  {len(errors)} satır atlandı (ilk: {errors[0]})")
+    return records
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Shadow tablo üzerinden kesintisiz yeniden yükleme")
+    parser.add_argument("excel", help="Kaynak Excel dosyası")
+    parser.add_argument("--table", required=True, help="Hedef tablo")
+    parser.add_argument("--sheet", default=0, help="Sayfa adı (varsayılan: ilk sayfa)")
+    parser.add_argument("--local", action="store_true", help="FastAPI backend veritabanı (beton/demir/hasir)")
+    args = parser.parse_args(argv)
+
+    tables = list(SUMMARY_TABLES) if args.local else list(SUPABASE_TABLES)
+    if args.table not in tables:
+        parser.error(f"Geçersiz tablo: {args.table} (geçerli: {', '.join(tables)})")
+
+    if args.local:
+        from database import SessionLocal
+        records = read_local_records(args.excel, args.table)
+        with SessionLocal() as db:
+            result = reimport_local(db, args.table, records)
+    else:
+        client = get_supabase_client()
+        if not client:
+            return
+        records = read_supabase_records(args.excel, args.table, args.sheet)
+        result = reimport_supabase(client, args.table, records, get_db_url())
+
+    print(f"✅ {result['table']}: {result['replaced']} eski kayıt yerine {result['inserted']} kayıt "
+          f"(toplam {result['loaded']['total']:.2f}) tek transaction'da yüklendi")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+-- ============================================
+-- SHADOW REIMPORT: Kesintisiz yeniden yükleme (RPC)
+-- ============================================
+-- Excel önce <tablo>_shadow'a yüklenir (COPY veya REST), swap_shadow kayıt sayısını ve
+-- miktar toplamını Excel'e göre doğrular, sonra tek transaction'da canlı tabloyu
+-- shadow ile değiştirir. Okuyucular commit anına kadar eski veriyi görür; boş veya
+-- yarım tablo hiç görünmez. Doğrulama başarısızsa canlı tabloya dokunulmaz.
+--
+-- Tablo adı değiştirmek (RENAME) yerine satırlar kopyalanır: view'lar, RLS politikaları
+-- ve PostgREST şema önbelleği canlı tabloya bağlı kalır.
+--
+-- Kullanım:
+--   python shadow_reimport.py BETON-997.xlsx --table concrete_logs --sheet Sayfa1
+--   (SUPABASE_DB_URL tanımlıysa shadow yüklemesi COPY ile yapılır)
+
+-- Shadow tablolar kalıcıdır ki REST ile de yazılabilsin (indeks/kısıt yok: hızlı yükleme)
+CREATE TABLE IF NOT EXISTS concrete_logs_shadow (LIKE concrete_logs INCLUDING DEFAULTS);
+CREATE TABLE IF NOT EXISTS rebar_logs_shadow (LIKE rebar_logs INCLUDING DEFAULTS);
+CREATE TABLE IF NOT EXISTS mesh_logs_shadow (LIKE mesh_logs INCLUDING DEFAULTS);
+
+CREATE OR REPLACE FUNCTION reset_shadow(p_table TEXT)
+RETURNS VOID AS $$
+BEGIN
+    IF p_table NOT IN ('concrete_logs', 'rebar_logs', 'mesh_logs') THEN
+        RAISE EXCEPTION 'Geçersiz tablo: %', p_table;
+    END IF;
+    EXECUTE format('TRUNCATE %I', p_table || '_shadow');
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION swap_shadow(
+    p_table TEXT,
+    p_expected_count BIGINT,
+    p_expected_total NUMERIC,
+    p_tolerance NUMERIC DEFAULT 0.01
+)
+RETURNS JSONB AS $$
+DECLARE
+    v_shadow TEXT := p_table || '_shadow';
+    v_quantity TEXT;
+    v_count BIGINT;
+    v_total NUMERIC;
+    v_replaced BIGINT;
+BEGIN
+    v_quantity := CASE p_table
+        WHEN 'concrete_logs' THEN 'quantity_m3'
+        WHEN 'rebar_logs' THEN 'total_weight_kg'
+        WHEN 'mesh_logs' THEN 'weight_kg'
+    END;
+    IF v_quantity IS NULL THEN
+        RAISE EXCEPTION 'Geçersiz tablo: %', p_table;
+    END IF;
+
+    EXECUTE format('SELECT count(*), coalesce(sum(%I), 0) FROM %I', v_quantity, v_shadow)
+        INTO v_count, v_total;
+
+    IF v_count <> p_expected_count OR abs(v_total - p_expected_total) > p_tolerance THEN
+        RAISE EXCEPTION 'Shadow tablo doğrulanamadı: Excel % kayıt / %, yüklenen % kayıt / %; canlı tablo değiştirilmedi',
+            p_expected_count, p_expected_total, v_count, v_total;
+    END IF;
+
+    -- EXCLUSIVE: yazanlar swap bitene kadar bekler, SELECT'ler eski veriyi okumaya devam eder
+    EXECUTE format('LOCK TABLE %I IN EXCLUSIVE MODE', p_table);
+    EXECUTE format('DELETE FROM %I', p_table);
+    GET DIAGNOSTICS v_replaced = ROW_COUNT;
+    EXECUTE format('INSERT INTO %I SELECT * FROM %I', p_table, v_shadow);
+    EXECUTE format('TRUNCATE %I', v_shadow);
+
+    RETURN jsonb_build_object(
+        'table', p_table,
+        'expected', jsonb_build_object('count', p_expected_count, 'total', p_expected_total),
+        'loaded', jsonb_build_object('count', v_count, 'total', v_total),
+        'replaced', v_replaced,
+        'inserted', v_count
+    );
+END;
+$$ LANGUAGE plpgsql;
@@ -9,6 +9,11 @@ import io
 from datetime import datetime, date
 from db_manager_rest import get_db_manager_rest_v10
 from excel_uploader import ExcelValidator
+from dashboard_aggregates import build_concrete_aggregates, build_rebar_aggregates, build_mesh_aggregates
+from typed_frames import typed_logs
+from lazy_data import LazyDataLoader, lazy_tabs, lazy_section
+from health_monitor import HealthMonitor
+from paged_table import paged_table
 import plotly.express as px
 import plotly.graph_objects as go
 
@@ -44,6 +49,11 @@ st.markdown("""
 def init_db_v4():
     return get_db_manager_rest_v10()
 
+@st.cache_resource(on_release=lambda monitor: monitor.stop())
+def get_db_health_monitor(_db):
+    """Background connection check shared by all sessions (30 sn aralık, 5 sn zaman aşımı)"""
+    return HealthMonitor(_db.test_connection, interval=30, timeout=5, name="supabase-health").start()
+
 # Cache data functions for performance
 @st.cache_data(ttl=600)  # Cache for 10 minutes
 def get_cached_concrete_summary():
@@ -58,44 +68,105 @@ def get_cached_mesh_summary():
     return db.get_mesh_summary()
 
 @st.cache_data(ttl=600)
-def get_cached_concrete_logs():
-    return db.get_concrete_logs()
+def get_cached_concrete_by_supplier():
+    return db.get_concrete_by_supplier()
 
 @st.cache_data(ttl=600)
+def get_cached_concrete_by_location():
+    return db.get_concrete_by_location()
+
+# Data version: bumped on every write so aggregates are rebuilt once per change
+@st.cache_resource
+def _data_version_store():
+    return {'version': 0}
+
+def get_data_version() -> int:
+    return _data_version_store()['version']
+
+def invalidate_data():
+    """Clear cached data after a write and move to a new data version"""
+    _data_version_store()['version'] += 1
+    st.cache_data.clear()
+
+# Full logs: typed frames (categoricals, float32) shared by every session through cache_resource,
+# so they are neither pickled nor copied per rerun. Read-only: pages never mutate them.
+@st.cache_resource(ttl=600, max_entries=6)
+def get_shared_logs(table: str, version: int):
+    loaders = {'concrete_logs': db.get_concrete_logs, 'rebar_logs': db.get_rebar_logs, 'mesh_logs': db.get_mesh_logs}
+    return typed_logs(loaders[table](), table)
+
+def get_cached_concrete_logs():
+    return get_shared_logs('concrete_logs', get_data_version())
+
 def get_cached_rebar_logs():
-    return db.get_rebar_logs()
+    return get_shared_logs('rebar_logs', get_data_version())
 
-@st.cache_data(ttl=600)
 def get_cached_mesh_logs():
-    return db.get_mesh_logs()
+    return get_shared_logs('mesh_logs', get_data_version())
 
+# Precomputed dashboard series (small frames, keyed by data version)
 @st.cache_data(ttl=600)
-def get_cached_concrete_by_supplier():
-    return db.get_concrete_by_supplier()
+def get_cached_concrete_aggregates(version: int):
+    return build_concrete_aggregates(get_cached_concrete_logs())
 
 @st.cache_data(ttl=600)
-def get_cached_concrete_by_location():
-    return db.get_concrete_by_location()
+def get_cached_rebar_aggregates(version: int):
+    return build_rebar_aggregates(get_cached_rebar_logs())
+
+@st.cache_data(ttl=600)
+def get_cached_mesh_aggregates(version: int):
+    return build_mesh_aggregates(get_cached_mesh_logs())
+
+@st.cache_data(ttl=600, max_entries=200)
+def get_cached_logs_page(table: str, version: int, offset: int, limit: int, sort_by: str, descending: bool,
+                         start_date=None, end_date=None, supplier=None, waybill=None):
+    """One window of a log table (range query); keyed by data version so edits show up"""
+    return db.get_logs_page(table, offset=offset, limit=limit, sort_by=sort_by, descending=descending,
+                            start_date=start_date, end_date=end_date, supplier=supplier, waybill=waybill)
+
+def logs_page_fetcher(table: str):
+    """fetch_page callback for paged_table"""
+    return lambda **query: get_cached_logs_page(table, get_data_version(), **query)
+
+def logs_csv_exporter(table: str):
+    """Lazy CSV export callback for paged_table (runs only when the download is clicked)"""
+    return lambda **query: db.export_logs_csv(table, **query)
 
 db = init_db_v4()
 
+# Datasets pages can ask for; nothing is fetched until a visible page/tab requires it
+loader = LazyDataLoader()
+loader.register('concrete_summary', get_cached_concrete_summary)
+loader.register('rebar_summary', get_cached_rebar_summary)
+loader.register('mesh_summary', get_cached_mesh_summary)
+loader.register('concrete_logs', get_cached_concrete_logs)
+loader.register('rebar_logs', get_cached_rebar_logs)
+loader.register('mesh_logs', get_cached_mesh_logs)
+loader.register('concrete_by_location', get_cached_concrete_by_location)
+loader.register('concrete_aggregates', lambda: get_cached_concrete_aggregates(get_data_version()))
+loader.register('rebar_aggregates', lambda: get_cached_rebar_aggregates(get_data_version()))
+loader.register('mesh_aggregates', lambda: get_cached_mesh_aggregates(get_data_version()))
+
 # Sidebar
 st.sidebar.title("🏗️ Şantiye 997")
 
 # Add refresh button to sidebar
 if st.sidebar.button("🔄 Verileri Yenile", help="Önbelleği temizle ve verileri yenile"):
-    st.cache_data.clear()
+    invalidate_data()
     st.cache_resource.clear()
     st.sidebar.success("Tüm önbellek temizlendi!")
     st.rerun()
 
 st.sidebar.markdown("---")
 
-# Check connection
-if db.test_connection():
-    st.sidebar.success("✅ Veritabanı Bağlı")
+# Check connection (cached result of the background probe, never blocks the render)
+health = get_db_health_monitor(db).status()
+if health['ok'] is None:
+    st.sidebar.info("⏳ Bağlantı kontrol ediliyor...")
+elif health['ok']:
+    st.sidebar.success(f"✅ Veritabanı Bağlı ({health['latency_ms']:.0f} ms)")
 else:
-    st.sidebar.error("❌ Bağlantı Hatası")
+    st.sidebar.error(f"❌ Bağlantı Hatası: {health['error']}")
 
 page = st.sidebar.radio(
     "Navigasyon",
@@ -136,136 +207,22 @@ def check_password():
         return True
 
 # ============================================
-# ANA SAYFA
+# DASHBOARD SECTIONS (rendered on demand)
 # ============================================
 
-if page == "📊 Ana Sayfa":
-    st.title("📊 Şantiye 997 - Yönetim Paneli")
-    st.markdown("### 🏗️ Gerçek Zamanlı Malzeme Takip Sistemi")
-    
-    # Get summaries (cached - fast after first load)
-    concrete_summary = get_cached_concrete_summary()
-    rebar_summary = get_cached_rebar_summary()
-    mesh_summary = get_cached_mesh_summary()
-    
-    # Get detailed data (cached - fast after first load)
-    concrete_df = get_cached_concrete_logs()
-    rebar_df = get_cached_rebar_logs()
-    mesh_df = get_cached_mesh_logs()
-    
-    # ============================================
-    # MAIN KPIs
-    # ============================================
-    st.markdown("## 📈 Ana Göstergeler")
-    col1, col2, col3 = st.columns(3)
-    
-    with col1:
-        st.metric(
-            "🧱 Toplam Beton",
-            f"{concrete_summary.get('total_quantity_m3', 0):,.1f} m³",
-            delta=f"↑ {concrete_summary.get('total_deliveries', 0)} teslimat"
-        )
-    
-    with col2:
-        st.metric(
-            "⚙️ Toplam Demir",
-            f"{rebar_summary.get('total_weight_kg', 0)/1000:,.1f} ton",
-            delta=f"↑ {rebar_summary.get('total_deliveries', 0)} sevkiyat"
-        )
-    
-    with col3:
-        st.metric(
-            "🔲 Toplam Hasır",
-            f"{mesh_summary.get('total_weight_kg', 0)/1000:,.1f} ton",
-            delta=f"↑ {mesh_summary.get('total_deliveries', 0)} sevkiyat"
-        )
-    
-    st.markdown("---")
-    
-    # ============================================
-    # TIME SERIES ANALYSIS (ALL MATERIALS)
-    # ============================================
-    st.markdown("## 📅 Aylık Tüketim Trendleri")
-    
-    tab1, tab2, tab3 = st.tabs(["🧱 Beton", "⚙️ Demir", "🔲 Hasır"])
-    
-    with tab1:
-        if not concrete_df.empty:
-            # Monthly analysis
-            concrete_df['date'] = pd.to_datetime(concrete_df['date'])
-            concrete_df['year_month'] = concrete_df['date'].dt.to_period('M').astype(str)
-            monthly_concrete = concrete_df.groupby('year_month').agg({
-                'quantity_m3': 'sum',
-                'id': 'count'
-            }).reset_index()
-            monthly_concrete.columns = ['Ay', 'Toplam m³', 'Teslimat Sayısı']
-            
-            fig = px.bar(
-                monthly_concrete,
-                x='Ay',
-                y='Toplam m³',
-                text='Toplam m³',
-                title='Aylık Beton Tüketimi',
-                color='Toplam m³',
-                color_continuous_scale='Oranges'
-            )
-            fig.update_traces(texttemplate='%{text:.0f}', textposition='outside')
-            fig.update_layout(height=400, showlegend=False)
-            st.plotly_chart(fig, use_container_width=True)
-    
-    with tab2:
-        if not rebar_df.empty:
-            rebar_df['date'] = pd.to_datetime(rebar_df['date'])
-            rebar_df['year_month'] = rebar_df['date'].dt.to_period('M').astype(str)
-            monthly_rebar = rebar_df.groupby('year_month')['total_weight_kg'].sum().reset_index()
-            
-            fig = px.area(
-                monthly_rebar,
-                x='year_month',
-                y='total_weight_kg',
-                title='Aylık Demir Alımı (kg)',
-                labels={'year_month': 'Ay', 'total_weight_kg': 'Ağırlık (kg)'}
-            )
-            fig.update_traces(line_color='#E63946')  # fill_color is not a valid property for update_traces here
-            fig.update_layout(height=400)
-            st.plotly_chart(fig, use_container_width=True)
-        else:
-            st.info("Henüz demir verisi yok")
-            
-    with tab3:
-        if not mesh_df.empty:
-            mesh_df['date'] = pd.to_datetime(mesh_df['date'])
-            mesh_df['year_month'] = mesh_df['date'].dt.to_period('M').astype(str)
-            monthly_mesh = mesh_df.groupby('year_month')['weight_kg'].sum().reset_index()
-            
-            fig = px.line(
-                monthly_mesh,
-                x='year_month',
-                y='weight_kg',
-                title='Aylık Hasır Alımı (kg)',
-                markers=True
-            )
-            fig.update_traces(line_color='#00D4FF', line_width=3)
-            fig.update_layout(height=400)
-            st.plotly_chart(fig, use_container_width=True)
-        else:
-            st.info("Henüz hasır verisi yok")
-    
-    st.markdown("---")
-    
-    # ============================================
-    # MATERIAL BREAKDOWN
-    # ============================================
-    st.markdown("## 📊 Malzeme Dağılımları")
+def render_material_breakdown(data):
+    """Class / diameter / mesh type distributions"""
+    concrete_agg = data['concrete_aggregates']
+    rebar_agg = data['rebar_aggregates']
+    mesh_agg = data['mesh_aggregates']
     
     col1, col2, col3 = st.columns(3)
     
     with col1:
         st.markdown("### 🧱 Beton Sınıfları")
-        if not concrete_df.empty:
-            class_dist = concrete_df.groupby('concrete_class')['quantity_m3'].sum().reset_index()
+        if concrete_agg:
             fig = px.pie(
-                class_dist,
+                concrete_agg['class_dist'],
                 values='quantity_m3',
                 names='concrete_class',
                 hole=0.4,
@@ -277,16 +234,10 @@ if page == "📊 Ana Sayfa":
     
     with col2:
         st.markdown("### ⚙️ Demir Çapları")
-        if not rebar_df.empty:
-            # Calculate diameter totals
-            diameter_cols = [c for c in rebar_df.columns if c.startswith('q') and c.endswith('_kg')]
-            if diameter_cols:
-                dia_totals = rebar_df[diameter_cols].sum().reset_index()
-                dia_totals.columns = ['Çap', 'Ağırlık']
-                dia_totals['Çap'] = dia_totals['Çap'].apply(lambda x: f"Ø{x.split('_')[0][1:]}")
-                
+        if rebar_agg:
+            if 'diameter_totals' in rebar_agg:
                 fig = px.bar(
-                    dia_totals,
+                    rebar_agg['diameter_totals'],
                     x='Çap',
                     y='Ağırlık',
                     color='Ağırlık',
@@ -299,10 +250,9 @@ if page == "📊 Ana Sayfa":
             
     with col3:
         st.markdown("### 🔲 Hasır Tipleri")
-        if not mesh_df.empty and 'mesh_type' in mesh_df.columns:
-            type_dist = mesh_df.groupby('mesh_type')['weight_kg'].sum().reset_index()
+        if 'type_dist' in mesh_agg:
             fig = px.pie(
-                type_dist,
+                mesh_agg['type_dist'],
                 values='weight_kg',
                 names='mesh_type',
                 hole=0.4,
@@ -313,22 +263,18 @@ if page == "📊 Ana Sayfa":
         else:
             st.info("Veri yok")
 
-    st.markdown("---")
-    
-    # ============================================
-    # LOCATION & SUPPLIER ANALYSIS
-    # ============================================
-    
-    # ============================================
-    # LOCATION & SUPPLIER ANALYSIS
-    # ============================================
-    st.markdown("## 📍 Blok ve Tedarikçi Özeti")
+def render_location_summary(data):
+    """Top blocks, combined summary table and delivery methods"""
+    concrete_summary = data['concrete_summary']
+    rebar_summary = data['rebar_summary']
+    mesh_summary = data['mesh_summary']
+    concrete_agg = data['concrete_aggregates']
     
     col1, col2 = st.columns([2, 1])
     
     with col1:
         st.markdown("### 🏗️ En Çok Beton Dökülen Bloklar (İlk 15)")
-        concrete_by_location = get_cached_concrete_by_location()
+        concrete_by_location = data['concrete_by_location']
         if not concrete_by_location.empty:
             top_locations = concrete_by_location.head(15)
             
@@ -383,10 +329,9 @@ if page == "📊 Ana Sayfa":
         )
         
         st.markdown("### 🚛 Teslimat Yöntemi (Beton)")
-        if not concrete_df.empty:
-            delivery_method = concrete_df.groupby('delivery_method')['quantity_m3'].sum().reset_index()
+        if concrete_agg:
             fig = px.pie(
-                delivery_method,
+                concrete_agg['delivery_method'],
                 values='quantity_m3',
                 names='delivery_method',
                 hole=0.4,
@@ -395,6 +340,491 @@ if page == "📊 Ana Sayfa":
             fig.update_layout(showlegend=False, margin=dict(t=0, b=0, l=0, r=0), height=250)
             st.plotly_chart(fig, use_container_width=True)
 
+def render_concrete_statistics(data):
+    """Quantity histogram, summary statistics and box plot"""
+    concrete_agg = data['concrete_aggregates']
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("### 📈 Miktar Dağılımı")
+        hist = concrete_agg['quantity_hist']
+        fig = px.bar(
+            hist,
+            x='bin_mid',
+            y='count',
+            title="Beton Miktar Dağılımı",
+            labels={'bin_mid': 'Miktar (m³)', 'count': 'Frekans'}
+        )
+        fig.update_traces(marker_color='#FF6B00', width=(hist['bin_end'] - hist['bin_start']).tolist())
+        st.plotly_chart(fig, use_container_width=True)
+        
+        # Statistics
+        stats = concrete_agg['quantity_stats']
+        st.markdown("**İstatistikler:**")
+        st.write(f"- **Ortalama:** {stats['mean']:.2f} m³")
+        st.write(f"- **Medyan:** {stats['median']:.2f} m³")
+        st.write(f"- **Std Sapma:** {stats['std']:.2f} m³")
+        st.write(f"- **Min:** {stats['min']:.2f} m³")
+        st.write(f"- **Max:** {stats['max']:.2f} m³")
+    
+    with col2:
+        st.markdown("### 📦 Box Plot Analizi")
+        box = concrete_agg['quantity_box']
+        fig = go.Figure()
+        for row in box.itertuples(index=False):
+            fig.add_trace(go.Box(
+                name=str(row.key),
+                q1=[row.q1],
+                median=[row.median],
+                q3=[row.q3],
+                lowerfence=[row.lowerfence],
+                upperfence=[row.upperfence]
+            ))
+        fig.update_layout(title="Beton Sınıfına Göre Miktar Dağılımı", showlegend=False)
+        st.plotly_chart(fig, use_container_width=True)
+
+# ============================================
+# BULK UPLOAD (fragments)
+# ============================================
+# Each step reruns on its own; state is shared through st.session_state['bulk_upload'].
+# Only a change of the parsed dataset triggers a full app rerun.
+
+BULK_PREVIEW_PAGE_SIZE = 50
+
+def _bulk_state():
+    """Shared state of the bulk upload workflow"""
+    if 'bulk_upload' not in st.session_state:
+        st.session_state['bulk_upload'] = {}
+    return st.session_state['bulk_upload']
+
+def _bulk_dataset_changed():
+    """Refresh sibling fragments after the parsed dataset changed"""
+    st.session_state.pop('bulk_preview_page', None)
+    # During a full run the later fragments already see the new dataset
+    if not st.session_state.get('bulk_full_run'):
+        st.rerun(scope="app")
+
+@st.fragment
+def render_bulk_delete():
+    """Data cleanup panel"""
+    with st.expander("🗑️ Veri Temizleme / Silme (Gelişmiş)", expanded=False):
+        st.warning("⚠️ Bu bölümdeki işlemler geri alınamaz! Lütfen dikkatli olun.")
+        
+        del_type = st.radio("Silinecek Veri Tipi", ["🧱 Beton", "⚙️ Demir", "🔲 Hasır"], horizontal=True, key="del_type")
+        
+        col_d1, col_d2 = st.columns(2)
+        with col_d1:
+            del_mode = st.radio("Silme Modu", ["Tarih Aralığına Göre", "Tedarikçiye Göre", "TÜMÜNÜ SİL"], key="del_mode")
+        
+        start_date = None
+        end_date = None
+        supplier_filter = None
+        
+        with col_d2:
+            if del_mode == "Tarih Aralığına Göre":
+                start_date = st.date_input("Başlangıç Tarihi", value=date.today(), key="del_start")
+                end_date = st.date_input("Bitiş Tarihi", value=date.today(), key="del_end")
+            elif del_mode == "Tedarikçiye Göre":
+                suppliers = db.get_all_suppliers()
+                supplier_filter = st.selectbox("Tedarikçi Seçin", suppliers, key="del_supp")
+            else:
+                st.error("DİKKAT: Seçilen veri tipindeki TÜM kayıtlar silinecektir!")
+        
+        confirm_delete = True
+        if del_mode == "TÜMÜNÜ SİL":
+            confirm_delete = st.checkbox("Evet, tüm verileri silmek istediğimden eminim.", key="confirm_del_all")
+
+        if st.button("🗑️ Seçilenleri Sil", type="primary", use_container_width=True):
+            # Confirmation check
+            if del_mode == "TÜMÜNÜ SİL" and not confirm_delete:
+                st.warning("Lütfen silme işlemini onaylamak için yukarıdaki kutucuğu işaretleyin.")
+                return
+            
+            result = {}
+            s_date_str = start_date.isoformat() if start_date else None
+            e_date_str = end_date.isoformat() if end_date else None
+            
+            if del_type == "🧱 Beton":
+                result = db.delete_concrete_logs(start_date=s_date_str, end_date=e_date_str, supplier=supplier_filter)
+            elif del_type == "⚙️ Demir":
+                result = db.delete_rebar_logs(start_date=s_date_str, end_date=e_date_str, supplier=supplier_filter)
+            else:
+                result = db.delete_mesh_logs(start_date=s_date_str, end_date=e_date_str, supplier=supplier_filter)
+            
+            if result.get('success'):
+                count = result.get('count', 0)
+                st.success(f"✅ İşlem Başarılı! Toplam {count} kayıt silindi.")
+                invalidate_data()
+                # Upload duplicates must be checked again against the new state
+                _bulk_state()['dup_check'] = None
+            else:
+                st.error(f"❌ Hata: {result.get('error')}")
+
+@st.fragment
+def render_bulk_upload(import_type):
+    """File upload, sheet selection and validation"""
+    state = _bulk_state()
+    uploaded_file = st.file_uploader("Excel Dosyasını Yükleyin", type=['xlsx', 'xls'])
+    
+    if not uploaded_file:
+        if state.get('signature') is not None:
+            state.clear()
+            _bulk_dataset_changed()
+        return
+    
+    try:
+        # Excel dosyasını yükle (Tüm sayfaları kontrol et)
+        xl = pd.ExcelFile(uploaded_file)
+        sheet_names = xl.sheet_names
+        
+        # Hangi sayfayı okuyacağız?
+        # Kullanıcıya seçtirme imkanı verelim
+        default_ix = 0
+        priority_sheets = ['Sayfa1', 'Sayfa 1', 'Veri', 'Data', 'Beton', 'Demir', 'Hasır']
+        for i, name in enumerate(sheet_names):
+            if any(p.lower() in name.lower() for p in priority_sheets):
+                default_ix = i
+                break
+        
+        selected_sheet = st.selectbox("Hangi Sayfadan Veri Okunsun?", sheet_names, index=default_ix)
+        
+        # Parse and validate only when the file, sheet or type changes
+        parse_key = (uploaded_file.file_id, selected_sheet, import_type)
+        if state.get('parse_key') != parse_key:
+            df = pd.read_excel(xl, sheet_name=selected_sheet)
+            
+            # Remove rows with less than 3 non-empty columns
+            original_len = len(df)
+            df = df.dropna(thresh=3)
+            
+            validator = ExcelValidator()
+            if import_type == "🧱 Beton":
+                clean_data, errors, warnings = validator.validate_concrete(df)
+            elif import_type == "⚙️ Demir":
+                clean_data, errors, warnings = validator.validate_rebar(df)
+            else:
+                clean_data, errors, warnings = validator.validate_mesh(df)
+            
+            state.update(
+                parse_key=parse_key,
+                ignored_rows=original_len - len(df),
+                row_count=len(df),
+                clean_data=clean_data,
+                errors=errors,
+                warnings=warnings
+            )
+    except Exception as e:
+        st.error(f"Dosya okuma hatası: {str(e)}")
+        return
+    
+    if state['ignored_rows']:
+        st.warning(f"⚠️ {state['ignored_rows']} adet eksik veri içeren satır (3 sütundan az veri) yoksayıldı.")
+
+    st.info(f"📄 '{selected_sheet}' sayfası okunuyor ({state['row_count']} satır)...")
+    
+    errors = state['errors']
+    warnings = state['warnings']
+    records = state['clean_data']
+
+    if errors:
+        st.error(f"❌ Dosyada {len(errors)} adet hata bulundu. Lütfen düzeltip tekrar yükleyin.")
+        with st.expander("Hata Listesi (Tıklayıp Genişletin)"):
+            for err in errors:
+                st.write(f"• {err}")
+    
+    include_warnings = False
+    if warnings:
+        st.warning(f"⚠️ {len(warnings)} adet uyarı var. Bu satırlar varsayılan olarak eklenmeyecek.")
+        with st.expander("Uyarı Listesi (İncelemek için tıklayın)"):
+            warning_df = pd.DataFrame([{'Satır': w['row'], 'Mesaj': w['message']} for w in warnings])
+            st.dataframe(warning_df, use_container_width=True)
+        
+        include_warnings = st.checkbox(f"⚠️ Uyarı verilen {len(warnings)} satırı da ekle (Onaylıyorum)", value=False, key="include_warnings")
+        if include_warnings:
+            records = records + [w['data'] for w in warnings]
+            st.info("✅ Uyarı verilen satırlar listeye eklendi.")
+
+    if not records:
+        st.warning("⚠️ Yüklenecek geçerli veri bulunamadı.")
+    else:
+        st.success(f"✅ {len(records)} adet geçerli kayıt bulundu.")
+    
+    signature = parse_key + (include_warnings,)
+    if state.get('signature') != signature:
+        state.update(signature=signature, import_type=import_type, records=records, dup_check=None)
+        _bulk_dataset_changed()
+
+@st.fragment
+def render_bulk_preview():
+    """Totals and paged preview of the parsed records"""
+    state = _bulk_state()
+    records = state.get('records')
+    if not records:
+        return
+    
+    # Calculate Total Quantity for Verification
+    df_preview = pd.DataFrame(records)
+    import_type = state['import_type']
+    
+    total_qty = 0
+    unit = ""
+    if import_type == "🧱 Beton":
+        total_qty = df_preview['quantity_m3'].sum()
+        unit = "m³"
+    elif import_type == "⚙️ Demir":
+        total_qty = df_preview['total_weight_kg'].sum()
+        unit = "kg"
+    else:
+        total_qty = df_preview['weight_kg'].sum()
+        unit = "kg"
+    
+    st.markdown(f"### 📊 Önizleme Özeti")
+    col_prev1, col_prev2 = st.columns(2)
+    with col_prev1:
+        st.metric("Tespit Edilen Toplam Miktar", f"{total_qty:,.2f} {unit}")
+    with col_prev2:
+        st.metric("Okunacak Kayıt Sayısı", f"{len(records)} adet")
+    
+    st.info("👆 Lütfen yukarıdaki toplam miktarın Excel dosyanızdaki toplamla eşleştiğini kontrol edin.")
+    
+    # Paging only reruns this fragment
+    page_count = (len(df_preview) - 1) // BULK_PREVIEW_PAGE_SIZE + 1
+    preview_page = 1
+    if page_count > 1:
+        preview_page = st.number_input(
+            f"Önizleme Sayfası (toplam {page_count})",
+            min_value=1, max_value=page_count, value=1, step=1, key="bulk_preview_page"
+        )
+    start = (preview_page - 1) * BULK_PREVIEW_PAGE_SIZE
+    st.dataframe(df_preview.iloc[start:start + BULK_PREVIEW_PAGE_SIZE], use_container_width=True)
+
+@st.fragment
+def render_bulk_review():
+    """Duplicate review and database insert"""
+    state = _bulk_state()
+    records = state.get('records')
+    if not records:
+        return
+    import_type = state['import_type']
+    
+    # Duplicate check runs once per dataset, not on every checkbox toggle
+    if state.get('dup_check') is None:
+        if import_type == "🧱 Beton":
+            state['dup_check'] = db.check_concrete_duplicates(records)
+        elif import_type == "⚙️ Demir":
+            state['dup_check'] = db.check_rebar_duplicates(records)
+        else:
+            state['dup_check'] = db.check_mesh_duplicates(records)
+    new_recs, dup_recs = state['dup_check']
+    
+    # Duplicate Check for Rebar, Mesh and Concrete
+    final_data = records
+    skip_existing = True
+    
+    if dup_recs:
+        if import_type == "⚙️ Demir":
+            st.warning(f"⚠️ {len(dup_recs)} adet mükerrer olabilecek kayıt tespit edildi (Tarih, Firma ve Miktar aynı).")
+        else:
+            st.warning(f"⚠️ {len(dup_recs)} adet mükerrer olabilecek kayıt tespit edildi (Tarih, Firma, İrsaliye ve Miktar aynı).")
+        with st.expander("Mükerrer Kayıtları İncele"):
+            st.dataframe(pd.DataFrame(dup_recs))
+        
+        dup_key = {"🧱 Beton": "dup_concrete", "⚙️ Demir": "dup_rebar"}.get(import_type, "dup_mesh")
+        if st.checkbox("Mükerrer görünen bu kayıtları da ekle (Onaylıyorum)", value=False, key=dup_key):
+            final_data = records # Insert all
+            skip_existing = False # Force insert
+            st.info("✅ Mükerrer kayıtlar da eklenecek.")
+        else:
+            final_data = new_recs # Only new
+            st.info(f"ℹ️ Sadece {len(new_recs)} yeni kayıt eklenecek.")
+    
+    if not final_data:
+        st.warning("Eklenecek yeni kayıt bulunamadı.")
+        return
+    
+    if st.button(f"🚀 {len(final_data)} Kaydı Veritabanına Aktar", type="primary"):
+        # Modern status container kullanımı
+        status = st.status("Veriler aktarılıyor...", expanded=True)
+        
+        try:
+            result = {'success': False, 'total_inserted': 0, 'failed': 0}
+            
+            if import_type == "🧱 Beton":
+                status.write("Beton verileri toplu yükleniyor...")
+                result = db.bulk_insert_concrete(final_data, skip_existing=skip_existing)
+            elif import_type == "⚙️ Demir":
+                status.write("Demir verileri toplu yükleniyor...")
+                # Use skip_existing param
+                result = db.bulk_insert_rebar(final_data, skip_existing=skip_existing)
+            else:
+                status.write("Hasır verileri toplu yükleniyor...")
+                result = db.bulk_insert_mesh(final_data, skip_existing=skip_existing)
+                
+            if result.get('success'):
+                success_count = result.get('total_inserted', 0)
+                fail_count = result.get('failed', 0)
+                skipped_count = result.get('skipped', 0)
+                
+                # İşlem bitti
+                status.update(label="İşlem Tamamlandı!", state="complete", expanded=False)
+                
+                # Sonuç mesajları ve önbellek temizliği
+                invalidate_data()
+                state['dup_check'] = None
+                
+                if fail_count == 0:
+                    msg = f"🎉 İşlem Başarılı! {success_count} yeni kayıt eklendi."
+                    if skipped_count > 0:
+                        skipped_rows = result.get('skipped_rows', [])
+                        if skipped_rows:
+                            # Sort and format row numbers
+                            skipped_rows.sort()
+                            rows_str = ", ".join(map(str, skipped_rows[:20])) # Show first 20
+                            if len(skipped_rows) > 20:
+                                rows_str += "..."
+                            msg += f" ({skipped_count} adet mükerrer kayıt atlandı. Satırlar: {rows_str})"
+                        else:
+                            msg += f" ({skipped_count} adet mükerrer kayıt atlandı)"
+                    st.success(msg)
+                    
+                    if success_count > 0:
+                        st.balloons()
+                        
+                    if st.button("Ana Sayfaya Dön ve Yenile"):
+                         st.rerun(scope="app")
+                else:
+                    st.warning(f"⚠️ İşlem Tamamlandı: {success_count} başarılı, {skipped_count} atlandı, {fail_count} başarısız.")
+                    st.error("Bazı kayıtlar eklenemedi.")
+                    if st.button("Sayfayı Yenile"):
+                         st.rerun(scope="app")
+            else:
+                status.update(label="Hata Oluştu!", state="error", expanded=False)
+                st.error(f"Toplu yükleme hatası: {result.get('error')}")
+                
+        except Exception as e:
+            status.update(label="Kritik Hata!", state="error", expanded=False)
+            st.error(f"Beklenmeyen hata: {str(e)}")
+
+# ============================================
+# ANA SAYFA
+# ============================================
+
+if page == "📊 Ana Sayfa":
+    st.title("📊 Şantiye 997 - Yönetim Paneli")
+    st.markdown("### 🏗️ Gerçek Zamanlı Malzeme Takip Sistemi")
+    
+    # First paint only needs the summaries; everything else is loaded on demand
+    summaries = loader.require('concrete_summary', 'rebar_summary', 'mesh_summary')
+    concrete_summary = summaries['concrete_summary']
+    rebar_summary = summaries['rebar_summary']
+    mesh_summary = summaries['mesh_summary']
+    
+    # ============================================
+    # MAIN KPIs
+    # ============================================
+    st.markdown("## 📈 Ana Göstergeler")
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.metric(
+            "🧱 Toplam Beton",
+            f"{concrete_summary.get('total_quantity_m3', 0):,.1f} m³",
+            delta=f"↑ {concrete_summary.get('total_deliveries', 0)} teslimat"
+        )
+    
+    with col2:
+        st.metric(
+            "⚙️ Toplam Demir",
+            f"{rebar_summary.get('total_weight_kg', 0)/1000:,.1f} ton",
+            delta=f"↑ {rebar_summary.get('total_deliveries', 0)} sevkiyat"
+        )
+    
+    with col3:
+        st.metric(
+            "🔲 Toplam Hasır",
+            f"{mesh_summary.get('total_weight_kg', 0)/1000:,.1f} ton",
+            delta=f"↑ {mesh_summary.get('total_deliveries', 0)} sevkiyat"
+        )
+    
+    st.markdown("---")
+    
+    # ============================================
+    # TIME SERIES ANALYSIS (ALL MATERIALS)
+    # ============================================
+    st.markdown("## 📅 Aylık Tüketim Trendleri")
+    
+    # Only the selected tab loads its material
+    tab1, tab2, tab3 = lazy_tabs(["🧱 Beton", "⚙️ Demir", "🔲 Hasır"], key="home_trend_tabs")
+    
+    with tab1:
+        if tab1.open:
+            concrete_agg = loader.get('concrete_aggregates')
+            if concrete_agg:
+                fig = px.bar(
+                    concrete_agg['monthly'],
+                    x='Ay',
+                    y='Toplam m³',
+                    text='Toplam m³',
+                    title='Aylık Beton Tüketimi',
+                    color='Toplam m³',
+                    color_continuous_scale='Oranges'
+                )
+                fig.update_traces(texttemplate='%{text:.0f}', textposition='outside')
+                fig.update_layout(height=400, showlegend=False)
+                st.plotly_chart(fig, use_container_width=True)
+    
+    with tab2:
+        if tab2.open:
+            rebar_agg = loader.get('rebar_aggregates')
+            if rebar_agg:
+                fig = px.area(
+                    rebar_agg['monthly'],
+                    x='year_month',
+                    y='total_weight_kg',
+                    title='Aylık Demir Alımı (kg)',
+                    labels={'year_month': 'Ay', 'total_weight_kg': 'Ağırlık (kg)'}
+                )
+                fig.update_traces(line_color='#E63946')  # fill_color is not a valid property for update_traces here
+                fig.update_layout(height=400)
+                st.plotly_chart(fig, use_container_width=True)
+            else:
+                st.info("Henüz demir verisi yok")
+            
+    with tab3:
+        if tab3.open:
+            mesh_agg = loader.get('mesh_aggregates')
+            if mesh_agg:
+                fig = px.line(
+                    mesh_agg['monthly'],
+                    x='year_month',
+                    y='weight_kg',
+                    title='Aylık Hasır Alımı (kg)',
+                    markers=True
+                )
+                fig.update_traces(line_color='#00D4FF', line_width=3)
+                fig.update_layout(height=400)
+                st.plotly_chart(fig, use_container_width=True)
+            else:
+                st.info("Henüz hasır verisi yok")
+    
+    st.markdown("---")
+    
+    # ============================================
+    # BELOW THE FOLD (loaded when opened)
+    # ============================================
+    lazy_section(
+        loader, "📊 Malzeme Dağılımları", key="home_breakdown",
+        needs=['concrete_aggregates', 'rebar_aggregates', 'mesh_aggregates'],
+        render=render_material_breakdown
+    )
+    
+    lazy_section(
+        loader, "📍 Blok ve Tedarikçi Özeti", key="home_location",
+        needs=['concrete_by_location', 'concrete_aggregates', 'concrete_summary', 'rebar_summary', 'mesh_summary'],
+        render=render_location_summary
+    )
+
 # ============================================
 # DETAYLI ANALİZLER
 # ============================================
@@ -402,14 +832,12 @@ if page == "📊 Ana Sayfa":
 elif page == "📈 Detaylı Analizler":
     st.title("📈 Detaylı İstatistiksel Analizler")
     
-    tab_beton, tab_demir, tab_hasir = st.tabs(["🧱 Beton", "⚙️ Demir", "🔲 Hasır"])
+    tab_beton, tab_demir, tab_hasir = lazy_tabs(["🧱 Beton", "⚙️ Demir", "🔲 Hasır"], key="analysis_tabs")
     
     with tab_beton:
-        concrete_df = get_cached_concrete_logs()
+        concrete_agg = loader.get('concrete_aggregates') if tab_beton.open else None
         
-        if not concrete_df.empty:
-            concrete_df['date'] = pd.to_datetime(concrete_df['date'])
-            
+        if concrete_agg:
             # Top performers
             st.markdown("## 🏆 Top Performanslar")
             
@@ -417,9 +845,8 @@ elif page == "📈 Detaylı Analizler":
             
             with col1:
                 st.markdown("### 🥇 En Çok Beton Alan Bloklar")
-                top_blocks = concrete_df.groupby('location_block')['quantity_m3'].sum().nlargest(10).reset_index()
                 fig = px.bar(
-                    top_blocks,
+                    concrete_agg['top_blocks'],
                     y='location_block',
                     x='quantity_m3',
                     orientation='h',
@@ -433,9 +860,8 @@ elif page == "📈 Detaylı Analizler":
             
             with col2:
                 st.markdown("### 📅 En Yoğun Günler")
-                busiest_days = concrete_df.groupby('date')['quantity_m3'].sum().nlargest(10).reset_index()
                 fig = px.bar(
-                    busiest_days,
+                    concrete_agg['busiest_days'],
                     x='date',
                     y='quantity_m3',
                     title="En Yoğun 10 Gün",
@@ -448,9 +874,8 @@ elif page == "📈 Detaylı Analizler":
             
             with col3:
                 st.markdown("### 🧪 Beton Sınıfları")
-                top_classes = concrete_df.groupby('concrete_class')['quantity_m3'].sum().nlargest(10).reset_index()
                 fig = px.bar(
-                    top_classes,
+                    concrete_agg['top_classes'],
                     y='concrete_class',
                     x='quantity_m3',
                     orientation='h',
@@ -465,59 +890,23 @@ elif page == "📈 Detaylı Analizler":
             st.markdown("---")
             
             # Detailed statistics
-            st.markdown("## 📊 İstatistiksel Özetler")
-            
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                st.markdown("### 📈 Miktar Dağılımı")
-                fig = px.histogram(
-                    concrete_df,
-                    x='quantity_m3',
-                    nbins=50,
-                    title="Beton Miktar Dağılımı",
-                    labels={'quantity_m3': 'Miktar (m³)', 'count': 'Frekans'}
-                )
-                fig.update_traces(marker_color='#FF6B00')
-                st.plotly_chart(fig, use_container_width=True)
-                
-                # Statistics
-                st.markdown("**İstatistikler:**")
-                st.write(f"- **Ortalama:** {concrete_df['quantity_m3'].mean():.2f} m³")
-                st.write(f"- **Medyan:** {concrete_df['quantity_m3'].median():.2f} m³")
-                st.write(f"- **Std Sapma:** {concrete_df['quantity_m3'].std():.2f} m³")
-                st.write(f"- **Min:** {concrete_df['quantity_m3'].min():.2f} m³")
-                st.write(f"- **Max:** {concrete_df['quantity_m3'].max():.2f} m³")
-            
-            with col2:
-                st.markdown("### 📦 Box Plot Analizi")
-                fig = px.box(
-                    concrete_df,
-                    y='quantity_m3',
-                    x='concrete_class',
-                    title="Beton Sınıfına Göre Miktar Dağılımı",
-                    color='concrete_class'
-                )
-                fig.update_layout(showlegend=False)
-                st.plotly_chart(fig, use_container_width=True)
-        else:
+            lazy_section(
+                loader, "📊 İstatistiksel Özetler", key="analysis_concrete_stats",
+                needs=['concrete_aggregates'],
+                render=render_concrete_statistics
+            )
+        elif tab_beton.open:
             st.info("Henüz beton verisi yok")
 
     with tab_demir:
-        rebar_df = get_cached_rebar_logs()
+        rebar_agg = loader.get('rebar_aggregates') if tab_demir.open else None
         
-        if not rebar_df.empty:
-            rebar_df['date'] = pd.to_datetime(rebar_df['date'])
-            
+        if rebar_agg:
             # Timeline
             st.markdown("### 📅 Zaman İçinde Demir Alımı")
             
-            # Group by month
-            rebar_df['year_month'] = rebar_df['date'].dt.to_period('M').astype(str)
-            monthly_rebar = rebar_df.groupby('year_month')['total_weight_kg'].sum().reset_index()
-            
             fig = px.bar(
-                monthly_rebar,
+                rebar_agg['monthly'],
                 x='year_month',
                 y='total_weight_kg',
                 title="Aylık Demir Alımı (kg)",
@@ -533,10 +922,9 @@ elif page == "📈 Detaylı Analizler":
             
             with col1:
                 st.markdown("### 🏢 Tedarikçi Dağılımı")
-                if 'supplier' in rebar_df.columns:
-                    supplier_rebar = rebar_df.groupby('supplier')['total_weight_kg'].sum().reset_index()
+                if 'supplier_dist' in rebar_agg:
                     fig = px.pie(
-                        supplier_rebar,
+                        rebar_agg['supplier_dist'],
                         values='total_weight_kg',
                         names='supplier',
                         title="Tedarikçiye Göre Ağırlık",
@@ -547,40 +935,31 @@ elif page == "📈 Detaylı Analizler":
             
             with col2:
                 st.markdown("### 📏 Çap Bazlı Kullanım")
-                # Calculate totals for each diameter
-                diameter_cols = [c for c in rebar_df.columns if c.startswith('q') and c.endswith('_kg')]
-                if diameter_cols:
-                    diameter_totals = rebar_df[diameter_cols].sum().reset_index()
-                    diameter_totals.columns = ['Çap', 'Ağırlık (kg)']
-                    # Format diameter labels (q8_kg -> Ø8)
-                    diameter_totals['Çap'] = diameter_totals['Çap'].apply(lambda x: f"Ø{x.split('_')[0][1:]}")
-                    
+                if 'diameter_totals' in rebar_agg:
                     fig = px.bar(
-                        diameter_totals,
+                        rebar_agg['diameter_totals'],
                         x='Çap',
-                        y='Ağırlık (kg)',
+                        y='Ağırlık',
                         title="Çaplara Göre Toplam Ağırlık",
-                        color='Ağırlık (kg)',
-                        color_continuous_scale='Viridis'
+                        color='Ağırlık',
+                        color_continuous_scale='Viridis',
+                        labels={'Ağırlık': 'Ağırlık (kg)'}
                     )
                     st.plotly_chart(fig, use_container_width=True)
-        else:
+        elif tab_demir.open:
             st.info("Henüz demir verisi yok")
     
     with tab_hasir:
-        mesh_df = get_cached_mesh_logs()
+        mesh_agg = loader.get('mesh_aggregates') if tab_hasir.open else None
         
-        if not mesh_df.empty:
-            mesh_df['date'] = pd.to_datetime(mesh_df['date'])
-            
+        if mesh_agg:
             col1, col2 = st.columns(2)
             
             with col1:
                 st.markdown("### 🔷 Hasır Tipi Dağılımı")
-                if 'mesh_type' in mesh_df.columns:
-                    type_mesh = mesh_df.groupby('mesh_type')['weight_kg'].sum().reset_index()
+                if 'type_dist' in mesh_agg:
                     fig = px.pie(
-                        type_mesh,
+                        mesh_agg['type_dist'],
                         values='weight_kg',
                         names='mesh_type',
                         title="Hasır Tipine Göre Ağırlık",
@@ -591,10 +970,9 @@ elif page == "📈 Detaylı Analizler":
             
             with col2:
                 st.markdown("### 🏢 Tedarikçi Dağılımı")
-                if 'supplier' in mesh_df.columns:
-                    supplier_mesh = mesh_df.groupby('supplier')['weight_kg'].sum().reset_index()
+                if 'supplier_dist' in mesh_agg:
                     fig = px.bar(
-                        supplier_mesh,
+                        mesh_agg['supplier_dist'],
                         x='supplier',
                         y='weight_kg',
                         title="Tedarikçiye Göre Ağırlık",
@@ -606,11 +984,8 @@ elif page == "📈 Detaylı Analizler":
             st.markdown("---")
             
             st.markdown("### 📅 Zaman İçinde Hasır Alımı")
-            mesh_df['year_month'] = mesh_df['date'].dt.to_period('M').astype(str)
-            monthly_mesh = mesh_df.groupby('year_month')['weight_kg'].sum().reset_index()
-            
             fig = px.line(
-                monthly_mesh,
+                mesh_agg['monthly'],
                 x='year_month',
                 y='weight_kg',
                 title="Aylık Hasır Alımı (kg)",
@@ -618,7 +993,7 @@ elif page == "📈 Detaylı Analizler":
             )
             fig.update_traces(line_color='#00D4FF', line_width=3)
             st.plotly_chart(fig, use_container_width=True)
-        else:
+        elif tab_hasir.open:
             st.info("Henüz hasır verisi yok")
 
 # ============================================
@@ -662,7 +1037,7 @@ elif page == "🧱 Beton Girişi":
             
             if db.add_concrete(data):
                 # Clear cache after update
-                st.cache_data.clear()
+                invalidate_data()
                 st.success("✅ Kayıt eklendi! Önbellek temizlendi.")
                 st.rerun()
 
@@ -757,7 +1132,7 @@ elif page == "⚙️ Demir Girişi":
                 }
                 
                 if db.add_rebar(data):
-                    st.cache_data.clear()  # Clear cache
+                    invalidate_data()  # Clear cache
                     st.success(f"✅ {toplam_kg:,.0f} kg demir kaydı başarıyla eklendi!")
                     st.balloons()
                     st.rerun()
@@ -767,8 +1142,8 @@ elif page == "⚙️ Demir Girişi":
     st.markdown("### 📋 Son Kayıtlar")
     recent_rebar = get_cached_rebar_logs()
     if not recent_rebar.empty:
-        recent_rebar['date'] = pd.to_datetime(recent_rebar['date'])
-        recent_rebar = recent_rebar.sort_values('date', ascending=False).head(10)
+        # Logs already carry datetime dates; take the newest rows without touching the cached frame
+        recent_rebar = recent_rebar.nlargest(10, 'date')
         
         # Display summary
         display_cols = ['date', 'supplier', 'irsaliye_no', 'etap', 'total_weight_kg']
@@ -874,7 +1249,7 @@ elif page == "🔲 Hasır Girişi":
                 }
                 
                 if db.add_mesh(data):
-                    st.cache_data.clear()  # Clear cache
+                    invalidate_data()  # Clear cache
                     st.success(f"✅ {adet} adet hasır kaydı ({agirlik:.1f} kg) başarıyla eklendi!")
                     st.balloons()
                     st.rerun()
@@ -884,8 +1259,7 @@ elif page == "🔲 Hasır Girişi":
     st.markdown("### 📋 Son Kayıtlar")
     recent_mesh = get_cached_mesh_logs()
     if not recent_mesh.empty:
-        recent_mesh['date'] = pd.to_datetime(recent_mesh['date'])
-        recent_mesh = recent_mesh.sort_values('date', ascending=False).head(10)
+        recent_mesh = recent_mesh.nlargest(10, 'date')
         
         # Display summary
         display_cols = ['date', 'supplier', 'irsaliye_no', 'mesh_type', 'piece_count', 'weight_kg', 'kullanim_yeri']
@@ -926,57 +1300,7 @@ elif page == "📂 Toplu Excel Yükleme":
     import_type = st.radio("Yüklenecek Veri Tipi", ["🧱 Beton", "⚙️ Demir", "🔲 Hasır"], horizontal=True)
     
     # Veri Temizleme Bölümü
-    with st.expander("🗑️ Veri Temizleme / Silme (Gelişmiş)", expanded=False):
-        st.warning("⚠️ Bu bölümdeki işlemler geri alınamaz! Lütfen dikkatli olun.")
-        
-        del_type = st.radio("Silinecek Veri Tipi", ["🧱 Beton", "⚙️ Demir", "🔲 Hasır"], horizontal=True, key="del_type")
-        
-        col_d1, col_d2 = st.columns(2)
-        with col_d1:
-            del_mode = st.radio("Silme Modu", ["Tarih Aralığına Göre", "Tedarikçiye Göre", "TÜMÜNÜ SİL"], key="del_mode")
-        
-        start_date = None
-        end_date = None
-        supplier_filter = None
-        
-        with col_d2:
-            if del_mode == "Tarih Aralığına Göre":
-                start_date = st.date_input("Başlangıç Tarihi", value=date.today(), key="del_start")
-                end_date = st.date_input("Bitiş Tarihi", value=date.today(), key="del_end")
-            elif del_mode == "Tedarikçiye Göre":
-                suppliers = db.get_all_suppliers()
-                supplier_filter = st.selectbox("Tedarikçi Seçin", suppliers, key="del_supp")
-            else:
-                st.error("DİKKAT: Seçilen veri tipindeki TÜM kayıtlar silinecektir!")
-        
-        confirm_delete = True
-        if del_mode == "TÜMÜNÜ SİL":
-            confirm_delete = st.checkbox("Evet, tüm verileri silmek istediğimden eminim.", key="confirm_del_all")
-
-        if st.button("🗑️ Seçilenleri Sil", type="primary", use_container_width=True):
-            # Confirmation check
-            if del_mode == "TÜMÜNÜ SİL" and not confirm_delete:
-                st.warning("Lütfen silme işlemini onaylamak için yukarıdaki kutucuğu işaretleyin.")
-                st.stop()
-            
-            result = {}
-            s_date_str = start_date.isoformat() if start_date else None
-            e_date_str = end_date.isoformat() if end_date else None
-            
-            if del_type == "🧱 Beton":
-                result = db.delete_concrete_logs(start_date=s_date_str, end_date=e_date_str, supplier=supplier_filter)
-            elif del_type == "⚙️ Demir":
-                result = db.delete_rebar_logs(start_date=s_date_str, end_date=e_date_str, supplier=supplier_filter)
-            else:
-                result = db.delete_mesh_logs(start_date=s_date_str, end_date=e_date_str, supplier=supplier_filter)
-            
-            if result.get('success'):
-                count = result.get('count', 0)
-                st.success(f"✅ İşlem Başarılı! Toplam {count} kayıt silindi.")
-                st.cache_data.clear()
-                # st.rerun() # Rerun immediately
-            else:
-                st.error(f"❌ Hata: {result.get('error')}")
+    render_bulk_delete()
 
     validator = ExcelValidator()
     
@@ -1005,247 +1329,51 @@ elif page == "📂 Toplu Excel Yükleme":
         help="Bu dosyayı Excel ile açıp doldurabilirsiniz. Farklı kaydederken .xlsx seçebilirsiniz."
     )
 
-    uploaded_file = st.file_uploader("Excel Dosyasını Yükleyin", type=['xlsx', 'xls'])
-
-    if uploaded_file:
-        try:
-            # Excel dosyasını yükle (Tüm sayfaları kontrol et)
-            xl = pd.ExcelFile(uploaded_file)
-            sheet_names = xl.sheet_names
-            
-            # Hangi sayfayı okuyacağız?
-            # Kullanıcıya seçtirme imkanı verelim
-            default_ix = 0
-            priority_sheets = ['Sayfa1', 'Sayfa 1', 'Veri', 'Data', 'Beton', 'Demir', 'Hasır']
-            for i, name in enumerate(sheet_names):
-                if any(p.lower() in name.lower() for p in priority_sheets):
-                    default_ix = i
-                    break
-            
-            selected_sheet = st.selectbox("Hangi Sayfadan Veri Okunsun?", sheet_names, index=default_ix)
-            
-            df = pd.read_excel(uploaded_file, sheet_name=selected_sheet)
-            
-            # Remove rows with less than 3 non-empty columns
-            original_len = len(df)
-            df = df.dropna(thresh=3)
-            filtered_len = len(df)
-            
-            if original_len != filtered_len:
-                st.warning(f"⚠️ {original_len - filtered_len} adet eksik veri içeren satır (3 sütundan az veri) yoksayıldı.")
-
-            st.info(f"📄 '{selected_sheet}' sayfası okunuyor ({len(df)} satır)...")
-
-            clean_data = []
-            errors = []
-            warnings = []
-
-            if import_type == "🧱 Beton":
-                clean_data, errors, warnings = validator.validate_concrete(df)
-            elif import_type == "⚙️ Demir":
-                clean_data, errors, warnings = validator.validate_rebar(df)
-            else:
-                clean_data, errors, warnings = validator.validate_mesh(df)
-
-            if errors:
-                st.error(f"❌ Dosyada {len(errors)} adet hata bulundu. Lütfen düzeltip tekrar yükleyin.")
-                with st.expander("Hata Listesi (Tıklayıp Genişletin)"):
-                    for err in errors:
-                        st.write(f"• {err}")
-            
-            if warnings:
-                st.warning(f"⚠️ {len(warnings)} adet uyarı var. Bu satırlar varsayılan olarak eklenmeyecek.")
-                with st.expander("Uyarı Listesi (İncelemek için tıklayın)"):
-                    warning_df = pd.DataFrame([{'Satır': w['row'], 'Mesaj': w['message']} for w in warnings])
-                    st.dataframe(warning_df, use_container_width=True)
-                
-                if st.checkbox(f"⚠️ Uyarı verilen {len(warnings)} satırı da ekle (Onaylıyorum)", value=False, key="include_warnings"):
-                    for w in warnings:
-                        clean_data.append(w['data'])
-                    st.info("✅ Uyarı verilen satırlar listeye eklendi.")
-
-            if not clean_data:
-                st.warning("⚠️ Yüklenecek geçerli veri bulunamadı.")
-            else:
-                st.success(f"✅ {len(clean_data)} adet geçerli kayıt bulundu.")            
-                # Calculate Total Quantity for Verification
-                df_preview = pd.DataFrame(clean_data)
-                
-                total_qty = 0
-                unit = ""
-                if import_type == "🧱 Beton":
-                    total_qty = df_preview['quantity_m3'].sum()
-                    unit = "m³"
-                elif import_type == "⚙️ Demir":
-                    total_qty = df_preview['total_weight_kg'].sum()
-                    unit = "kg"
-                else:
-                    total_qty = df_preview['weight_kg'].sum()
-                    unit = "kg"
-                
-                st.markdown(f"### 📊 Önizleme Özeti")
-                col_prev1, col_prev2 = st.columns(2)
-                with col_prev1:
-                    st.metric("Tespit Edilen Toplam Miktar", f"{total_qty:,.2f} {unit}")
-                with col_prev2:
-                    st.metric("Okunacak Kayıt Sayısı", f"{len(clean_data)} adet")
-                
-                st.info("👆 Lütfen yukarıdaki toplam miktarın Excel dosyanızdaki toplamla eşleştiğini kontrol edin.")
-                
-                st.markdown("#### İlk 5 Kayıt:")
-                st.dataframe(df_preview.head(), use_container_width=True)
-                
-                # Duplicate Check for Rebar, Mesh and Concrete
-                final_data = clean_data
-                skip_existing = True
-                
-                if import_type == "🧱 Beton":
-                    new_recs, dup_recs = db.check_concrete_duplicates(clean_data)
-                    if dup_recs:
-                        st.warning(f"⚠️ {len(dup_recs)} adet mükerrer olabilecek kayıt tespit edildi (Tarih, Firma, İrsaliye ve Miktar aynı).")
-                        with st.expander("Mükerrer Kayıtları İncele"):
-                            st.dataframe(pd.DataFrame(dup_recs))
-                        
-                        if st.checkbox("Mükerrer görünen bu kayıtları da ekle (Onaylıyorum)", value=False, key="dup_concrete"):
-                            final_data = clean_data # Insert all
-                            skip_existing = False # Force insert
-                            st.info("✅ Mükerrer kayıtlar da eklenecek.")
-                        else:
-                            final_data = new_recs # Only new
-                            st.info(f"ℹ️ Sadece {len(new_recs)} yeni kayıt eklenecek.")
-
-                elif import_type == "⚙️ Demir":
-                    new_recs, dup_recs = db.check_rebar_duplicates(clean_data)
-                    if dup_recs:
-                        st.warning(f"⚠️ {len(dup_recs)} adet mükerrer olabilecek kayıt tespit edildi (Tarih, Firma ve Miktar aynı).")
-                        with st.expander("Mükerrer Kayıtları İncele"):
-                            st.dataframe(pd.DataFrame(dup_recs))
-                        
-                        if st.checkbox("Mükerrer görünen bu kayıtları da ekle (Onaylıyorum)", value=False, key="dup_rebar"):
-                            final_data = clean_data # Insert all
-                            skip_existing = False # Force insert
-                            st.info("✅ Mükerrer kayıtlar da eklenecek.")
-                        else:
-                            final_data = new_recs # Only new
-                            st.info(f"ℹ️ Sadece {len(new_recs)} yeni kayıt eklenecek.")
-                
-                elif import_type == "🔲 Hasır":
-                    new_recs, dup_recs = db.check_mesh_duplicates(clean_data)
-                    if dup_recs:
-                        st.warning(f"⚠️ {len(dup_recs)} adet mükerrer olabilecek kayıt tespit edildi (Tarih, Firma, İrsaliye ve Miktar aynı).")
-                        with st.expander("Mükerrer Kayıtları İncele"):
-                            st.dataframe(pd.DataFrame(dup_recs))
-                        
-                        if st.checkbox("Mükerrer görünen bu kayıtları da ekle (Onaylıyorum)", value=False, key="dup_mesh"):
-                            final_data = clean_data # Insert all
-                            skip_existing = False # Force insert
-                            st.info("✅ Mükerrer kayıtlar da eklenecek.")
-                        else:
-                            final_data = new_recs # Only new
-                            st.info(f"ℹ️ Sadece {len(new_recs)} yeni kayıt eklenecek.")
-                
-                if final_data:
-                    if st.button(f"🚀 {len(final_data)} Kaydı Veritabanına Aktar", type="primary"):
-                        # Modern status container kullanımı
-                        status = st.status("Veriler aktarılıyor...", expanded=True)
-                        
-                        try:
-                            result = {'success': False, 'total_inserted': 0, 'failed': 0}
-                            
-                            if import_type == "🧱 Beton":
-                                status.write("Beton verileri toplu yükleniyor...")
-                                result = db.bulk_insert_concrete(final_data, skip_existing=skip_existing)
-                            elif import_type == "⚙️ Demir":
-                                status.write("Demir verileri toplu yükleniyor...")
-                                # Use skip_existing param
-                                result = db.bulk_insert_rebar(final_data, skip_existing=skip_existing)
-                            else:
-                                status.write("Hasır verileri toplu yükleniyor...")
-                                result = db.bulk_insert_mesh(final_data, skip_existing=skip_existing)
-                                
-                            if result.get('success'):
-                                success_count = result.get('total_inserted', 0)
-                                fail_count = result.get('failed', 0)
-                                skipped_count = result.get('skipped', 0)
-                                
-                                # İşlem bitti
-                                status.update(label="İşlem Tamamlandı!", state="complete", expanded=False)
-                                
-                                # Sonuç mesajları ve önbellek temizliği
-                                st.cache_data.clear()
-                                
-                                if fail_count == 0:
-                                    msg = f"🎉 İşlem Başarılı! {success_count} yeni kayıt eklendi."
-                                    if skipped_count > 0:
-                                        skipped_rows = result.get('skipped_rows', [])
-                                        if skipped_rows:
-                                            # Sort and format row numbers
-                                            skipped_rows.sort()
-                                            rows_str = ", ".join(map(str, skipped_rows[:20])) # Show first 20
-                                            if len(skipped_rows) > 20:
-                                                rows_str += "..."
-                                            msg += f" ({skipped_count} adet mükerrer kayıt atlandı. Satırlar: {rows_str})"
-                                        else:
-                                            msg += f" ({skipped_count} adet mükerrer kayıt atlandı)"
-                                    st.success(msg)
-                                    
-                                    if success_count > 0:
-                                        st.balloons()
-                                        
-                                    if st.button("Ana Sayfaya Dön ve Yenile"):
-                                         st.rerun()
-                                else:
-                                    st.warning(f"⚠️ İşlem Tamamlandı: {success_count} başarılı, {skipped_count} atlandı, {fail_count} başarısız.")
-                                    st.error("Bazı kayıtlar eklenemedi.")
-                                    if st.button("Sayfayı Yenile"):
-                                         st.rerun()
-                            else:
-                                status.update(label="Hata Oluştu!", state="error", expanded=False)
-                                st.error(f"Toplu yükleme hatası: {result.get('error')}")
-                                
-                        except Exception as e:
-                            status.update(label="Kritik Hata!", state="error", expanded=False)
-                            st.error(f"Beklenmeyen hata: {str(e)}")
-                else:
-                    st.warning("Eklenecek yeni kayıt bulunamadı.")
-
-
-        except Exception as e:
-            st.error(f"Dosya okuma hatası: {str(e)}")
+    # Upload -> preview -> duplicate review/insert, each rerunning independently
+    st.session_state['bulk_full_run'] = True
+    render_bulk_upload(import_type)
+    st.session_state['bulk_full_run'] = False
+    render_bulk_preview()
+    render_bulk_review()
 
 elif page == "📋 Veri Tabloları":
     st.title("📋 Tüm Kayıtlar")
     
-    tab1, tab2, tab3 = st.tabs(["🧱 Beton", "⚙️ Demir", "🔲 Hasır"])
+    tab1, tab2, tab3 = lazy_tabs(["🧱 Beton", "⚙️ Demir", "🔲 Hasır"], key="table_tabs")
+    today = datetime.now().strftime('%Y%m%d')
     
     with tab1:
-        with st.spinner('Veriler yükleniyor...'):
-            concrete_df = get_cached_concrete_logs()
-        if not concrete_df.empty:
-            st.dataframe(concrete_df, use_container_width=True, height=600)
-            
-            # Download button
-            csv = concrete_df.to_csv(index=False).encode('utf-8-sig')
-            st.download_button(
-                label="📥 CSV İndir",
-                data=csv,
-                file_name=f"beton_kayitlari_{datetime.now().strftime('%Y%m%d')}.csv",
-                mime="text/csv"
+        if tab1.open:
+            paged_table(
+                key="table_concrete",
+                fetch_page=logs_page_fetcher('concrete_logs'),
+                sort_columns={'Tarih': 'date', 'Miktar (m³)': 'quantity_m3', 'Tedarikçi': 'supplier',
+                              'İrsaliye No': 'waybill_no', 'Beton Sınıfı': 'concrete_class', 'Blok': 'location_block'},
+                export=logs_csv_exporter('concrete_logs'),
+                file_name=f"beton_kayitlari_{today}.csv",
+                empty_message="Henüz beton kaydı yok"
             )
-        else:
-            st.info("Henüz beton kaydı yok")
     
     with tab2:
-        rebar_df = get_cached_rebar_logs()
-        if not rebar_df.empty:
-            st.dataframe(rebar_df, use_container_width=True, height=600)
-        else:
-            st.info("Henüz demir kaydı yok")
+        if tab2.open:
+            paged_table(
+                key="table_rebar",
+                fetch_page=logs_page_fetcher('rebar_logs'),
+                sort_columns={'Tarih': 'date', 'Toplam Ağırlık (kg)': 'total_weight_kg', 'Tedarikçi': 'supplier',
+                              'İrsaliye No': 'waybill_no', 'Etap': 'project_stage'},
+                export=logs_csv_exporter('rebar_logs'),
+                file_name=f"demir_kayitlari_{today}.csv",
+                empty_message="Henüz demir kaydı yok"
+            )
     
     with tab3:
-        mesh_df = get_cached_mesh_logs()
-        if not mesh_df.empty:
-            st.dataframe(mesh_df, use_container_width=True, height=600)
-        else:
-            st.info("Henüz hasır kaydı yok")
-
+        if tab3.open:
+            paged_table(
+                key="table_mesh",
+                fetch_page=logs_page_fetcher('mesh_logs'),
+                sort_columns={'Tarih': 'date', 'Ağırlık (kg)': 'weight_kg', 'Tedarikçi': 'supplier',
+                              'İrsaliye No': 'waybill_no', 'Hasır Tipi': 'mesh_type'},
+                export=logs_csv_exporter('mesh_logs'),
+                file_name=f"hasir_kayitlari_{today}.csv",
+                empty_message="Henüz hasır kaydı yok"
+            )
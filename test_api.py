@@ -1,14 +1,31 @@
+import os
+
+# Never open the checked-in santiye_997.db: the app's default engines point at the test file too
+# (a connection alone switches the file to WAL and rewrites its header)
+os.environ["DATABASE_URL"] = "sqlite:///./test_santiye.db"
+
 import pytest
 from fastapi.testclient import TestClient
 from main import app
-from database import Base, engine, get_db
-from sqlalchemy import create_engine
+from database import Base, engine, get_db, get_read_db, create_db_engine
+from database_async import get_async_db
+from config import settings
+from response_cache import bump_data_version
+from schemas import HasirResponse
+from middleware import RateLimiter, MemoryBucketStore, SQLiteBucketStore
+import metrics
+from query_profiler import profiler
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 
 # Test database
 TEST_DATABASE_URL = "sqlite:///./test_santiye.db"
-test_engine = create_engine(TEST_DATABASE_URL, connect_args={"check_same_thread": False})
+test_engine = create_db_engine(TEST_DATABASE_URL)
+test_read_engine = create_db_engine(TEST_DATABASE_URL, read_only=True)
 TestSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
+TestReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=test_read_engine)
 
 def override_get_db():
     db = TestSessionLocal()
@@ -17,15 +34,38 @@ def override_get_db():
     finally:
         db.close()
 
+def override_get_read_db():
+    db = TestReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+# Async (v2) endpoints use the same file through aiosqlite
+test_async_engine = create_async_engine("sqlite+aiosqlite:///./test_santiye.db", poolclass=NullPool)
+TestAsyncSessionLocal = async_sessionmaker(test_async_engine, expire_on_commit=False)
+
+async def override_get_async_db():
+    async with TestAsyncSessionLocal() as db:
+        yield db
+
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_read_db] = override_get_read_db
+app.dependency_overrides[get_async_db] = override_get_async_db
 
 client = TestClient(app)
 
+@pytest.fixture
+def admin_headers(monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "test-admin")
+    return {"X-Admin-Token": "test-admin"}
+
 @pytest.fixture(autouse=True)
 def setup_database():
     Base.metadata.create_all(bind=test_engine)
     yield
     Base.metadata.drop_all(bind=test_engine)
+    bump_data_version()  # schema reset bypasses the session write hooks
 
 def test_read_root():
     response = client.get("/")
@@ -94,7 +134,611 @@ def test_summary_stats():
     assert "total_records" in data
     assert "total_quantities" in data
 
+def test_async_beton_crud():
+    beton_data = {
+        "tarih": "2025-11-20T10:00:00",
+        "firma": "",
+        "irsaliye_no": "15001",
+        "beton_sinifi": "C30",
+        "teslim_sekli": "POMPALI",
+        "miktar": 12.0,
+        "blok": "A1"
+    }
+    response = client.post("/api/v2/beton/", json=beton_data)
+    assert response.status_code == 200
+    created = response.json()
+    assert created["firma"] == "ALBAYRAK BETON"
+
+    response = client.get(f"/api/v2/beton/{created['id']}")
+    assert response.status_code == 200
+    assert response.json()["miktar"] == 12.0
+
+    response = client.delete(f"/api/v2/beton/{created['id']}")
+    assert response.status_code == 200
+    assert client.get(f"/api/v2/beton/{created['id']}").status_code == 404
+
+def test_async_analytics_match_sync():
+    client.post("/api/beton/", json={
+        "tarih": "2025-11-20T10:00:00", "firma": "X", "irsaliye_no": "100",
+        "beton_sinifi": "C25", "teslim_sekli": "POMPALI", "miktar": 10.0, "blok": ""
+    })
+    client.post("/api/hasir/", json={
+        "tarih": "2025-11-21T10:00:00", "firma": "DOFER", "hasir_tipi": "Q131", "agirlik": 500.0
+    })
+
+    assert client.get("/api/v2/analytics/dashboard").json() == client.get("/api/analytics/dashboard").json()
+    assert client.get("/api/v2/analytics/summary").json() == client.get("/api/analytics/summary").json()
+    assert client.get("/api/v2/analytics/beton/by-date").json() == client.get("/api/analytics/beton/by-date").json()
+
+def test_sqlite_engine_profile():
+    with test_engine.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1  # NORMAL
+    with test_read_engine.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA query_only").scalar() == 1
+
+def test_reads_not_blocked_by_open_write():
+    client.post("/api/hasir/", json={"tarih": "2025-11-21T10:00:00", "firma": "DOFER", "agirlik": 100.0})
+    # Hold the write lock as a long-running import would
+    with test_engine.connect() as conn:
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+        conn.exec_driver_sql("INSERT INTO hasir (firma, agirlik) VALUES ('X', 1)")
+        response = client.get("/api/analytics/summary")
+        assert response.status_code == 200
+        assert response.json()["total_records"]["hasir"] == 1
+        conn.exec_driver_sql("ROLLBACK")
+
+def test_bulk_create_update_delete_beton():
+    items = [
+        {"tarih": "2025-11-20T10:00:00", "firma": "", "irsaliye_no": str(15000 + i),
+         "beton_sinifi": "C30", "teslim_sekli": "POMPALI", "miktar": 10.0 + i}
+        for i in range(3)
+    ]
+    response = client.post("/api/beton/bulk", json=items)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["created"] == 3
+    ids = [r["id"] for r in data["results"]]
+    assert [client.get(f"/api/beton/{i}").json()["irsaliye_no"] for i in ids] == [item["irsaliye_no"] for item in items]
+    assert client.get(f"/api/beton/{ids[0]}").json()["firma"] == "ALBAYRAK BETON"
+
+    response = client.patch("/api/beton/bulk", json=[
+        {"id": ids[0], "miktar": 99.0},
+        {"id": ids[1], "irsaliye_no": "100"},
+        {"id": 999999, "miktar": 1.0}
+    ])
+    assert response.status_code == 200
+    data = response.json()
+    assert [r["status"] for r in data["results"]] == ["updated", "updated", "not_found"]
+    assert client.get(f"/api/beton/{ids[0]}").json()["miktar"] == 99.0
+    assert client.get(f"/api/beton/{ids[1]}").json()["firma"] == "ÖZYURT BETON"
+
+    response = client.request("DELETE", "/api/beton/bulk", json={"ids": [ids[0], 999999]})
+    assert [r["status"] for r in response.json()["results"]] == ["deleted", "not_found"]
+
+    response = client.request("DELETE", "/api/beton/bulk", json={"tarih_baslangic": "2025-11-01T00:00:00"})
+    assert response.json()["deleted"] == 2
+
+def test_bulk_create_rejects_invalid_items():
+    response = client.post("/api/hasir/bulk", json=[
+        {"tarih": "2025-11-21T10:00:00", "firma": "DOFER", "agirlik": 100.0},
+        {"tarih": "2025-11-21T10:00:00", "firma": "DOFER"}
+    ])
+    assert response.status_code == 422
+    assert response.json()["detail"]["results"][0]["index"] == 1
+    assert client.get("/api/hasir/").json() == []
+
+def test_analytics_conditional_get():
+    first = client.get("/api/analytics/summary")
+    etag = first.headers["etag"]
+    assert first.headers["x-cache"] == "MISS"
+    assert client.get("/api/analytics/summary").headers["x-cache"] == "HIT"
+
+    response = client.get("/api/analytics/summary", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    response = client.get("/api/analytics/summary", headers={"If-Modified-Since": first.headers["last-modified"]})
+    assert response.status_code == 304
+
+    # Another worker / a restart counts versions from 0 again; its ETags must not match
+    import response_cache
+    boot_id = response_cache.BOOT_ID
+    response_cache.BOOT_ID = "0therb00"
+    try:
+        assert client.get("/api/analytics/summary", headers={"If-None-Match": etag}).status_code == 200
+    finally:
+        response_cache.BOOT_ID = boot_id
+
+    # CORS wraps the cache: HITs and 304s carry the headers too
+    origin = {"Origin": "https://panel.example.com"}
+    hit = client.get("/api/analytics/summary", headers=origin)
+    not_modified = client.get("/api/analytics/summary", headers={**origin, "If-None-Match": etag})
+    assert (hit.headers["x-cache"], not_modified.status_code) == ("HIT", 304)
+    assert hit.headers["access-control-allow-origin"] and not_modified.headers["access-control-allow-origin"]
+
+    client.post("/api/hasir/bulk", json=[{"tarih": "2025-11-21T10:00:00", "firma": "DOFER", "agirlik": 100.0}])
+    response = client.get("/api/analytics/summary", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert response.json()["total_records"]["hasir"] == 1
+
+def test_list_fast_path_matches_schema_and_compresses():
+    client.post("/api/hasir/bulk", json=[
+        {"tarih": "2025-11-21T10:00:00", "firma": "DOFER", "irsaliye_no": f"H-{i}", "agirlik": 100.5 + i}
+        for i in range(30)
+    ])
+    response = client.get("/api/hasir/", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    rows = response.json()
+    assert len(rows) == 30
+    assert rows == [HasirResponse.model_validate(row).model_dump(mode="json") for row in rows]
+    assert client.get("/api/v2/hasir/").json() == rows
+
+def test_rate_limiter_token_bucket_and_eviction():
+    now = [1000.0]
+    store = MemoryBucketStore(max_clients=2)
+    limiter = RateLimiter(requests_per_minute=60, route_limits={"/api/import/": 2}, store=store, clock=lambda: now[0])
+
+    assert [limiter.is_allowed("1.1.1.1", "/api/import/beton") for _ in range(3)] == [True, True, False]
+    assert limiter.is_allowed("1.1.1.1", "/api/beton/")  # route buckets are separate
+    allowed, retry_after = limiter.check("1.1.1.1", "/api/import/beton")
+    assert not allowed and retry_after == pytest.approx(30.0)
+    now[0] += 30
+    assert limiter.is_allowed("1.1.1.1", "/api/import/beton")
+
+    limiter.is_allowed("2.2.2.2")
+    limiter.is_allowed("3.3.3.3")
+    assert len(store) == 2  # LRU bound
+
+def test_rate_limiter_sqlite_store_is_shared(tmp_path):
+    path = str(tmp_path / "rate_limit.db")
+    workers = [RateLimiter(requests_per_minute=3, store=SQLiteBucketStore(path)) for _ in range(2)]
+    results = [workers[i % 2].is_allowed("1.1.1.1") for i in range(4)]
+    assert results == [True, True, True, False]
+
+def test_metrics_endpoint():
+    before = metrics.db_queries_per_request.count()
+    client.get("/api/beton/1")
+    client.get("/api/beton/2")
+    client.get("/api/v2/analytics/summary")
+    assert metrics.http_requests_total.value(method="GET", route="/api/beton/{beton_id}", status="404") >= 2
+    assert metrics.db_queries_per_request.count() == before + 3
+
+    body = client.get("/metrics").text
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/api/beton/{beton_id}",le="+Inf"}' in body
+    assert "http_requests_in_flight 0" in body
+    assert "response_cache_hit_ratio" in body
+
+def test_query_profiler_slow_log_and_admin(admin_headers):
+    profiler.reset()
+    profiler.slow_ms, saved_threshold = 0.0, profiler.slow_ms
+    profiler.install()
+    try:
+        client.post("/api/hasir/bulk", json=[{"tarih": "2025-11-21T10:00:00", "firma": "DOFER", "agirlik": 100.0}])
+        response = client.get("/api/analytics/dashboard")
+        assert int(response.headers["x-query-count"]) >= 3
+
+        data = client.get("/api/admin/slow-queries", params={"sort_by": "count"}, headers=admin_headers).json()
+        assert data["enabled"] and data["queries"]
+        select_entry = next(q for q in data["queries"] if q["statement"].startswith("SELECT"))
+        assert select_entry["explain"]  # EXPLAIN QUERY PLAN captured for slow SELECTs
+
+        profiles = client.get("/api/admin/query-profiles", headers=admin_headers).json()["requests"]
+        assert profiles[0]["path"] == "/api/analytics/dashboard"
+        assert profiles[0]["query_count"] == int(response.headers["x-query-count"])
+        assert client.get("/api/admin/slow-queries", params={"sort_by": "x"}, headers=admin_headers).status_code == 400
+    finally:
+        profiler.uninstall()
+        profiler.slow_ms = saved_threshold
+        profiler.reset()
+
+def test_summary_single_query_with_filters():
+    client.post("/api/beton/bulk", json=[
+        {"tarih": "2025-11-20T10:00:00", "firma": "X", "irsaliye_no": "100", "beton_sinifi": "C30",
+         "teslim_sekli": "POMPALI", "miktar": 10.0, "blok": "A1"},
+        {"tarih": "2025-11-21T23:30:00", "firma": "X", "irsaliye_no": "15000", "beton_sinifi": "C30",
+         "teslim_sekli": "POMPALI", "miktar": 5.0, "blok": "A1"},
+    ])
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(test_read_engine, "before_cursor_execute", listener)
+    try:
+        data = client.get("/api/analytics/summary", params={"start_date": "2025-11-21", "end_date": "2025-11-21"}).json()
+    finally:
+        event.remove(test_read_engine, "before_cursor_execute", listener)
+    assert len(statements) == 1
+    assert data["total_records"] == {"beton": 1, "demir": 0, "hasir": 0}
+    assert data["total_quantities"]["beton_m3"] == 5.0
+
+    data = client.get("/api/v2/analytics/summary", params={"firma": "ÖZYURT BETON"}).json()
+    assert data["total_records"]["beton"] == 1 and data["total_quantities"]["beton_m3"] == 10.0
+
+def test_timeseries_buckets_and_zero_fill():
+    client.post("/api/demir/bulk", json=[
+        {"tarih": "2025-11-03T08:00:00", "irsaliye_no": "D1", "tedarikci": "KROMAN", "q12": 100.0, "toplam_agirlik": 100.0},
+        {"tarih": "2025-11-05T08:00:00", "irsaliye_no": "D2", "tedarikci": "KROMAN", "q16": 50.0, "toplam_agirlik": 50.0},
+        {"tarih": "2025-11-19T08:00:00", "irsaliye_no": "D3", "tedarikci": None, "q12": 30.0, "toplam_agirlik": 30.0},
+    ])
+    data = client.get("/api/analytics/timeseries", params={
+        "material": "demir", "granularity": "week", "group_by": "tedarikci",
+        "start_date": "2025-11-01", "end_date": "2025-11-23"
+    }).json()
+    assert data["buckets"] == ["2025-10-27", "2025-11-03", "2025-11-10", "2025-11-17"]
+    series = {s["key"]: s["values"] for s in data["series"]}
+    assert series == {"KROMAN": [0, 150.0, 0, 0], "Belirtilmemiş": [0, 0, 0, 30.0]}
+
+    data = client.get("/api/v2/analytics/timeseries", params={"material": "demir", "granularity": "month", "group_by": "cap"}).json()
+    assert data["buckets"] == ["2025-11-01"]
+    assert {s["key"]: s["values"] for s in data["series"]} == {"Q12": [130.0], "Q16": [50.0]}
+
+    by_date = client.get("/api/analytics/demir/by-date", params={"start_date": "2025-11-04"}).json()["data"]
+    assert by_date == {"2025-11-05": 50.0, "2025-11-19": 30.0}
+    assert client.get("/api/analytics/timeseries", params={"material": "beton", "group_by": "cap"}).status_code == 400
+
+    # One-sided ranges: the open side comes from the data, and the bucket cap still applies
+    for url in ("/api/analytics/timeseries", "/api/v2/analytics/timeseries"):
+        assert client.get(url, params={"material": "demir", "start_date": "0001-01-01"}).status_code == 400
+        assert client.get(url, params={"material": "demir", "end_date": "9999-12-31"}).status_code == 400
+        data = client.get(url, params={"material": "demir", "granularity": "week", "start_date": "2025-11-10"}).json()
+        assert data["buckets"] == ["2025-11-10", "2025-11-17"]
+    assert client.get("/api/analytics/timeseries", params={
+        "material": "demir", "start_date": "0001-01-01", "end_date": "9999-12-31"
+    }).status_code == 400
+
+def test_dedupe_dry_run_and_apply(monkeypatch):
+    from database import Demir, WAYBILL_INDEXES
+
+    # Legacy database: duplicates were stored before the unique waybill index existed
+    with test_engine.begin() as connection:
+        WAYBILL_INDEXES[Demir].drop(connection)
+    rows = [
+        {"tarih": "2025-11-03T08:00:00", "irsaliye_no": "D 1", "tedarikci": "KROMAN", "toplam_agirlik": 100.0},
+        {"tarih": "2025-11-03T17:00:00", "irsaliye_no": "D1", "tedarikci": " KROMAN", "toplam_agirlik": 100.0},
+        {"tarih": "2025-11-04T08:00:00", "irsaliye_no": "D1", "tedarikci": "KROMAN", "toplam_agirlik": 100.0},
+        {"tarih": "2025-11-03T09:00:00", "irsaliye_no": "d1", "tedarikci": "kroman", "toplam_agirlik": 100.0},
+    ]
+    ids = [r["id"] for r in client.post("/api/demir/bulk", json=rows).json()["results"]]
+
+    # Closed without ADMIN_TOKEN: reports expose waybill data, apply deletes rows
+    assert client.post("/api/admin/dedupe/demir").status_code == 403
+    assert client.post("/api/admin/dedupe/all", params={"apply": True}).status_code == 403
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "gizli")
+    assert client.post("/api/admin/dedupe/demir").status_code == 403
+    admin = {"X-Admin-Token": "gizli"}
+
+    report = client.post("/api/admin/dedupe/demir", headers=admin).json()["results"][0]
+    assert (report["total"], report["duplicates"], report["deleted"]) == (4, 2, 0)
+    assert sorted(r["id"] for r in report["sample"]) == [ids[1], ids[3]]
+
+    report = client.post("/api/admin/dedupe/all", params={"apply": True}, headers=admin).json()["results"]
+    assert [r["deleted"] for r in report] == [0, 2, 0]
+    assert sorted(r["id"] for r in client.get("/api/demir/").json()) == [ids[0], ids[2]]
+
+def test_dedupe_keeps_blank_and_auto_waybills():
+    from database import Beton
+    from dedupe import dedupe_local
+
+    # Same supplier and day, no real waybill: separate deliveries, not duplicates
+    from datetime import datetime
+    db = TestSessionLocal()
+    try:
+        db.add_all([Beton(tarih=datetime(2025, 11, 3, 8), firma="X", irsaliye_no=no, miktar=m3)
+                    for no, m3 in [(None, 10.0), (None, 8.0), ("", 12.0), ("AUTO-1", 5.0), ("AUTO-1", 5.0)]])
+        db.commit()
+        report = dedupe_local(db, "beton", apply=True)
+        assert (report["total"], report["duplicates"], report["deleted"]) == (5, 0, 0)
+        assert db.query(Beton).count() == 5
+    finally:
+        db.close()
+
+def test_migrate_baseline_schema_with_duplicate_waybills(tmp_path, caplog):
+    from sqlalchemy import inspect
+    from database import migrate
+
+    legacy = create_db_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with legacy.begin() as connection:
+        # Schema of the first release: names only, no lookup ids, no indexes
+        connection.exec_driver_sql(
+            "CREATE TABLE beton (id INTEGER PRIMARY KEY, tarih DATETIME, firma VARCHAR(100), irsaliye_no VARCHAR(50), "
+            "beton_sinifi VARCHAR(50), teslim_sekli VARCHAR(50), miktar FLOAT, blok VARCHAR(100), aciklama TEXT, "
+            "created_at DATETIME)"
+        )
+        connection.exec_driver_sql(
+            "CREATE TABLE demir (id INTEGER PRIMARY KEY, tarih DATETIME, etap VARCHAR(50), irsaliye_no VARCHAR(50), "
+            "tedarikci VARCHAR(100), uretici VARCHAR(100), "
+            + ", ".join(f"q{d} FLOAT" for d in (8, 10, 12, 14, 16, 18, 20, 22, 25, 28, 32))
+            + ", toplam_agirlik FLOAT, created_at DATETIME)"
+        )
+        connection.exec_driver_sql(
+            "CREATE TABLE hasir (id INTEGER PRIMARY KEY, tarih DATETIME, firma VARCHAR(100), irsaliye_no VARCHAR(50), "
+            "etap VARCHAR(50), hasir_tipi VARCHAR(50), ebatlar VARCHAR(100), adet INTEGER, agirlik FLOAT, "
+            "kullanim_yeri VARCHAR(200), created_at DATETIME)"
+        )
+        connection.exec_driver_sql(
+            "INSERT INTO beton (tarih, firma, irsaliye_no, miktar) VALUES "
+            "('2025-11-03 08:00:00', 'Özyurt Beton', '13001', 10.0), "
+            "('2025-11-04 08:00:00', 'ÖZYURT BETON ', '13001', 10.0)"
+        )
+        connection.exec_driver_sql(
+            "INSERT INTO demir (tarih, irsaliye_no, tedarikci, q12, toplam_agirlik) VALUES "
+            "('2025-11-03 08:00:00', 'D1', 'KROMAN', 100.0, 100.0)"
+        )
+
+    # Same steps as init_db(); must start despite the duplicates
+    with caplog.at_level("WARNING", logger="database"):
+        Base.metadata.create_all(bind=legacy)
+        with legacy.begin() as connection:
+            migrate(connection)
+
+    with legacy.connect() as connection:
+        firma_ids = connection.exec_driver_sql("SELECT DISTINCT firma_id FROM beton").scalars().all()
+        indexes = {index["name"] for index in inspect(connection).get_indexes("beton")}
+        caps = connection.exec_driver_sql("SELECT cap, kg FROM demir_cap").all()
+    assert len(firma_ids) == 1 and firma_ids[0] is not None
+    assert "ux_beton_irsaliye_firma_id" not in indexes
+    assert "ux_beton_irsaliye_firma_id" in caplog.text
+    assert caps == [(12, 100.0)]
+    legacy.dispose()
+
+def test_shadow_reimport_replaces_in_one_transaction(monkeypatch):
+    import io
+    import pandas as pd
+    import shadow_reimport
+
+    client.post("/api/beton/", json={"tarih": "2025-10-01T08:00:00", "firma": "ESKİ", "irsaliye_no": "ABC",
+                                     "beton_sinifi": "C30", "teslim_sekli": "POMPALI", "miktar": 99.0})
+    buffer = io.BytesIO()
+    pd.DataFrame({
+        "TARİH": ["2025-11-03", "2025-11-04"], "FİRMA": ["X", "X"], "İRSALİYE NO": ["15001", "900"],
+        "MİKTAR": [10.5, 7.0], "BLOK": ["A", "B"],
+    }).to_excel(buffer, sheet_name="Sayfa1", index=False)
+    upload = lambda: {"file": ("beton.xlsx", buffer.getvalue())}
+
+    # Validation failure: nothing swapped, shadow table dropped
+    monkeypatch.setattr(shadow_reimport, "check_totals", lambda e, l: (_ for _ in ()).throw(ValueError("uyuşmazlık")))
+    response = client.post("/api/import/beton", params={"replace": True}, files=upload())
+    assert response.status_code == 400 and "uyuşmazlık" in response.json()["detail"]
+    assert [b["firma"] for b in client.get("/api/beton/").json()] == ["ESKİ"]
+    monkeypatch.undo()
+
+    result = client.post("/api/import/beton", params={"replace": True}, files=upload()).json()
+    assert (result["replaced"], result["inserted"], result["loaded"]["total"]) == (1, 2, 17.5)
+    assert sorted(b["firma"] for b in client.get("/api/beton/").json()) == ["ALBAYRAK BETON", "ÖZYURT BETON"]
+
+    result = client.post("/api/v2/import/beton", params={"replace": True}, files=upload()).json()
+    assert (result["replaced"], result["inserted"]) == (2, 2)
+    assert client.get("/api/analytics/summary").json()["total_quantities"]["beton_m3"] == 17.5
+
+def test_import_blank_waybills_and_409_on_duplicates():
+    import io
+    import pandas as pd
+
+    def sheet(waybills):
+        buffer = io.BytesIO()
+        pd.DataFrame({
+            "TARİH": ["2025-11-03"] * len(waybills), "FİRMA": ["X"] * len(waybills), "İRSALİYE NO": waybills,
+            "MİKTAR": [5.0] * len(waybills),
+        }).to_excel(buffer, sheet_name="Sayfa1", index=False)
+        return {"file": ("beton.xlsx", buffer.getvalue())}
+
+    # Blank cells are stored as NULL (not "nan") and keep the uploaded firma
+    assert client.post("/api/import/beton", files=sheet([None, None])).status_code == 200
+    assert [(b["irsaliye_no"], b["firma"]) for b in client.get("/api/beton/").json()] == [(None, "X"), (None, "X")]
+
+    client.post("/api/import/beton", files=sheet(["B-1"]))
+    for url in ("/api/import/beton", "/api/v2/import/beton"):
+        response = client.post(url, files=sheet(["B-2", "B-1", "B-2"]))
+        assert response.status_code == 409
+        assert [(r["index"], r["irsaliye_no"]) for r in response.json()["detail"]["results"]] == [(1, "B-1"), (2, "B-2")]
+    assert len(client.get("/api/beton/").json()) == 3
+
+    # Replace: stored rows go away, only repeats within the file conflict
+    response = client.post("/api/import/beton", params={"replace": True}, files=sheet(["B-1", "B-1"]))
+    assert response.status_code == 409
+    assert [r["index"] for r in response.json()["detail"]["results"]] == [1]
+    assert client.post("/api/v2/import/beton", params={"replace": True}, files=sheet(["B-1", None, None])).status_code == 200
+
+def test_resumable_import_checkpoints_and_idempotency(tmp_path):
+    from resumable_import import CheckpointStore, run_import
+
+    store = CheckpointStore(str(tmp_path / "checkpoints.db"))
+    records = [{"row_num": n, "date": "2025-11-03", "quantity_m3": 1.0} for n in range(2, 12)]
+    committed = {}
+
+    def crash_after(limit):
+        def insert_batch(rows):
+            new = [r for r in rows if r["import_key"] not in committed]
+            committed.update((r["import_key"], r) for r in new)
+            if len(committed) >= limit:
+                raise RuntimeError("bağlantı koptu")  # batch committed, checkpoint not written
+            return len(new)
+        return insert_batch
+
+    with pytest.raises(RuntimeError):
+        run_import(records, crash_after(6), store, "abc123", "Sayfa1", "concrete_logs", batch_size=3, retry_delay=0)
+    checkpoint = store.get("abc123", "Sayfa1", "concrete_logs")
+    assert (checkpoint["last_row"], checkpoint["inserted"], checkpoint["status"]) == (4, 3, "running")
+
+    result = run_import(records, crash_after(99), store, "abc123", "Sayfa1", "concrete_logs", batch_size=3)
+    # Rows 5-7 committed before the crash: skipped via their keys, not inserted twice
+    assert (result["resumed_from"], result["inserted"], result["skipped"]) == (4, 7, 3)
+    assert sorted(committed) == sorted(f"abc123:Sayfa1:{n}" for n in range(2, 12))
+    assert run_import(records, crash_after(99), store, "abc123", "Sayfa1", "concrete_logs")["already_done"]
+
+def test_reconcile_drills_into_mismatched_days_only():
+    from types import SimpleNamespace
+    from reconcile import reconcile, row_fingerprint, group_hash
+
+    records = [
+        {"row_num": 2, "date": "2025-11-03", "supplier": "ÖZYURT BETON", "waybill_no": "100", "quantity_m3": 10.0},
+        {"row_num": 3, "date": "2025-11-03", "supplier": "ÖZYURT BETON", "waybill_no": "101", "quantity_m3": 8.5},
+        {"row_num": 4, "date": "2025-11-04", "supplier": "ALBAYRAK BETON", "waybill_no": "15001", "quantity_m3": 12.0},
+    ]
+    # DB: 11-03 matches (different order/case), 11-04 has a wrong quantity plus an extra day
+    db = [
+        {"id": "a", "day": "2025-11-03", "supplier": "ÖZYURT BETON", "waybill_no": "101", "quantity": 8.5},
+        {"id": "b", "day": "2025-11-03", "supplier": "özyurt beton ", "waybill_no": "100", "quantity": 10.0},
+        {"id": "c", "day": "2025-11-04", "supplier": "ALBAYRAK BETON", "waybill_no": "15001", "quantity": 21.0},
+        {"id": "d", "day": "2025-11-05", "supplier": "ALBAYRAK BETON", "waybill_no": "15002", "quantity": 5.0},
+    ]
+    for row in db:
+        row["row_hash"] = row_fingerprint(row["day"], row["waybill_no"], row["supplier"], row["quantity"])
+        row["supplier"] = row["supplier"].strip().upper()
+    calls = []
+
+    def rpc(name, params):
+        calls.append((name, params))
+        if name == "reconcile_groups":
+            groups = {}
+            for row in db:
+                groups.setdefault((row["day"], row["supplier"]), []).append(row)
+            data = [{"day": d, "supplier": s, "row_count": len(rows), "total": sum(r["quantity"] for r in rows),
+                     "content_hash": group_hash([r["row_hash"] for r in rows])} for (d, s), rows in groups.items()]
+        else:
+            data = [row for row in db if row["day"] in params["p_days"]]
+        return SimpleNamespace(execute=lambda: SimpleNamespace(data=data))
+
+    report = reconcile(SimpleNamespace(rpc=rpc), "concrete_logs", records)
+    assert [(m["day"], m["source_count"], m["db_count"]) for m in report["mismatched_groups"]] == [
+        ("2025-11-04", 1, 1), ("2025-11-05", 0, 1)]
+    assert calls[1] == ("reconcile_rows", {"p_table": "concrete_logs", "p_days": ["2025-11-04", "2025-11-05"]})
+    assert [r["row_num"] for r in report["missing"]] == [4]
+    assert [r["id"] for r in report["extra"]] == ["c", "d"]
+
+def test_dimension_lookups_fold_turkish_i():
+    from database import Demir, Firma, Etap
+
+    single = client.post("/api/demir/", json={
+        "tarih": "2025-11-20T10:00:00", "etap": "3. etap", "irsaliye_no": "1", "tedarikci": "içdaş",
+        "toplam_agirlik": 100.0
+    }).json()
+    assert (single["tedarikci"], single["etap"]) == ("İÇDAŞ", "3. ETAP")
+    client.post("/api/demir/bulk", json=[
+        {"tarih": "2025-11-21T10:00:00", "irsaliye_no": "2", "tedarikci": " İÇDAŞ ", "etap": "3.  ETAP", "toplam_agirlik": 50.0},
+        {"tarih": "2025-11-22T10:00:00", "irsaliye_no": "3", "tedarikci": "IÇDAŞ", "toplam_agirlik": 25.0},
+        {"tarih": "2025-11-22T10:00:00", "irsaliye_no": "4", "tedarikci": "", "toplam_agirlik": 5.0},
+    ])
+
+    with TestSessionLocal() as db:
+        assert db.query(Firma.ad, Firma.anahtar).all() == [("İÇDAŞ", "IÇDAŞ")]
+        assert db.query(Etap.ad).all() == [("3. ETAP",)]
+        assert {d.tedarikci_id for d in db.query(Demir) if d.tedarikci} == {1}
+
+    assert [d["tedarikci"] for d in client.get("/api/demir/").json()] == ["İÇDAŞ", "İÇDAŞ", "İÇDAŞ", ""]
+    dashboard = client.get("/api/analytics/dashboard").json()
+    assert dashboard["demir_analytics"]["tedarikci_dagilimi"] == {"İÇDAŞ": 175.0}
+    assert client.get("/api/v2/analytics/dashboard").json() == dashboard
+    assert client.get("/api/analytics/summary", params={"firma": "ıçdaş"}).json()["total_records"]["demir"] == 3
+    series = client.get("/api/analytics/timeseries", params={"material": "demir", "group_by": "etap"}).json()["series"]
+    assert {s["key"]: s["total"] for s in series} == {"3. ETAP": 150.0, "Belirtilmemiş": 30.0}
+
+def test_demir_cap_long_table_follows_every_write_path():
+    from datetime import datetime
+    from database import DemirCap
+
+    single = client.post("/api/demir/", json={
+        "tarih": "2025-11-20T10:00:00", "irsaliye_no": "1", "q10": 1000, "q16": 3000, "toplam_agirlik": 4000
+    }).json()
+    ids = [r["id"] for r in client.post("/api/demir/bulk", json=[
+        {"tarih": "2025-12-01T10:00:00", "irsaliye_no": "2", "q10": 500, "toplam_agirlik": 500},
+        {"tarih": "2025-12-02T10:00:00", "irsaliye_no": "3", "q32": 200, "toplam_agirlik": 200},
+    ]).json()["results"]]
+    client.patch("/api/demir/bulk", json=[{"id": ids[0], "q10": 0, "q12": 700}])
+    client.request("DELETE", "/api/demir/bulk", json={"ids": [ids[1]]})
+
+    with TestSessionLocal() as db:
+        # Q24 has no wide column; it only lives in the long table
+        db.add(DemirCap(demir_id=single["id"], tarih=datetime(2025, 11, 20, 10), cap=24, kg=50.0))
+        db.commit()
+        rows = sorted((r.demir_id, r.cap, r.kg) for r in db.query(DemirCap))
+    assert rows == [(single["id"], 10, 1000.0), (single["id"], 16, 3000.0), (single["id"], 24, 50.0), (ids[0], 12, 700.0)]
+
+    caps = client.get("/api/analytics/dashboard").json()["demir_analytics"]["cap_dagilimi"]
+    assert list(caps)[:3] == ["Q8", "Q10", "Q12"]
+    assert (caps["Q10"], caps["Q12"], caps["Q24"], caps["Q32"]) == (1000.0, 700.0, 50.0, 0)
+    assert client.get("/api/v2/analytics/dashboard").json()["demir_analytics"]["cap_dagilimi"] == caps
+
+    data = client.get("/api/analytics/timeseries", params={"material": "demir", "granularity": "month", "group_by": "cap"}).json()
+    assert data["buckets"] == ["2025-11-01", "2025-12-01"]
+    assert {s["key"]: s["values"] for s in data["series"]} == {
+        "Q16": [3000.0, 0], "Q10": [1000.0, 0], "Q12": [0, 700.0], "Q24": [50.0, 0]
+    }
+
+def test_search_prefix_and_turkish_folding():
+    client.post("/api/beton/bulk", json=[
+        {"tarih": "2025-11-20T10:00:00", "firma": "İÇDAŞ BETON", "irsaliye_no": "B-12345", "beton_sinifi": "C30",
+         "teslim_sekli": "POMPALI", "miktar": 10.0, "blok": "GK1", "aciklama": "Kırmızı kapı önü"},
+        {"tarih": "2025-11-21T10:00:00", "firma": "", "irsaliye_no": "99887", "beton_sinifi": "C30",
+         "teslim_sekli": "POMPALI", "miktar": 12.0, "blok": "GK2"},
+    ])
+    hasir = client.post("/api/hasir/", json={
+        "tarih": "2025-11-22T10:00:00", "firma": "Çelik Hasır", "irsaliye_no": "H-12", "hasir_tipi": "Q",
+        "ebatlar": "215x500", "adet": 10, "agirlik": 500.0, "kullanim_yeri": "Şantiye girişi"
+    }).json()
+
+    def hits(q, **params):
+        response = client.get("/api/search", params={"q": q, **params})
+        assert response.status_code == 200
+        return [(r["malzeme"], r["irsaliye_no"]) for r in response.json()["results"]]
+
+    assert hits("icdas 123") == [("beton", "B-12345")]
+    assert hits("KIRMIZI kapi") == [("beton", "B-12345")]
+    assert hits("santiye gir") == [("hasir", "H-12")]
+    assert set(hits("12")) == {("beton", "B-12345"), ("hasir", "H-12")}
+    assert hits("12", malzeme="hasir") == [("hasir", "H-12")]
+
+    # Updates and deletes reach the index through the triggers
+    client.patch("/api/beton/bulk", json=[{"id": 1, "firma": "ÖZYURT BETON"}])
+    assert hits("icdas") == []
+    client.delete(f"/api/hasir/{hasir['id']}")
+    assert hits("santiye") == []
+
+    assert client.get("/api/search", params={"q": " - "}).status_code == 400
+    assert client.get("/api/search", params={"q": "x", "malzeme": "kum"}).status_code == 400
+
+    # PostgreSQL: the query text goes through the same translate/lower as the indexed document
+    from sqlalchemy.dialects import postgresql
+    from search_index import PG_FOLD_FROM, pg_fold, pg_search_statement
+    sql = str(pg_search_statement(["beton"]).compile(dialect=postgresql.dialect()))
+    assert sql.count("to_tsvector('simple', lower(translate(") == 2
+    assert sql.count(f"to_tsquery('simple', {pg_fold('%(q)s')})") == 2
+    assert sql.count(PG_FOLD_FROM) == 4
+
+def test_waybill_unique_index_lookup_and_409():
+    beton = {"tarih": "2025-11-20T10:00:00", "firma": "", "irsaliye_no": "16001", "beton_sinifi": "C30",
+             "teslim_sekli": "POMPALI", "miktar": 10.0}
+    first = client.post("/api/beton/", json=beton).json()
+    response = client.post("/api/beton/", json=dict(beton, miktar=12.0))
+    assert response.status_code == 409
+    assert [r["id"] for r in response.json()["detail"]["kayitlar"]] == [first["id"]]
+    assert client.post("/api/v2/beton/", json=beton).status_code == 409
 
+    # Same number from another supplier / material, and synthetic AUTO- numbers are allowed
+    demir = {"tarih": "2025-11-20T10:00:00", "irsaliye_no": "16001", "tedarikci": "KROMAN", "toplam_agirlik": 5.0}
+    assert client.post("/api/demir/", json=demir).status_code == 200
+    assert client.post("/api/demir/", json=dict(demir, tedarikci="İÇDAŞ")).status_code == 200
+    auto = dict(demir, irsaliye_no="AUTO-1a2b3c4d")
+    assert [client.post("/api/demir/", json=auto).status_code for _ in range(2)] == [200, 200]
 
+    response = client.post("/api/demir/bulk", json=[
+        dict(demir, irsaliye_no="16002"), dict(demir, tedarikci="kroman"), dict(demir, irsaliye_no="16002")
+    ])
+    assert response.status_code == 409
+    assert [(r["index"], r["status"]) for r in response.json()["detail"]["results"]] == [(1, "conflict"), (2, "conflict")]
 
+    found = client.get("/api/lookup/waybill/16001").json()
+    assert found["bulundu"] and sorted(r["malzeme"] for r in found["kayitlar"]) == ["beton", "demir", "demir"]
+    found = client.get("/api/lookup/waybill/16001", params={"firma": "kroman", "malzeme": "demir"}).json()
+    assert [r["firma"] for r in found["kayitlar"]] == ["KROMAN"]
+    assert len(client.get("/api/lookup/waybill/AUTO-1a2b3c4d").json()["kayitlar"]) == 2
+    assert client.get("/api/lookup/waybill/99999").json() == {"irsaliye_no": "99999", "bulundu": False, "kayitlar": []}
 
+    from sqlalchemy import select
+    from database import Beton, real_waybill
+    statement = select(Beton.id).where(Beton.irsaliye_no == "16001", real_waybill(Beton.irsaliye_no))
+    compiled = statement.compile(test_engine)  # irsaliye_no stays a bound parameter
+    with test_engine.connect() as connection:
+        plan = " ".join(row[-1] for row in connection.exec_driver_sql(
+            f"EXPLAIN QUERY PLAN {compiled}", tuple(compiled.params.values())
+        ))
+    assert "ux_beton_irsaliye_firma_id" in plan
@@ -0,0 +1,117 @@
+"""
+Typed Log Frames
+Compact DataFrames for the Streamlit dashboards. Repeated text columns (supplier, class,
+location, stage, type) become categoricals. Weights and quantities become float32 when every
+value survives the round trip to 2 decimals. Dates are datetime64 and bookkeeping columns
+are dropped.
+
+The frames are shared by all sessions through st.cache_resource (no pickling, no copy per
+rerun), so consumers must treat them as read-only, as dashboard_aggregates already does.
+
+Kullanım:
+    python typed_frames.py            # bellek raporu (önce / sonra), tüm tablolar
+    python typed_frames.py --table rebar_logs
+"""
+
+import argparse
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+DIAMETER_COLUMNS = [f"q{d}_kg" for d in (8, 10, 12, 14, 16, 18, 20, 22, 25, 28, 32)]
+
+# table -> (categorical columns, float32 candidates)
+TABLE_TYPES = {
+    "concrete_logs": (["supplier", "concrete_class", "delivery_method", "location_block"], ["quantity_m3"]),
+    "rebar_logs": (["supplier", "manufacturer", "project_stage"], DIAMETER_COLUMNS + ["total_weight_kg"]),
+    "mesh_logs": (["supplier", "mesh_type", "dimensions", "usage_location"], ["weight_kg"]),
+}
+# Written by the database / importers, never read by the dashboards
+DROP_COLUMNS = ["created_at", "updated_at", "import_key"]
+FLOAT32_TOLERANCE = 0.005  # values are entered with at most 2 decimals
+
+
+def float32_safe(values: pd.Series) -> bool:
+    """True when float32 keeps every value within FLOAT32_TOLERANCE"""
+    array = values.to_numpy(dtype=np.float64, na_value=np.nan)
+    error = np.abs(array.astype(np.float32).astype(np.float64) - array)
+    return bool(np.nanmax(error, initial=0.0) <= FLOAT32_TOLERANCE)
+
+
+def typed_logs(df: pd.DataFrame, table: str) -> pd.DataFrame:
+    """Typed copy of a get_*_logs frame; the input is left untouched"""
+    if df is None or df.empty:
+        return pd.DataFrame()
+
+    categories, float_columns = TABLE_TYPES[table]
+    result = df.drop(columns=[c for c in DROP_COLUMNS if c in df.columns])
+    converted = {}
+    if "date" in result.columns:
+        converted["date"] = pd.to_datetime(result["date"])
+    for column in categories:
+        if column in result.columns:
+            converted[column] = result[column].astype("category")
+    for column in float_columns:
+        if column in result.columns:
+            values = pd.to_numeric(result[column], errors="coerce")
+            converted[column] = values.astype(np.float32) if float32_safe(values) else values
+    if "piece_count" in result.columns:
+        converted["piece_count"] = pd.to_numeric(result["piece_count"], errors="coerce", downcast="integer")
+    return result.assign(**converted)
+
+
+# ============================================
+# MEMORY REPORT
+# ============================================
+
+def frame_memory(df: pd.DataFrame) -> int:
+    """Bytes including string payloads (deep)"""
+    return int(df.memory_usage(deep=True, index=True).sum())
+
+
+def memory_report(before: pd.DataFrame, after: pd.DataFrame) -> pd.DataFrame:
+    """Per-column dtype and deep size, before and after typing (plus a TOPLAM row)"""
+    before_sizes = before.memory_usage(deep=True, index=False)
+    after_sizes = after.memory_usage(deep=True, index=False)
+    rows: List[Dict] = [
+        {
+            "kolon": column,
+            "önce_tip": str(before[column].dtype),
+            "sonra_tip": str(after[column].dtype) if column in after.columns else "(atıldı)",
+            "önce_bayt": int(before_sizes[column]),
+            "sonra_bayt": int(after_sizes.get(column, 0)),
+        }
+        for column in before.columns
+    ]
+    rows.append({"kolon": "TOPLAM", "önce_tip": "", "sonra_tip": "",
+                 "önce_bayt": frame_memory(before), "sonra_bayt": frame_memory(after)})
+    return pd.DataFrame(rows)
+
+
+def print_report(table: str, report: pd.DataFrame):
+    total = report.iloc[-1]
+    ratio = total["sonra_bayt"] / total["önce_bayt"] if total["önce_bayt"] else 1.0
+    print(f"📦 {table}: {total['önce_bayt'] / 1e6:,.2f} MB → {total['sonra_bayt'] / 1e6:,.2f} MB (%{ratio * 100:.0f})")
+    print(report.to_string(index=False))
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Dashboard DataFrame bellek raporu (önce / sonra)")
+    parser.add_argument("--table", choices=list(TABLE_TYPES), help="Sadece bu tablo")
+    args = parser.parse_args(argv)
+
+    from db_manager_rest import get_db_manager_rest_v10
+
+    db = get_db_manager_rest_v10()
+    loaders = {"concrete_logs": db.get_concrete_logs, "rebar_logs": db.get_rebar_logs, "mesh_logs": db.get_mesh_logs}
+    for table in [args.table] if args.table else list(TABLE_TYPES):
+        raw = loaders[table]()
+        if raw.empty:
+            print(f"ℹ️  {table}: kayıt yok")
+            continue
+        print_report(table, memory_report(raw, typed_logs(raw, table)))
+
+
+if __name__ == "__main__":
+    main()